@@ -12,6 +12,7 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
 import os
+import sys
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import re
@@ -98,6 +99,14 @@ if database_url:
         db_error = f"Database initialization error: {str(e)}"
         print(f"⚠️ Database initialization failed: {e}")
 
+# Start background jobs (expired interview updates, bulk interview analysis)
+if database_url and not db_error and os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true':
+    try:
+        from scheduler import init_scheduler
+        init_scheduler(app)
+    except ImportError as e:
+        print(f"⚠️ Background scheduler unavailable: {e}")
+
 # Helper function to validate email
 def is_valid_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -461,6 +470,11 @@ def _duplicate_api_routes_to_v1(app):
             methods=methods,
         )
 
+# Requeue RAG ingest jobs left behind by a previous process (only when the RAG API was loaded)
+rag_routes = sys.modules.get('src.blueprints.recruai.routes.api.rag.routes')
+if rag_routes and database_url and not db_error and os.getenv('INGEST_JOB_RECOVERY_ENABLED', 'true').lower() == 'true':
+    rag_routes.start_ingest_recovery(app)
+
 # After blueprint registration, duplicate routes to /api/v1/*
 try:
     _duplicate_api_routes_to_v1(app)
@@ -0,0 +1,47 @@
+"""RAG embedding vector index
+
+Revision ID: 5c1e7a9d3b42
+Revises: 2401f968938d
+Create Date: 2026-10-18 10:12:31.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7a9d3b42'
+down_revision = '2401f968938d'
+branch_labels = None
+depends_on = None
+
+
+def _has_embedding_table(bind):
+    return bind.execute(
+        sa.text("SELECT to_regclass('rag_embedding_store') IS NOT NULL")
+    ).scalar()
+
+
+def upgrade():
+    # pgvector ANN index is PostgreSQL-only; SQLite deployments use the
+    # in-process LocalVectorIndex instead. When the RAG tables do not exist
+    # yet, IngestPipeline.ensure_tables() creates the index with them.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not _has_embedding_table(bind):
+        return
+
+    from src.services.recruai.rag.models.vector_store import HAS_VECTOR, create_vector_index
+
+    if HAS_VECTOR:
+        create_vector_index(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    from src.services.recruai.rag.models.vector_store import VECTOR_INDEX_METHODS, drop_vector_index
+
+    for method in VECTOR_INDEX_METHODS:
+        drop_vector_index(bind, method)
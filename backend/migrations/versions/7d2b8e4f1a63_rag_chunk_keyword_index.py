@@ -0,0 +1,45 @@
+"""RAG chunk keyword index
+
+Revision ID: 7d2b8e4f1a63
+Revises: 5c1e7a9d3b42
+Create Date: 2026-10-18 14:05:12.730415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2b8e4f1a63'
+down_revision = '5c1e7a9d3b42'
+branch_labels = None
+depends_on = None
+
+
+def _has_chunk_table(bind):
+    return bind.execute(
+        sa.text("SELECT to_regclass('rag_document_chunks') IS NOT NULL")
+    ).scalar()
+
+
+def upgrade():
+    # Full-text GIN index is PostgreSQL-only; other databases use the
+    # in-process KeywordIndex instead. When the RAG tables do not exist yet,
+    # IngestPipeline.ensure_tables() creates the index with them.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not _has_chunk_table(bind):
+        return
+
+    from src.services.recruai.rag.models.vector_store import create_keyword_index
+
+    create_keyword_index(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    from src.services.recruai.rag.models.vector_store import drop_keyword_index
+
+    drop_keyword_index(bind)
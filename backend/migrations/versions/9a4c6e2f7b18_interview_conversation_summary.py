@@ -0,0 +1,28 @@
+"""Interview conversation summary
+
+Revision ID: 9a4c6e2f7b18
+Revises: 7d2b8e4f1a63
+Create Date: 2026-10-18 16:42:08.215930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c6e2f7b18'
+down_revision = '7d2b8e4f1a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('conversation_summary', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('conversation_summarized_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.drop_column('conversation_summarized_at')
+        batch_op.drop_column('conversation_summary')
@@ -0,0 +1,55 @@
+"""Conversation summary id watermark
+
+Revision ID: a6d3f9b2c815
+Revises: f1c4a7d9e352
+Create Date: 2026-10-18 22:41:26.905173
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3f9b2c815'
+down_revision = 'f1c4a7d9e352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('conversation_summarized_through_id', sa.Integer(), nullable=True))
+
+    # The last message at or before the old timestamp watermark
+    op.execute(
+        "UPDATE interviews SET conversation_summarized_through_id = ("
+        "SELECT MAX(m.id) FROM conversation_memories m "
+        "WHERE m.interview_id = interviews.id AND m.timestamp <= interviews.conversation_summarized_at"
+        ") WHERE conversation_summarized_at IS NOT NULL"
+    )
+
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.drop_column('conversation_summarized_at')
+
+    with op.batch_alter_table('conversation_memories', schema=None) as batch_op:
+        batch_op.create_index('ix_conversation_memories_interview_id_id', ['interview_id', 'id'], unique=False)
+        batch_op.drop_index('ix_conversation_memories_interview_id_timestamp')
+
+
+def downgrade():
+    with op.batch_alter_table('conversation_memories', schema=None) as batch_op:
+        batch_op.create_index('ix_conversation_memories_interview_id_timestamp', ['interview_id', 'timestamp'], unique=False)
+        batch_op.drop_index('ix_conversation_memories_interview_id_id')
+
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('conversation_summarized_at', sa.DateTime(), nullable=True))
+
+    op.execute(
+        "UPDATE interviews SET conversation_summarized_at = ("
+        "SELECT m.timestamp FROM conversation_memories m "
+        "WHERE m.id = interviews.conversation_summarized_through_id"
+        ") WHERE conversation_summarized_through_id IS NOT NULL"
+    )
+
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.drop_column('conversation_summarized_through_id')
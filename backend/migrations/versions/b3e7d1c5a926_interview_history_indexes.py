@@ -0,0 +1,32 @@
+"""Interview history composite indexes
+
+Revision ID: b3e7d1c5a926
+Revises: 9a4c6e2f7b18
+Create Date: 2026-10-18 18:20:47.603114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e7d1c5a926'
+down_revision = '9a4c6e2f7b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conversation_memories', schema=None) as batch_op:
+        batch_op.create_index('ix_conversation_memories_interview_id_timestamp', ['interview_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_messages_interview_id_created_at', ['interview_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_interview_id_created_at')
+
+    with op.batch_alter_table('conversation_memories', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversation_memories_interview_id_timestamp')
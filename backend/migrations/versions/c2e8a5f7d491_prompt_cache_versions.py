@@ -0,0 +1,30 @@
+"""Prompt cache versions
+
+Revision ID: c2e8a5f7d491
+Revises: a6d3f9b2c815
+Create Date: 2026-10-18 23:08:51.274306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e8a5f7d491'
+down_revision = 'a6d3f9b2c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('prompt_cache_versions',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('row_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('table_name', 'row_id')
+    )
+
+
+def downgrade():
+    op.drop_table('prompt_cache_versions')
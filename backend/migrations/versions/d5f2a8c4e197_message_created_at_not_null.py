@@ -0,0 +1,39 @@
+"""Message created_at not null
+
+Revision ID: d5f2a8c4e197
+Revises: b3e7d1c5a926
+Create Date: 2026-10-18 21:05:12.338914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f2a8c4e197'
+down_revision = 'b3e7d1c5a926'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Messages without a timestamp take their interview's creation time, so
+    # they keep sorting before the messages written during the interview
+    op.execute(
+        "UPDATE messages SET created_at = COALESCE("
+        "(SELECT interviews.created_at FROM interviews WHERE interviews.id = messages.interview_id), "
+        "CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               nullable=True)
@@ -0,0 +1,28 @@
+"""Interview analysis attempts
+
+Revision ID: e8b3c6f1d274
+Revises: d5f2a8c4e197
+Create Date: 2026-10-18 21:05:37.481562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3c6f1d274'
+down_revision = 'd5f2a8c4e197'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('analysis_attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('analysis_next_attempt_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.drop_column('analysis_next_attempt_at')
+        batch_op.drop_column('analysis_attempts')
@@ -0,0 +1,28 @@
+"""Messages keyset index
+
+Revision ID: f1c4a7d9e352
+Revises: e8b3c6f1d274
+Create Date: 2026-10-18 22:14:09.318645
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c4a7d9e352'
+down_revision = 'e8b3c6f1d274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_messages_interview_id_created_at_id', ['interview_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_messages_interview_id_created_at')
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_messages_interview_id_created_at', ['interview_id', 'created_at'], unique=False)
+        batch_op.drop_index('ix_messages_interview_id_created_at_id')
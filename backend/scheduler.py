@@ -11,22 +11,41 @@ from apscheduler.schedulers.background import BackgroundScheduler  # type: ignor
 from apscheduler.triggers.interval import IntervalTrigger  # type: ignore
 
 try:  # Prefer new unified path
-    from app.services.recruai.utils.interview_utils import update_expired_interviews  # type: ignore
+    from src.services.recruai.utils.interview_utils import update_expired_interviews  # type: ignore
 except Exception:  # pragma: no cover
     def update_expired_interviews():  # fallback no-op
         return 0
 
+try:
+    from src.services.recruai.utils.interview_utils import analyze_completed_interviews  # type: ignore
+except Exception:  # pragma: no cover
+    def analyze_completed_interviews():  # fallback no-op
+        return 0
+
 scheduler = BackgroundScheduler()
 _SCHEDULER_STARTED = False  # module-level flag
 
 
-def init_scheduler():
+def _in_app_context(app, func):
+    """Wrap a job so it runs inside the Flask app context (needed for db access)."""
+    if app is None:
+        return func
+
+    def job():
+        with app.app_context():
+            return func()
+    return job
+
+
+def init_scheduler(app=None):
     """Initialize and start the background scheduler once.
 
     Avoid duplicate starts caused by Flask's reloader by:
     - Only starting in the reloader's main process (WERKZEUG_RUN_MAIN == 'true')
       OR when the environment variable is absent (non-reloader invocation).
     - Guarding with a module-level flag `_SCHEDULER_STARTED`.
+
+    Pass the Flask app so jobs run inside its app context.
     """
     global _SCHEDULER_STARTED
     if _SCHEDULER_STARTED:
@@ -39,16 +58,27 @@ def init_scheduler():
 
     try:
         scheduler.add_job(
-            func=update_expired_interviews,
+            func=_in_app_context(app, update_expired_interviews),
             trigger=IntervalTrigger(minutes=5),
             id="update_expired_interviews",
             name="Update expired interviews to completed status",
             replace_existing=True,
         )
+        # One run at a time per process; runs in other processes skip rows
+        # already claimed via SKIP LOCKED
+        scheduler.add_job(
+            func=_in_app_context(app, analyze_completed_interviews),
+            trigger=IntervalTrigger(minutes=int(os.getenv("ANALYSIS_JOB_INTERVAL_MINUTES", "5"))),
+            id="analyze_completed_interviews",
+            name="Generate AI analysis for completed interviews",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
         scheduler.start()
         atexit.register(lambda: shutdown_scheduler())
         _SCHEDULER_STARTED = True
-        print("Background scheduler initialized with interview status update job")
+        print("Background scheduler initialized with interview status update and analysis jobs")
     except Exception as exc:  # pragma: no cover
         print(f"Warning: Scheduler init failed: {exc}")
 
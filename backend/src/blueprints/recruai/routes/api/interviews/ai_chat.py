@@ -1,9 +1,19 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context, current_app
 from .. import api_bp
 from extensions import db
-from src.models import Interview, User, AIInterviewAgent, ConversationMemory
+from src.models import Interview, User, AIInterviewAgent, ConversationMemory, Post, Organization
 from src.services.recruai.ai_service import get_ai_service
+from src.services.recruai.interview_prompt_cache import get_interview_prompt_cache
+from src.services.recruai.conversation_memory_manager import get_conversation_memory_manager
+from datetime import datetime
 import json
+import threading
+
+AI_USER_EMAIL = 'ai@recruai.com'
+
+# AI system user id, resolved once per process
+_ai_user_id = None
+
 
 @api_bp.route('/ai/chat', methods=['POST'])
 def ai_chat():
@@ -16,85 +26,231 @@ def ai_chat():
     message = data['message']
     interview_id = data.get('interview_id')
     conversation_history = data.get('conversation_history', [])
+    received_at = datetime.utcnow()
 
-    # Store user message in conversation memory
+    # Resolve the interview prompt (and its agent) once for the whole turn
+    prompt = None
     if interview_id:
         try:
-            # Get AI user ID
-            ai_user = User.query.filter_by(email='ai@recruai.com').first()
-            ai_user_id = ai_user.id if ai_user else 1
-
-            # Store user message
-            ConversationMemory.add_message(
-                interview_id=interview_id,
-                user_id=1,  # TODO: Get from auth context
-                message_type='user',
-                content=message
-            )
+            prompt = get_interview_prompt(interview_id)
         except Exception as e:
-            print(f"Error storing user message: {e}")
+            print(f"Error getting interview context: {e}")
+    memory = load_chat_memory(interview_id)
+
+    # Stream the reply as server-sent events; the turn is stored once complete
+    if data.get('stream'):
+        return Response(
+            stream_with_context(stream_contextual_response(message, interview_id, conversation_history, prompt, memory, received_at)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
 
     # Generate contextual response using conversation history and RAG
-    agent_response = generate_contextual_response(message, interview_id, conversation_history)
+    agent_response = generate_contextual_response(message, conversation_history, prompt, memory)
 
-    # Store AI response in conversation memory
+    # Store the user message and AI response in one commit
     if interview_id:
-        try:
-            ConversationMemory.add_message(
+        stored = save_chat_turn(interview_id, message, received_at, agent_response)
+        schedule_chat_memory_update(memory, stored)
+
+    return jsonify({
+        'response': agent_response,
+        'agent_name': get_agent_name(prompt),
+        'interview_id': interview_id,
+        'prompt_prefix_tokens': prompt['prefix_tokens'] if prompt else None
+    }), 200
+
+
+def get_ai_user_id():
+    """Id of the AI system user, cached for the life of the process"""
+    global _ai_user_id
+    if _ai_user_id is None:
+        ai_user = User.query.filter_by(email=AI_USER_EMAIL).first()
+        if not ai_user:
+            return 1
+        _ai_user_id = ai_user.id
+    return _ai_user_id
+
+
+def save_chat_turn(interview_id, message, received_at, agent_response=None):
+    """
+    Store the user message and the AI response of a chat turn in a single commit
+
+    Returns:
+        The stored messages as conversation memory window entries (empty if storing failed)
+    """
+    try:
+        rows = [ConversationMemory.add_message(
+            interview_id=interview_id,
+            user_id=1,  # TODO: Get from auth context
+            message_type='user',
+            content=message,
+            timestamp=received_at,
+            commit=False
+        )]
+        if agent_response is not None:
+            rows.append(ConversationMemory.add_message(
                 interview_id=interview_id,
-                user_id=ai_user_id,
+                user_id=get_ai_user_id(),
                 message_type='ai',
-                content=agent_response
-            )
-        except Exception as e:
-            print(f"Error storing AI response: {e}")
+                content=agent_response,
+                commit=False
+            ))
+        # Flush for the ids, and read before the commit expires the rows
+        db.session.flush()
+        stored = [get_conversation_memory_manager().to_message(row) for row in rows]
+        db.session.commit()
+        return stored
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error storing chat turn: {e}")
+        return []
 
-    # Get agent name for response
-    agent_name = 'AI Interview Assistant'
-    if interview_id:
+
+def load_chat_memory(interview_id):
+    """Rolling conversation memory (summary and unsummarized turns) of the interview, or None"""
+    if not interview_id:
+        return None
+    try:
+        return get_conversation_memory_manager().load(interview_id)
+    except Exception as e:
+        print(f"Error loading conversation memory: {e}")
+        return None
+
+
+def schedule_chat_memory_update(memory, stored):
+    """
+    Add the stored turn to the memory; when a summary is due, fold older turns
+    in a background thread so the LLM call does not delay the response
+
+    Turns arriving while an update of the same interview is in flight do not
+    start another one; the next turn after it finishes picks them up.
+    """
+    if memory is None or not stored:
+        return
+    manager = get_conversation_memory_manager()
+    manager.append(memory, stored)
+    if not manager.needs_update(memory) or not manager.claim_update(memory['interview_id']):
+        return
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                manager.update(memory)
+            except Exception as e:
+                print(f"Error updating conversation summary: {e}")
+            finally:
+                manager.release_update(memory['interview_id'])
+
+    threading.Thread(target=run, name=f"chat-summary-{memory['interview_id']}", daemon=True).start()
+
+
+def get_interview_prompt(interview_id):
+    """
+    Static system prompt prefix of an interview, memoized across chat turns
+
+    Returns:
+        Cache entry with 'prefix', 'prefix_tokens', 'interview_context',
+        'scheduled_at', 'duration_minutes' and 'agent_name', or None
+    """
+    if not interview_id:
+        return None
+
+    cache = get_interview_prompt_cache()
+    prompt = cache.get(interview_id)
+    if prompt is None:
+        interview = Interview.query.get(interview_id)
+        if not interview:
+            return None
+
+        agent = interview.ai_agent
+        interview_context = build_interview_context(interview)
+        prompt = cache.set(interview_id, {
+            'prefix': build_interview_system_prompt(interview_context, interview),
+            'interview_context': interview_context,
+            'scheduled_at': interview.scheduled_at,
+            'duration_minutes': interview.duration_minutes,
+            'agent_name': agent.name if agent else 'AI Interview Assistant'
+        }, depends_on=[
+            (Interview.__tablename__, interview.id),
+            (Post.__tablename__, interview.post_id),
+            (AIInterviewAgent.__tablename__, interview.ai_agent_id),
+            (Organization.__tablename__, interview.organization_id),
+            (Organization.__tablename__, agent.organization_id if agent else None)
+        ])
+    return prompt
+
+
+def get_agent_name(prompt):
+    """Name of the AI agent assigned to the interview"""
+    return prompt['agent_name'] if prompt else 'AI Interview Assistant'
+
+
+def sse_event(payload):
+    """Format a payload as a server-sent event"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def stream_contextual_response(message, interview_id, conversation_history, prompt, memory, received_at):
+    """Stream a contextual response as server-sent events, then store the turn in conversation memory"""
+    parts = []
+    stored = []
+    completed = False
+    interview_context = prompt['interview_context'] if prompt else ""
+    try:
         try:
-            interview = Interview.query.get(interview_id)
-            if interview and interview.ai_agent:
-                agent_name = interview.ai_agent.name
+            conversation_history = build_chat_history(memory, conversation_history)
+            system_prompt, formatted_history = build_smart_request(
+                conversation_history, prompt, memory['summary'] if memory else None
+            )
+
+            for piece in get_ai_service().generate_response_stream(system_prompt, message, formatted_history):
+                parts.append(piece)
+                yield sse_event({'type': 'token', 'content': piece})
+
         except Exception as e:
-            print(f"Error getting agent name: {e}")
+            print(f"Error streaming AI response: {e}")
+            if not parts:
+                fallback = generate_fallback_response(message, conversation_history, interview_context)
+                parts.append(fallback)
+                yield sse_event({'type': 'token', 'content': fallback})
+        completed = True
+
+    finally:
+        # A client that disconnects mid-stream still gets its own message stored
+        if interview_id:
+            stored = save_chat_turn(interview_id, message, received_at, "".join(parts) if completed else None)
 
-    return jsonify({
-        'response': agent_response,
-        'agent_name': agent_name,
-        'interview_id': interview_id
-    }), 200
+    yield sse_event({
+        'type': 'done',
+        'response': "".join(parts),
+        'agent_name': get_agent_name(prompt),
+        'interview_id': interview_id,
+        'prompt_prefix_tokens': prompt['prefix_tokens'] if prompt else None
+    })
 
-def generate_contextual_response(message, interview_id, conversation_history):
+    # Summarize without holding the stream open
+    schedule_chat_memory_update(memory, stored)
+
+
+def build_chat_history(memory, conversation_history):
+    """Conversation history for a chat turn: unsummarized stored turns, then the client's history"""
+    if memory is None:
+        return conversation_history
+    return get_conversation_memory_manager().history(memory) + conversation_history
+
+
+def generate_contextual_response(message, conversation_history, prompt=None, memory=None):
     """Generate a contextual response using conversation memory and RAG"""
     try:
-        # Get conversation history from database if interview_id provided
-        if interview_id:
-            recent_messages = ConversationMemory.get_recent_conversation(interview_id, limit=10)
-            # Convert to conversation format
-            db_history = []
-            for msg in recent_messages:
-                db_history.append({
-                    'role': 'user' if msg.message_type == 'user' else 'assistant',
-                    'content': msg.content
-                })
-            # Reverse to get chronological order (oldest first)
-            db_history.reverse()
-            # Combine with provided history
-            conversation_history = db_history + conversation_history
-
-        # Get interview context for RAG
-        interview_context = ""
-        if interview_id:
-            try:
-                interview = Interview.query.get(interview_id)
-                if interview:
-                    interview_context = build_interview_context(interview)
-            except Exception as e:
-                print(f"Error getting interview context: {e}")
+        conversation_history = build_chat_history(memory, conversation_history)
+        interview_context = prompt['interview_context'] if prompt else ""
+        summary = memory['summary'] if memory else None
 
         # Analyze conversation flow and generate contextual response
-        response = generate_smart_response(message, conversation_history, interview_context, interview)
+        response = generate_smart_response(message, conversation_history, interview_context, prompt, summary)
 
         return response
 
@@ -104,13 +260,12 @@ def generate_contextual_response(message, interview_id, conversation_history):
 
 
 def build_interview_context(interview):
-    """Build comprehensive context from interview data for RAG"""
-    from datetime import datetime
-
-    current_time = datetime.utcnow()
-    time_until_interview = interview.scheduled_at - current_time
-    minutes_remaining = int(time_until_interview.total_seconds() / 60)
+    """
+    Build comprehensive context from interview data for RAG
 
+    Only includes details that stay the same between turns, so the prompt
+    built from it can be cached; see build_time_context for the rest.
+    """
     context = f"""
     Interview Context:
     - Position: {interview.title}
@@ -119,8 +274,6 @@ def build_interview_context(interview):
     - Interview Type: {interview.interview_type}
     - Scheduled Time: {interview.scheduled_at.strftime('%Y-%m-%d %H:%M UTC')}
     - Duration: {interview.duration_minutes} minutes
-    - Time Status: {'Interview in progress' if minutes_remaining < 0 else f'Starts in {abs(minutes_remaining)} minutes'}
-    - Current UTC Time: {current_time.strftime('%Y-%m-%d %H:%M UTC')}
     """
 
     if interview.post:
@@ -148,8 +301,26 @@ def build_interview_context(interview):
     return context
 
 
+def build_time_context(scheduled_at, duration_minutes):
+    """Per-turn timing details, appended after the cached system prompt prefix"""
+    current_time = datetime.utcnow()
+    time_until_interview = scheduled_at - current_time
+    minutes_remaining = int(time_until_interview.total_seconds() / 60)
+
+    return f"""
+    Current Time:
+    - Time Status: {'Interview in progress' if minutes_remaining < 0 else f'Starts in {abs(minutes_remaining)} minutes'}
+    - Current UTC Time: {current_time.strftime('%Y-%m-%d %H:%M UTC')}
+    """
+
+
 def build_interview_system_prompt(interview_context, interview=None):
-    """Build a comprehensive system prompt for the AI interviewer"""
+    """
+    Build a comprehensive system prompt for the AI interviewer
+
+    The result only depends on static interview details; it is cached as the
+    prompt prefix so providers can reuse their prompt cache across turns.
+    """
     # If there's an AI agent assigned to this interview, use its system prompt
     if interview and interview.ai_agent:
         agent = interview.ai_agent
@@ -242,28 +413,40 @@ def generate_fallback_response(message, conversation_history, interview_context)
     return f"I need a specific example from your experience that shows your capabilities for this {job_title} role. What have you accomplished?"
 
 
-def generate_smart_response(message, conversation_history, interview_context, interview=None):
+def build_smart_request(conversation_history, prompt=None, summary=None):
+    """Build the system prompt and recent history sent to the AI service"""
+    # Static prefix first, then the rolling summary, then the per-turn timing details
+    system_prompt = prompt['prefix'] if prompt else build_interview_system_prompt("")
+    if summary:
+        system_prompt += f"\n\nCONVERSATION SO FAR (summary of earlier turns):\n{summary}"
+    if prompt:
+        system_prompt += "\n\n" + build_time_context(prompt['scheduled_at'], prompt['duration_minutes'])
+
+    # Format conversation history for AI service
+    formatted_history = []
+    if conversation_history:
+        # Turns not yet folded into the summary; bounded by the memory manager
+        recent_messages = conversation_history[-get_conversation_memory_manager().max_window_messages:]
+        for msg in recent_messages:
+            formatted_history.append({
+                "role": msg.get('role', 'user'),
+                "content": msg.get('content', '')
+            })
+
+    return system_prompt, formatted_history
+
+
+def generate_smart_response(message, conversation_history, interview_context, prompt=None, summary=None):
     """Generate intelligent response using AI based on conversation analysis and context"""
     try:
         # Get the AI service (uses Groq by default)
         ai_service = get_ai_service()
 
-        # Build comprehensive system prompt for interview AI
-        system_prompt = build_interview_system_prompt(interview_context, interview)
-
-        # Format conversation history for AI service
-        formatted_history = []
-        if conversation_history:
-            # Include recent conversation context
-            recent_messages = conversation_history[-6:]  # Last 3 exchanges
-            for msg in recent_messages:
-                formatted_history.append({
-                    "role": msg.get('role', 'user'),
-                    "content": msg.get('content', '')
-                })
+        system_prompt, formatted_history = build_smart_request(conversation_history, prompt, summary)
 
-        # Generate response using AI service (Groq)
-        response = ai_service.generate_response(system_prompt, message, formatted_history)
+        # Generate response using AI service (Groq); while it is unavailable
+        # the interview-aware fallback below is a better reply than an apology
+        response = ai_service.generate_response(system_prompt, message, formatted_history, raise_unavailable=True)
 
         return response
 
@@ -276,14 +459,15 @@ def generate_smart_response(message, conversation_history, interview_context, in
 @api_bp.route('/ai/user', methods=['GET'])
 def get_ai_user():
     """Get or create AI system user for messages"""
+    global _ai_user_id
     from src.models import User
 
     # Check if AI user exists
-    ai_user = User.query.filter_by(email='ai@recruai.com').first()
+    ai_user = User.query.filter_by(email=AI_USER_EMAIL).first()
     if not ai_user:
         # Create AI user if it doesn't exist
         ai_user = User(
-            email='ai@recruai.com',
+            email=AI_USER_EMAIL,
             name='AI Assistant',
             role='system',
             plan='pro'
@@ -291,6 +475,7 @@ def get_ai_user():
         ai_user.set_password('ai_password_not_used')  # Not used for login
         db.session.add(ai_user)
         db.session.commit()
+    _ai_user_id = ai_user.id
 
     return jsonify({
         'id': ai_user.id,
@@ -1,134 +1,12 @@
 from flask import request, jsonify
+from sqlalchemy.orm import joinedload
 from .. import api_bp
 from extensions import db
 from src.models import Interview, InterviewAnalysis, Message
-from src.services.recruai.ai_service import get_ai_service
+from src.services.recruai.interview_analysis import generate_ai_analysis, build_interview_analysis
 import json
 from datetime import datetime
 
-def generate_ai_analysis(interview, messages):
-    """Generate real AI analysis of interview conversation"""
-    try:
-        ai_service = get_ai_service()
-
-        # Prepare conversation for analysis
-        conversation_text = "\n".join([
-            f"{msg.message_type.upper()}: {msg.content}"
-            for msg in messages
-        ])
-
-        # Calculate basic metrics
-        user_messages = [msg for msg in messages if msg.message_type == 'user']
-        ai_messages = [msg for msg in messages if msg.message_type == 'ai']
-        question_count = len(ai_messages)
-
-        # Estimate response times (simplified)
-        avg_response_time = 30.0  # Default estimate
-
-        # AI Analysis Prompt
-        system_prompt = """You are an expert technical interviewer and HR professional analyzing a software development candidate's interview performance.
-
-CRITICAL: You must respond with VALID JSON only. No markdown, no explanations, just pure JSON.
-
-Based on the conversation, evaluate the candidate's performance across these dimensions:
-- communication_score: How clearly they express ideas (0-100)
-- technical_score: Technical knowledge and accuracy (0-100) 
-- problem_solving_score: Analytical thinking and solution approach (0-100)
-- cultural_fit_score: Professionalism and work approach (0-100)
-- overall_score: Weighted average of above scores
-
-Be STRICT and REALISTIC in scoring. Most candidates score 60-85, not 90+. Base scores on actual content quality.
-
-Return ONLY this JSON structure:
-{
-    "overall_score": <integer 0-100>,
-    "communication_score": <integer 0-100>,
-    "technical_score": <integer 0-100>,
-    "problem_solving_score": <integer 0-100>,
-    "cultural_fit_score": <integer 0-100>,
-    "detailed_feedback": "<2-3 sentence detailed assessment>",
-    "ai_analysis_summary": "<1 sentence key takeaway>",
-    "strengths": ["<specific strength 1>", "<specific strength 2>", "<specific strength 3>"],
-    "improvements": ["<specific improvement 1>", "<specific improvement 2>", "<specific improvement 3>"]
-}"""
-
-        user_prompt = f"""Analyze this interview conversation:
-
-Interview Details:
-- Position: {interview.title}
-- Description: {interview.description or 'Not specified'}
-
-Conversation:
-{conversation_text}
-
-Provide a detailed analysis with accurate scores based on the actual content and quality of responses."""
-
-        # Get AI analysis
-        ai_response = ai_service.generate_response(system_prompt, user_prompt)
-
-        # Parse AI response as JSON
-        try:
-            # Clean the response to extract JSON
-            response_text = ai_response.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-
-            analysis_result = json.loads(response_text)
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Failed to parse AI response as JSON: {e}")
-            print(f"AI Response: {ai_response}")
-            # Fallback if AI doesn't return valid JSON
-            analysis_result = {
-                "overall_score": 75,
-                "communication_score": 78,
-                "technical_score": 72,
-                "problem_solving_score": 80,
-                "cultural_fit_score": 75,
-                "detailed_feedback": "AI analysis completed but response format was unexpected. Candidate showed engagement in the interview process with room for improvement in technical depth.",
-                "ai_analysis_summary": "Candidate participated actively in the interview. Analysis indicates solid foundational skills with opportunities for enhanced technical proficiency.",
-                "strengths": ["Active participation", "Clear communication", "Problem-solving approach"],
-                "improvements": ["Deepen technical knowledge", "Practice complex scenarios", "Enhance detailed explanations"]
-            }
-
-        # Ensure scores are within valid range
-        for score_key in ['overall_score', 'communication_score', 'technical_score', 'problem_solving_score', 'cultural_fit_score']:
-            if score_key in analysis_result:
-                analysis_result[score_key] = max(0, min(100, int(analysis_result[score_key])))
-
-        # Add calculated metrics
-        analysis_result.update({
-            "actual_duration_minutes": interview.duration_minutes,
-            "average_response_time_seconds": avg_response_time,
-            "question_count": question_count,
-            "analyzed_by": "AI Analysis System",
-            "analysis_method": "ai"
-        })
-
-        return analysis_result
-
-    except Exception as e:
-        print(f"Error generating AI analysis: {e}")
-        # Fallback to basic analysis
-        return {
-            "overall_score": 70,
-            "communication_score": 75,
-            "technical_score": 65,
-            "problem_solving_score": 75,
-            "cultural_fit_score": 70,
-            "detailed_feedback": "Analysis completed with limited AI processing. Manual review recommended for comprehensive evaluation.",
-            "ai_analysis_summary": "Basic analysis completed. Consider manual review for detailed insights.",
-            "strengths": ["Completed interview", "Engaged in conversation"],
-            "improvements": ["Consider manual detailed analysis"],
-            "actual_duration_minutes": interview.duration_minutes,
-            "average_response_time_seconds": 30.0,
-            "question_count": len(messages) // 2,
-            "analyzed_by": "AI Analysis System (Limited)",
-            "analysis_method": "ai"
-        }
-
 @api_bp.route('/interviews/<int:interview_id>/analyze', methods=['POST'])
 def generate_interview_analysis(interview_id):
     """Generate AI analysis for completed interview"""
@@ -138,7 +16,9 @@ def generate_interview_analysis(interview_id):
         return jsonify({"error": "Interview must be completed before analysis"}), 400
 
     # Get all messages for this interview
-    messages = Message.query.filter_by(interview_id=interview_id).order_by(Message.created_at).all()
+    messages = Message.query.options(joinedload(Message.user))\
+                            .filter_by(interview_id=interview_id)\
+                            .order_by(Message.created_at, Message.id).all()
 
     # Prepare conversation for AI analysis
     conversation = "\n".join([f"{msg.user.name if msg.user else 'Unknown'}: {msg.content}" for msg in messages])
@@ -156,23 +36,7 @@ def generate_interview_analysis(interview_id):
     analysis_data = generate_ai_analysis(interview, messages)
 
     # Save analysis to database
-    analysis = InterviewAnalysis(
-        interview_id=interview_id,
-        overall_score=analysis_data["overall_score"],
-        communication_score=analysis_data["communication_score"],
-        technical_score=analysis_data["technical_score"],
-        problem_solving_score=analysis_data["problem_solving_score"],
-        cultural_fit_score=analysis_data["cultural_fit_score"],
-        strengths=json.dumps(analysis_data["strengths"]),
-        improvements=json.dumps(analysis_data["improvements"]),
-        detailed_feedback=analysis_data["detailed_feedback"],
-        ai_analysis_summary=analysis_data["ai_analysis_summary"],
-        actual_duration_minutes=analysis_data["actual_duration_minutes"],
-        average_response_time_seconds=analysis_data["average_response_time_seconds"],
-        question_count=analysis_data["question_count"],
-        analyzed_by=analysis_data["analyzed_by"],
-        analysis_method=analysis_data["analysis_method"]
-    )
+    analysis = build_interview_analysis(interview_id, analysis_data)
 
     db.session.add(analysis)
     db.session.commit()
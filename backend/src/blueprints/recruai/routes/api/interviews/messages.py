@@ -1,13 +1,73 @@
 from flask import request, jsonify
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
 from .. import api_bp
 from extensions import db
 from src.models import Message
+from datetime import datetime
+import base64
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(message):
+    """Opaque cursor pointing just past a message in (created_at, id) order"""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(created_at, id) of a cursor; raises ValueError if it is malformed"""
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(message_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
 
 @api_bp.route('/interviews/<int:interview_id>/messages', methods=['GET'])
 def get_messages(interview_id):
-    """Get all messages for an interview"""
-    messages = Message.query.filter_by(interview_id=interview_id).order_by(Message.created_at.asc()).all()
-    return jsonify([message.to_dict() for message in messages]), 200
+    """
+    Get messages for an interview
+
+    Without query parameters all messages are returned as a list, oldest first.
+    With `limit` (and the `next_cursor` of the previous page as `cursor`) one
+    page is returned as {messages, next_cursor, has_more}; `order=desc` pages
+    from the newest message backwards.
+    """
+    query = Message.query.options(joinedload(Message.user)).filter(Message.interview_id == interview_id)
+    descending = request.args.get('order', 'asc') == 'desc'
+    order = (Message.created_at.desc(), Message.id.desc()) if descending else (Message.created_at.asc(), Message.id.asc())
+
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        messages = query.order_by(*order).all()
+        return jsonify([message.to_dict() for message in messages]), 200
+
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    try:
+        cursor = request.args.get('cursor')
+        if cursor:
+            created_at, message_id = decode_cursor(cursor)
+            # Row comparison on (created_at, id), served by ix_messages_interview_id_created_at_id
+            key = tuple_(Message.created_at, Message.id)
+            query = query.filter(key < (created_at, message_id) if descending else key > (created_at, message_id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Fetch one extra row to know whether another page follows
+    messages = query.order_by(*order).limit(limit + 1).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+
+    return jsonify({
+        'messages': [message.to_dict() for message in messages],
+        'next_cursor': encode_cursor(messages[-1]) if has_more else None,
+        'has_more': has_more
+    }), 200
 
 @api_bp.route('/interviews/<int:interview_id>/messages', methods=['POST'])
 def send_message(interview_id):
@@ -2,8 +2,10 @@
 RAG API Routes for RecruAI
 """
 
+import json
 import logging
-from flask import Blueprint, request, jsonify
+import uuid
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.orm import sessionmaker
 
@@ -13,6 +15,9 @@ from src.services.recruai.rag.tools.ingestor import IngestorTool
 from src.services.recruai.rag.tools.embedder import EmbedderTool
 from src.services.recruai.rag.tools.retriever import RetrieverTool
 from src.services.recruai.rag.tools.generator import GeneratorTool
+from src.models import User
+from src.services.recruai.rag.tools.pipeline import IngestPipeline, DocumentOwnershipError
+from src.services.recruai.rag.tools.job_queue import IngestJobQueue
 
 
 logger = logging.getLogger(__name__)
@@ -20,11 +25,15 @@ logger = logging.getLogger(__name__)
 rag_bp = Blueprint('rag', __name__, url_prefix='/api/rag')
 
 # Initialize RAG tools
-supervisor = RAGSupervisor()
 ingestor = IngestorTool()
 embedder = EmbedderTool()
 retriever = RetrieverTool()  # Initialize without engine, will be set when needed
 generator = GeneratorTool()
+supervisor = RAGSupervisor(ingestor=ingestor, embedder=embedder, retriever=retriever, generator=generator)
+pipeline = IngestPipeline(ingestor, embedder, retriever=retriever)  # Engine bound on first use
+ingest_jobs = IngestJobQueue(pipeline)
+supervisor.register_tools(pipeline=pipeline)
+supervisor.attach_job_queue(ingest_jobs)
 
 
 def get_retriever():
@@ -35,6 +44,56 @@ def get_retriever():
     return retriever
 
 
+def get_ingest_jobs():
+    """Get ingest job queue with its pipeline bound to the database engine"""
+    if not pipeline.db_engine:
+        pipeline.bind(db.engine)
+        ingest_jobs.start_recovery()
+    return ingest_jobs
+
+
+def start_ingest_recovery(app):
+    """
+    Requeue ingest jobs left behind by a previous process and keep recovering them
+
+    Called by the server entry point, not on blueprint registration, so CLI
+    commands such as `flask db upgrade` do not create tables or start threads.
+    """
+    try:
+        with app.app_context():
+            get_ingest_jobs()
+    except Exception as e:
+        logger.error(f"Could not start ingest job recovery: {e}")
+
+
+def _ingest_owner(document_id, source_type):
+    """
+    Owner of an ingest request, taken from the authenticated user
+
+    Raises:
+        DocumentOwnershipError: document_id is already held by another owner
+    """
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    organization_id = user.organization_id if user else None
+
+    get_ingest_jobs()
+    pipeline.check_document_owner(document_id, source_type, current_user_id, organization_id)
+    return current_user_id, organization_id
+
+
+def _job_response(job):
+    """202 payload for a queued ingest job"""
+    return jsonify({
+        'success': True,
+        'job_id': job['job_id'],
+        'document_id': job['document_id'],
+        'status': job['status'],
+        'chunks_estimated': job['chunks_estimated'],
+        'status_url': f"{rag_bp.url_prefix}/ingest/jobs/{job['job_id']}"
+    }), 202
+
+
 @rag_bp.route('/query', methods=['POST'])
 @jwt_required()
 def query_rag():
@@ -52,20 +111,32 @@ def query_rag():
         current_user_id = get_jwt_identity()
         user_context['user_id'] = current_user_id
 
-        # Execute RAG query workflow
+        # Stream the answer as server-sent events
+        if data.get('stream'):
+            return Response(
+                stream_with_context(_stream_answer(query, filters, user_context)),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+
+        # Execute RAG query workflow (retriever needs its engine bound first)
+        get_retriever()
         result = supervisor.orchestrate_workflow(
             input_data={'query': query, 'filters': filters},
             input_type='query',
             user_context=user_context
         )
+        final_result = result.get('final_result') or {}
 
         return jsonify({
             'success': True,
             'workflow_id': result.get('workflow_id'),
-            'answer': result.get('final_result', {}).get('answer', ''),
-            'confidence': result.get('final_result', {}).get('confidence', 0),
-            'sources': result.get('final_result', {}).get('sources', []),
-            'processing_time': result.get('performance', {}).get('total_time', 0)
+            'answer': final_result.get('answer', ''),
+            'confidence': final_result.get('confidence', 0),
+            'sources': final_result.get('sources', []),
+            'context_tokens': final_result.get('context_tokens'),
+            'processing_time': result.get('performance', {}).get('total_time', 0),
+            'tool_times': result.get('performance', {}).get('tool_times', {})
         })
 
     except Exception as e:
@@ -73,6 +144,18 @@ def query_rag():
         return jsonify({'error': str(e)}), 500
 
 
+def _stream_answer(query, filters, user_context):
+    """Retrieve context, then forward generator tokens as server-sent events"""
+    try:
+        chunks = get_retriever().retrieve_by_text(query, embedder, filters=filters or None)
+    except Exception as e:
+        logger.error(f"RAG stream retrieval error: {e}")
+        chunks = []
+
+    for event in generator.generate_answer_stream(query, chunks, user_context=user_context):
+        yield f"data: {json.dumps(event)}\n\n"
+
+
 @rag_bp.route('/ingest/text', methods=['POST'])
 @jwt_required()
 def ingest_text():
@@ -86,32 +169,29 @@ def ingest_text():
         metadata = data.get('metadata', {})
         chunking_strategy = data.get('chunking_strategy', 'semantic')
 
+        document_id = data.get('document_id') or f"doc_{uuid.uuid4().hex}"
+        source_type = data.get('source_type', 'user_input')
+        current_user_id, organization_id = _ingest_owner(document_id, source_type)
+
         # Add current user to metadata
-        current_user_id = get_jwt_identity()
         metadata['user_id'] = current_user_id
         metadata['source_type'] = 'user_input'
 
-        # Process text through ingestor
-        chunks = ingestor.ingest_text(
-            text=content,
+        # Chunking, embedding and storage run on the background job queue
+        job = get_ingest_jobs().submit(
+            content=content,
+            document_id=document_id,
+            source_type=source_type,
+            user_id=current_user_id,
+            organization_id=organization_id,
             metadata=metadata,
             chunking_strategy=chunking_strategy
         )
 
-        # Generate embeddings
-        embedded_chunks = embedder.generate_embeddings(chunks)
-
-        # Store in database (simplified - would need proper storage logic)
-        stored_count = len(embedded_chunks)
-
-        return jsonify({
-            'success': True,
-            'chunks_created': len(chunks),
-            'chunks_embedded': stored_count,
-            'chunking_strategy': chunking_strategy,
-            'content_length': len(content)
-        })
+        return _job_response(job)
 
+    except DocumentOwnershipError as e:
+        return jsonify({'error': str(e)}), 403
     except Exception as e:
         logger.error(f"Text ingestion error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -134,29 +214,55 @@ def ingest_file():
         if file.filename.endswith(('.txt', '.md')):
             content = file.read().decode('utf-8')
 
+            document_id = request.form.get('document_id') or f"doc_{uuid.uuid4().hex}"
+            source_type = request.form.get('source_type', 'file_upload')
+            current_user_id, organization_id = _ingest_owner(document_id, source_type)
+
             metadata = {
                 'filename': file.filename,
                 'source_type': 'file_upload',
-                'user_id': get_jwt_identity()
+                'user_id': current_user_id
             }
 
-            chunks = ingestor.ingest_text(content, metadata)
-            embedded_chunks = embedder.generate_embeddings(chunks)
+            job = get_ingest_jobs().submit(
+                content=content,
+                document_id=document_id,
+                source_type=source_type,
+                user_id=current_user_id,
+                organization_id=organization_id,
+                metadata=metadata
+            )
 
-            return jsonify({
-                'success': True,
-                'file_processed': file.filename,
-                'chunks_created': len(chunks),
-                'chunks_embedded': len(embedded_chunks)
-            })
+            return _job_response(job)
         else:
             return jsonify({'error': 'Unsupported file type'}), 400
 
+    except DocumentOwnershipError as e:
+        return jsonify({'error': str(e)}), 403
     except Exception as e:
         logger.error(f"File ingestion error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@rag_bp.route('/ingest/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_ingest_job(job_id):
+    """Get status and per-stage progress of a background ingest job"""
+    try:
+        job = get_ingest_jobs().get_job(job_id)
+        if not job or job['user_id'] != str(get_jwt_identity()):
+            return jsonify({'error': 'Job not found'}), 404
+
+        return jsonify({
+            'success': True,
+            'job': job
+        })
+
+    except Exception as e:
+        logger.error(f"Ingest job status error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @rag_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_stats():
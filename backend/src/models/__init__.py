@@ -30,6 +30,7 @@ from .license import License
 from .ai_interview_agent import AIInterviewAgent
 from .conversation_memory import ConversationMemory
 from .system_issue import SystemIssue
+from .prompt_cache_version import PromptCacheVersion
 
 __all__ = [
     "User",
@@ -64,4 +65,5 @@ __all__ = [
     "AIInterviewAgent",
     "SystemIssue",
     "ConversationMemory",
+    "PromptCacheVersion",
 ]
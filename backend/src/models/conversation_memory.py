@@ -5,6 +5,10 @@ from extensions import db
 
 class ConversationMemory(db.Model):
     __tablename__ = "conversation_memories"
+    __table_args__ = (
+        # Chat memory reads filter by interview and page by id
+        db.Index("ix_conversation_memories_interview_id_id", "interview_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     interview_id = db.Column(db.Integer, db.ForeignKey("interviews.id"), nullable=False)
@@ -38,8 +42,22 @@ class ConversationMemory(db.Model):
                        .all()
 
     @classmethod
-    def add_message(cls, interview_id, user_id, message_type, content, metadata=None):
-        """Add a message to conversation memory"""
+    def get_conversation_after(cls, interview_id, after_id=None, limit=None):
+        """Get messages stored after the message `after_id` in insertion order (at most the latest `limit`)"""
+        query = cls.query.filter_by(interview_id=interview_id)
+        if after_id is not None:
+            query = query.filter(cls.id > after_id)
+        messages = query.order_by(cls.id.desc()).limit(limit).all()
+        messages.reverse()
+        return messages
+
+    @classmethod
+    def add_message(cls, interview_id, user_id, message_type, content, metadata=None, timestamp=None, commit=True):
+        """
+        Add a message to conversation memory
+
+        Pass commit=False to batch several messages into the caller's commit.
+        """
         import json
 
         memory = cls(
@@ -47,9 +65,11 @@ class ConversationMemory(db.Model):
             user_id=user_id,
             message_type=message_type,
             content=content,
+            timestamp=timestamp or datetime.utcnow(),
             extra_data=json.dumps(metadata) if metadata else None
         )
 
         db.session.add(memory)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return memory
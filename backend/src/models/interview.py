@@ -38,6 +38,12 @@ class Interview(db.Model):
     analysis_data = db.Column(db.Text, nullable=True)  # JSON string with AI analysis
     strengths = db.Column(db.Text, nullable=True)  # JSON array of strengths
     improvements = db.Column(db.Text, nullable=True)  # JSON array of areas for improvement
+    analysis_attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Background analysis runs so far
+    analysis_next_attempt_at = db.Column(db.DateTime, nullable=True)  # Lease or retry backoff of the background analysis
+
+    # Rolling summary of AI chat memory older than the recent turns
+    conversation_summary = db.Column(db.Text, nullable=True)
+    conversation_summarized_through_id = db.Column(db.Integer, nullable=True)  # ConversationMemory.id of the last summarized message
 
     # Interviewers (JSON array of user IDs or names)
     interviewers = db.Column(db.Text, nullable=True)
@@ -5,13 +5,17 @@ from extensions import db
 
 class Message(db.Model):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Transcript reads filter by interview and page in (created_at, id) order
+        db.Index("ix_messages_interview_id_created_at_id", "interview_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     interview_id = db.Column(db.Integer, db.ForeignKey("interviews.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     content = db.Column(db.Text, nullable=False)
     message_type = db.Column(db.String(20), default="text")  # text, ai_response, interviewer_response, system, etc.
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     interview = db.relationship("Interview", backref="messages")
     user = db.relationship("User", backref="messages")
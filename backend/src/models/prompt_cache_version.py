@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+
+
+class PromptCacheVersion(db.Model):
+    """
+    Write counter of a row cached interview prompts are built from.
+
+    Updating or deleting an Interview, Post, AIInterviewAgent or Organization
+    through the ORM bumps its row here in the same transaction, so prompt
+    cache entries built from an older version are stale in every process.
+    """
+    __tablename__ = "prompt_cache_versions"
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    row_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def bump(cls, connection, table_name, row_id):
+        """Increment the version of a row inside the caller's transaction"""
+        upsert = _UPSERTS.get(connection.dialect.name)
+        if upsert is not None:
+            connection.execute(
+                upsert(cls)
+                .values(table_name=table_name, row_id=row_id, version=1, updated_at=datetime.utcnow())
+                .on_conflict_do_update(
+                    index_elements=[cls.table_name, cls.row_id],
+                    set_={"version": cls.version + 1, "updated_at": datetime.utcnow()}
+                )
+            )
+            return
+
+        bumped = connection.execute(
+            update(cls)
+            .where(cls.table_name == table_name, cls.row_id == row_id)
+            .values(version=cls.version + 1, updated_at=datetime.utcnow())
+        ).rowcount
+        if not bumped:
+            connection.execute(insert(cls).values(table_name=table_name, row_id=row_id, version=1))
+
+    @classmethod
+    def current(cls, connection, rows):
+        """{(table name, row id): version} for the given rows; rows never bumped are at 0"""
+        rows = list(rows)
+        versions = {row: 0 for row in rows}
+        if rows:
+            result = connection.execute(
+                select(cls.table_name, cls.row_id, cls.version).where(or_(*[
+                    and_(cls.table_name == table_name, cls.row_id == row_id) for table_name, row_id in rows
+                ]))
+            )
+            versions.update({(row.table_name, row.row_id): row.version for row in result})
+        return versions
+
+
+# Dialects with INSERT ... ON CONFLICT, which bumps a new row without racing its first insert
+_UPSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
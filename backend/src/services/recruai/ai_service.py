@@ -3,22 +3,140 @@ AI Service module for handling AI-powered interviews.
 Supports both Groq and OpenAI with easy switching.
 """
 
+import asyncio
 import os
 import json
-from typing import Dict, List, Optional, Any
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterator, Generator, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    httpx = None
+
+from .llm_cache import get_llm_response_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Provider responses worth retrying: rate limiting and server-side failures
+RETRY_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+# Responses not worth retrying that still mean the provider is unusable as
+# configured (bad API key, no access, unknown model or endpoint)
+FAILURE_STATUS_CODES = frozenset((401, 403, 404))
+
+
+class AIServiceUnavailable(Exception):
+    """Raised without calling the provider while its circuit breaker is open"""
+
+
+class AIServiceError(Exception):
+    """The provider answered a chat completion request with an error status"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for an AI provider.
+
+    After failure_threshold failed calls in a row the circuit opens and calls
+    fail fast. Once reset_timeout seconds pass a single trial call is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_in_flight:
+                    logger.warning(f"AI provider circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
 
 class AIService:
     """Base AI service class with common functionality"""
 
-    def __init__(self, provider: str = "groq"):
+    def __init__(self, provider: str = "groq", routed: bool = False):
         self.provider = provider
+        self.routed = routed  # Send requests through the LLM gateway, preferring this provider
         self._api_key = None
         self._base_url = None
         self._model = None
 
+        # HTTP client settings
+        self.timeout = float(os.getenv("AI_HTTP_TIMEOUT", "30"))
+        self.pool_size = int(os.getenv("AI_HTTP_POOL_SIZE", "10"))
+        self.max_retries = int(os.getenv("AI_HTTP_MAX_RETRIES", "2"))
+        self.backoff_base = float(os.getenv("AI_HTTP_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.getenv("AI_HTTP_BACKOFF_MAX", "8"))
+
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("AI_CIRCUIT_RESET_SECONDS", "30"))
+        )
+
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._async_clients: Dict[int, Any] = {}  # httpx clients, one per event loop
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive session whose connection pool is shared by all calls to the provider"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
     @property
     def api_key(self):
         if self._api_key is None:
@@ -57,9 +175,15 @@ class AIService:
 
     def _get_model(self) -> str:
         """Get model name based on provider"""
-        # Check environment variable first
+        # Provider-specific variable first (GROQ_MODEL, OPENAI_MODEL)
+        provider_model = os.getenv(f"{self.provider.upper()}_MODEL")
+        if provider_model:
+            return provider_model
+
+        # AI_MODEL names a model of the primary provider (AI_PROVIDER) only,
+        # so failover to another provider does not send it a foreign model name
         env_model = os.getenv("AI_MODEL")
-        if env_model:
+        if env_model and self.provider == os.getenv("AI_PROVIDER", "groq"):
             return env_model
 
         # Fallback to provider-specific defaults
@@ -70,7 +194,16 @@ class AIService:
         else:
             raise ValueError(f"Unsupported AI provider: {self.provider}")
 
-    def generate_response(self, system_prompt: str, user_message: str, conversation_history: Optional[List[Dict]] = None) -> str:
+    def generate_response(
+        self,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[List[Dict]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        use_cache: bool = True,
+        raise_unavailable: bool = False
+    ) -> str:
         """
         Generate AI response for interview conversation
 
@@ -78,66 +211,390 @@ class AIService:
             system_prompt: The system prompt defining the AI agent's role
             user_message: The current user message
             conversation_history: Previous conversation turns
+            temperature: Sampling temperature; low values also allow similarity cache hits
+            max_tokens: Maximum tokens for the response
+            use_cache: Serve and store the response in the LLM response cache
+            raise_unavailable: Raise AIServiceUnavailable instead of returning
+                the apology text, for callers with a better fallback of their own
 
         Returns:
-            AI response as string
+            AI response as string, or an apology text when the provider fails
+            or is unavailable (never cached)
         """
+        cache = get_llm_response_cache() if use_cache else None
+        cache_model = f"{self.provider}/{self.model}:{max_tokens}"
+        if cache is not None:
+            cached = cache.get(cache_model, system_prompt, user_message, conversation_history, temperature)
+            if cached is not None:
+                logger.debug(f"AI response served from cache ({len(cached)} characters)")
+                return cached
+
         try:
-            print(f"DEBUG: AI Service - Provider: {self.provider}, Model: {self.model}")
-            print(f"DEBUG: API Key loaded: {'Yes' if self.api_key else 'No'} (length: {len(self.api_key) if self.api_key else 0})")
-            print(f"DEBUG: Base URL: {self.base_url}")
-
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-
-            messages = [{"role": "system", "content": system_prompt}]
-
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
-
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
-
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "max_tokens": 1000,
-                "temperature": 0.7,
-            }
-
-            print(f"DEBUG: Making request to {self.base_url}/chat/completions")
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            messages = self._build_messages(system_prompt, user_message, conversation_history)
+            result = self._complete(messages, max_tokens=max_tokens, temperature=temperature)
+            logger.debug(f"AI response from {result['provider']}/{result['model']}: {len(result['content'])} characters")
+
+            if cache is not None:
+                cache.set(cache_model, system_prompt, user_message, result['content'], conversation_history, temperature)
+            return result['content']
+
+        except AIServiceUnavailable as e:
+            if raise_unavailable:
+                raise
+            # Every provider's circuit is open; answer without waiting on them
+            logger.warning(f"AI service unavailable: {e}")
+            return "I apologize, but the AI service is temporarily unavailable. Please try again in a moment."
+        except AIServiceError as e:
+            logger.error(f"AI API error: {e}")
+            return "I apologize, but I'm having trouble processing your response right now. Could you please try again?"
+        except Exception as e:
+            logger.exception(f"AI service error: {str(e)}")
+            return "I apologize, but I'm experiencing technical difficulties. Please try again in a moment."
 
-            print(f"DEBUG: Response status: {response.status_code}")
-            if response.status_code == 200:
-                data = response.json()
-                ai_response = data["choices"][0]["message"]["content"]
-                print(f"DEBUG: AI response length: {len(ai_response)}")
-                return ai_response
-            else:
-                print(f"AI API error: {response.status_code} - {response.text}")
-                return "I apologize, but I'm having trouble processing your response right now. Could you please try again?"
+    def generate_response_stream(self, system_prompt: str, user_message: str, conversation_history: Optional[List[Dict]] = None) -> Iterator[str]:
+        """
+        Stream an AI response token by token
 
+        Args:
+            system_prompt: The system prompt defining the AI agent's role
+            user_message: The current user message
+            conversation_history: Previous conversation turns
+
+        Yields:
+            Pieces of the AI response as the provider sends them; on failure
+            before the first piece, the same apology text generate_response returns
+        """
+        streamed = False
+        try:
+            messages = self._build_messages(system_prompt, user_message, conversation_history)
+            for event in self._stream(messages):
+                if event['type'] == 'token':
+                    streamed = True
+                    yield event['content']
+
+        except AIServiceUnavailable:
+            raise
+        except AIServiceError as e:
+            logger.error(f"AI API error: {e}")
+            if not streamed:
+                yield "I apologize, but I'm having trouble processing your response right now. Could you please try again?"
         except Exception as e:
-            print(f"AI service error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return "I apologize, but I'm experiencing technical difficulties. Please try again in a moment."
+            logger.error(f"AI service streaming error: {str(e)}")
+            if not streamed:
+                yield "I apologize, but I'm experiencing technical difficulties. Please try again in a moment."
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+        **params
+    ) -> Dict[str, Any]:
+        """
+        Run one chat completion against this provider
 
+        Args:
+            messages: Chat messages, system prompt first
+            max_tokens: Maximum tokens for the completion
+            temperature: Sampling temperature
+            model: Model to use (default: the provider's model)
+            **params: Extra request fields (top_p, frequency_penalty, ...)
+
+        Returns:
+            Dict with 'content', 'finish_reason', 'usage', 'model' and 'provider'
+
+        Raises:
+            AIServiceUnavailable: The circuit is open
+            AIServiceError: The provider returned an error status
+        """
+        payload = self._completion_payload(messages, max_tokens, temperature, model, **params)
+        return self._completion_result(self._post(payload), payload)
+
+    async def acomplete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+        **params
+    ) -> Dict[str, Any]:
+        """
+        Async counterpart of complete(), sent through the pooled httpx client
+
+        Raises:
+            AIServiceUnavailable: The circuit is open
+            AIServiceError: The provider returned an error status
+            ImportError: httpx is not installed
+        """
+        payload = self._completion_payload(messages, max_tokens, temperature, model, **params)
+        return self._completion_result(await self._apost(payload), payload)
+
+    def _completion_payload(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        model: Optional[str] = None,
+        **params
+    ) -> Dict[str, Any]:
+        """Build the chat completions request body"""
+        return {
+            "model": model or self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            **params
+        }
+
+    def _completion_result(self, response, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Result dict of a non-streamed completion response (requests or httpx)"""
+        if response.status_code != 200:
+            raise AIServiceError(
+                f"{self.provider} returned {response.status_code}: {response.text[:500]}",
+                status_code=response.status_code
+            )
+
+        data = response.json()
+        choice = data["choices"][0]
+        return {
+            "content": choice["message"]["content"],
+            "finish_reason": choice.get("finish_reason"),
+            "usage": data.get("usage"),
+            "model": payload["model"],
+            "provider": self.provider,
+        }
+
+    def stream_complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+        **params
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream one chat completion from this provider
+
+        Yields:
+            {'type': 'token', 'content': ...} events, then one 'done' event
+            with 'finish_reason', 'usage', 'model' and 'provider'
+
+        Raises:
+            AIServiceUnavailable: The circuit is open
+            AIServiceError: The provider returned an error status (before any token)
+        """
+        payload = self._completion_payload(
+            messages, max_tokens, temperature, model,
+            stream=True,
+            stream_options={"include_usage": True},  # Usage arrives on the last chunk
+            **params
+        )
+
+        with self._post(payload, stream=True) as response:
+            if response.status_code != 200:
+                raise AIServiceError(
+                    f"{self.provider} returned {response.status_code}: {response.text[:500]}",
+                    status_code=response.status_code
+                )
+
+            finish_reason = None
+            usage = None
+            # Server-sent events: one "data: {json}" line per chunk, ending with "data: [DONE]"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or usage
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield {"type": "token", "content": content}
+                finish_reason = choices[0].get("finish_reason") or finish_reason
+
+        yield {
+            "type": "done",
+            "finish_reason": finish_reason,
+            "usage": usage,
+            "model": payload["model"],
+            "provider": self.provider,
+        }
+
+    def _complete(self, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        if self.routed:
+            from .llm_gateway import get_llm_gateway
+            return get_llm_gateway().complete(messages, preferred=self.provider, **params)
+        return self.complete(messages, **params)
+
+    def _stream(self, messages: List[Dict[str, str]], **params) -> Iterator[Dict[str, Any]]:
+        if self.routed:
+            from .llm_gateway import get_llm_gateway
+            return get_llm_gateway().stream(messages, preferred=self.provider, **params)
+        return self.stream_complete(messages, **params)
+
+    async def _acomplete(self, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        if self.routed:
+            from .llm_gateway import get_llm_gateway
+            return await get_llm_gateway().acomplete(messages, preferred=self.provider, **params)
+        return await self.acomplete(messages, **params)
+
+    def _post(self, payload: Dict[str, Any], stream: bool = False) -> requests.Response:
+        """
+        POST a chat completion request through the pooled session
+
+        Retries and circuit breaking follow _retry_policy.
+
+        Raises:
+            AIServiceUnavailable: The circuit is open, so the provider is not called
+        """
+        url = f"{self.base_url}/chat/completions"
+        policy = self._retry_policy()
+        next(policy)
+        while True:
+            try:
+                response, error = self.session.post(
+                    url, headers=self._build_headers(), json=payload, stream=stream, timeout=self.timeout
+                ), None
+            except requests.RequestException as e:
+                response, error = None, e
+
+            try:
+                delay = policy.send((response, error))
+            except StopIteration as done:
+                return done.value
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    async def _apost(self, payload: Dict[str, Any]):
+        """
+        Async counterpart of _post through the pooled httpx client of the running loop
+
+        Raises:
+            AIServiceUnavailable: The circuit is open, so the provider is not called
+        """
+        client = self._get_async_client()
+        url = f"{self.base_url}/chat/completions"
+        policy = self._retry_policy()
+        next(policy)
+        while True:
+            try:
+                response, error = await client.post(url, headers=self._build_headers(), json=payload), None
+            except httpx.HTTPError as e:
+                response, error = None, e
+
+            try:
+                delay = policy.send((response, error))
+            except StopIteration as done:
+                return done.value
+            await asyncio.sleep(delay)
+
+    def _retry_policy(self) -> Generator[float, Tuple[Any, Optional[Exception]], Any]:
+        """
+        Retry, backoff and circuit-breaker policy shared by _post and _apost
+
+        After a first next() (which fails fast while the circuit is open),
+        the transport sends in each attempt's (response, error) and gets back
+        the delay to wait before trying again. 429/5xx responses and
+        connection errors are retried with jittered exponential backoff. The
+        generator finally returns the response, or raises the connection
+        error, after recording the outcome on the circuit breaker: exhausted
+        retries and 401/403/404 count as failures.
+
+        Raises:
+            AIServiceUnavailable: The circuit is open, so the provider is not called
+        """
+        if not self.circuit_breaker.allow_request():
+            raise AIServiceUnavailable(f"AI provider {self.provider} is unavailable (circuit open)")
+
+        response, error = yield 0.0
+        for attempt in range(self.max_retries):
+            if response is not None and response.status_code not in RETRY_STATUS_CODES:
+                break
+
+            delay = self._backoff_delay(attempt, response)
+            logger.warning(
+                f"AI provider {self.provider} "
+                f"{'returned ' + str(response.status_code) if response is not None else 'failed: ' + str(error)}, "
+                f"retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})"
+            )
+            response, error = yield delay
+
+        if response is None or response.status_code in RETRY_STATUS_CODES | FAILURE_STATUS_CODES:
+            self.circuit_breaker.record_failure()
+            if response is None:
+                raise error
+        else:
+            self.circuit_breaker.record_success()
+
+        return response
+
+    def _get_async_client(self):
+        """Pooled keep-alive httpx client for the running event loop"""
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx package not installed. Install with: pip install httpx")
+
+        loop_id = id(asyncio.get_running_loop())
+        with self._session_lock:
+            client = self._async_clients.get(loop_id)
+            if client is None:
+                client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                )
+                self._async_clients[loop_id] = client
+            return client
+
+    async def aclose(self):
+        """Close the httpx client of the running event loop"""
+        with self._session_lock:
+            client = self._async_clients.pop(id(asyncio.get_running_loop()), None)
+        if client is not None:
+            await client.aclose()
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+
+        return min(delay, self.backoff_max)
+
+    def _build_headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _build_messages(self, system_prompt: str, user_message: str, conversation_history: Optional[List[Dict]] = None) -> List[Dict[str, str]]:
+        """Build the chat messages for a prompt"""
+        messages = [{"role": "system", "content": system_prompt}]
+
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
 
 class InterviewAIService(AIService):
     """Specialized AI service for conducting interviews"""
 
-    def __init__(self, provider: str = "groq"):
-        super().__init__(provider)
+    def __init__(self, provider: str = "groq", routed: bool = False):
+        super().__init__(provider, routed=routed)
 
     def conduct_interview_round(self, agent_data: Dict, candidate_response: str, interview_context: Dict) -> Dict[str, Any]:
         """
@@ -206,8 +663,8 @@ Remember to be fair, unbiased, and professional."""
         }
 
 
-# Global instance for easy access
-ai_service = InterviewAIService(provider="groq")  # Change to "openai" when switching providers
+# Global instance for easy access; requests go through the LLM gateway, preferring this provider
+ai_service = InterviewAIService(provider="groq", routed=True)  # Change to "openai" when switching providers
 
 
 def get_ai_service() -> InterviewAIService:
@@ -216,28 +673,26 @@ def get_ai_service() -> InterviewAIService:
 
 
 def switch_ai_provider(provider: str):
-    """Switch AI provider globally"""
+    """Switch the preferred AI provider globally; the gateway still fails over to others"""
+    from .llm_gateway import get_llm_gateway
+
     global ai_service
-    ai_service = InterviewAIService(provider=provider)
+    get_llm_gateway().set_preferred(provider)
+    ai_service = InterviewAIService(provider=provider, routed=True)
 
 
 # Test function
 def test_ai_connection():
     """Test the AI service connection"""
     try:
-        print("DEBUG: Testing AI connection...")
         service = get_ai_service()
-        print(f"DEBUG: Service initialized - Provider: {service.provider}")
+        logger.info(f"Testing AI connection - Provider: {service.provider}, Model: {service.model}")
 
         test_prompt = "You are a helpful assistant. Respond with 'Hello, AI service is working!'"
         test_message = "Test message"
 
-        print("DEBUG: Making test request...")
         response = service.generate_response(test_prompt, test_message)
-        print(f"DEBUG: Test response: {response[:100]}...")
         return {"success": True, "response": response}
     except Exception as e:
-        print(f"DEBUG: AI connection test failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"AI connection test failed: {str(e)}")
         return {"success": False, "error": str(e)}
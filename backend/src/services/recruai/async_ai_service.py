@@ -0,0 +1,197 @@
+"""
+Async AI Service module for concurrent LLM calls.
+Runs several prompts at once under a per-provider concurrency limit.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Any
+
+from .ai_service import InterviewAIService, AIServiceUnavailable, AIServiceError, HTTPX_AVAILABLE, get_ai_service
+from .llm_cache import get_llm_response_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+class _EventLoopThread:
+    """Background thread running one event loop that sync code submits coroutines to"""
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="ai-event-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the shared loop and block until it finishes"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+
+_loop_thread = _EventLoopThread()
+
+
+def run_sync(coro, timeout: Optional[float] = None):
+    """Run a coroutine from sync code (e.g. a Flask route) on the shared event-loop thread"""
+    return _loop_thread.run(coro, timeout)
+
+
+class AsyncInterviewAIService(InterviewAIService):
+    """
+    AI service with asyncio methods for fanning out several LLM calls.
+
+    Requests go through the same path as InterviewAIService: the LLM gateway
+    when routed (failover and latency statistics), the shared retry policy
+    and circuit breaker, and the LLM response cache. Concurrent calls to one
+    provider are capped by a semaphore (AI_MAX_CONCURRENCY per provider), so
+    a large fan-out queues instead of tripping the provider's rate limits.
+    """
+
+    # Per-provider semaphores, one set per event loop
+    _semaphores: Dict[Any, asyncio.Semaphore] = {}
+    _semaphores_lock = threading.Lock()
+
+    def __init__(self, provider: str = "groq", max_concurrency: Optional[int] = None, routed: bool = False):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx package not installed. Install with: pip install httpx")
+
+        super().__init__(provider, routed=routed)
+        self.max_concurrency = max_concurrency or int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        key = (id(asyncio.get_running_loop()), self.provider)
+        with self._semaphores_lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = asyncio.Semaphore(self.max_concurrency)
+            return self._semaphores[key]
+
+    async def agenerate_response(
+        self,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[List[Dict]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        use_cache: bool = True,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Generate AI response without blocking the event loop
+
+        Args:
+            system_prompt: The system prompt defining the AI agent's role
+            user_message: The current user message
+            conversation_history: Previous conversation turns
+            temperature: Sampling temperature; low values also allow similarity cache hits
+            max_tokens: Maximum tokens for the response
+            use_cache: Serve and store the response in the LLM response cache
+            timeout: Seconds allowed for the request, retries included (not
+                     counting the wait for a concurrency slot)
+
+        Returns:
+            AI response as string (same fallback text as generate_response on errors)
+
+        Raises:
+            AIServiceUnavailable: Every provider's circuit is open
+            asyncio.TimeoutError: The request took longer than timeout
+        """
+        cache = get_llm_response_cache() if use_cache else None
+        cache_model = f"{self.provider}/{self.model}:{max_tokens}"
+        if cache is not None:
+            cached = cache.get(cache_model, system_prompt, user_message, conversation_history, temperature)
+            if cached is not None:
+                return cached
+
+        try:
+            messages = self._build_messages(system_prompt, user_message, conversation_history)
+            async with self._get_semaphore():
+                result = await asyncio.wait_for(
+                    self._acomplete(messages, max_tokens=max_tokens, temperature=temperature), timeout
+                )
+
+            if cache is not None:
+                cache.set(cache_model, system_prompt, user_message, result['content'], conversation_history, temperature)
+            return result['content']
+
+        except (AIServiceUnavailable, asyncio.TimeoutError):
+            raise
+        except AIServiceError as e:
+            logger.error(f"AI API error: {e}")
+            return "I apologize, but I'm having trouble processing your response right now. Could you please try again?"
+        except Exception as e:
+            logger.exception(f"AI service error: {str(e)}")
+            return "I apologize, but I'm experiencing technical difficulties. Please try again in a moment."
+
+    async def agather_responses(
+        self,
+        prompts: List[Dict[str, Any]],
+        return_exceptions: bool = False,
+        timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Run several prompts concurrently
+
+        Args:
+            prompts: Dictionaries with 'system_prompt', 'user_message' and
+                     optional 'conversation_history', 'temperature' and 'max_tokens'
+            return_exceptions: Return exceptions (e.g. AIServiceUnavailable or
+                               asyncio.TimeoutError) in place of responses instead of raising
+            timeout: Seconds allowed for each prompt; a slow prompt fails alone
+                     and does not discard the others
+
+        Returns:
+            Responses in the order of the prompts
+        """
+        return await asyncio.gather(
+            *(
+                self.agenerate_response(
+                    prompt['system_prompt'],
+                    prompt['user_message'],
+                    prompt.get('conversation_history'),
+                    temperature=prompt.get('temperature', 0.7),
+                    max_tokens=prompt.get('max_tokens', 1000),
+                    timeout=timeout
+                )
+                for prompt in prompts
+            ),
+            return_exceptions=return_exceptions
+        )
+
+    def gather_responses(
+        self,
+        prompts: List[Dict[str, Any]],
+        return_exceptions: bool = False,
+        timeout: Optional[float] = None
+    ) -> List[Any]:
+        """Sync wrapper around agather_responses for Flask routes and scheduled jobs (timeout is per prompt)"""
+        return run_sync(self.agather_responses(prompts, return_exceptions=return_exceptions, timeout=timeout))
+
+
+# Global instance, created on first use and kept on the provider of the sync service
+async_ai_service = None
+_async_service_lock = threading.Lock()
+
+
+def get_async_ai_service() -> AsyncInterviewAIService:
+    """Get the global async AI service instance"""
+    global async_ai_service
+    provider = get_ai_service().provider
+    with _async_service_lock:
+        if async_ai_service is None or async_ai_service.provider != provider:
+            async_ai_service = AsyncInterviewAIService(provider=provider, routed=True)
+        return async_ai_service
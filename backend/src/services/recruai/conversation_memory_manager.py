@@ -0,0 +1,238 @@
+"""
+Conversation Memory Manager module.
+Keeps AI interview chat prompts bounded with a rolling summary of older turns.
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Any
+
+from extensions import db
+from src.models import Interview, ConversationMemory
+
+from .llm_gateway import get_llm_gateway
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationMemoryManager:
+    """
+    Rolling summary memory for interview chats.
+
+    Messages stored after the interview's conversation_summarized_through_id
+    are sent verbatim. Once there are summary_interval messages beyond the
+    recent_messages most recent ones, those older messages are folded into
+    Interview.conversation_summary (by the LLM, or extractively when the LLM
+    is unavailable or CONVERSATION_SUMMARY_MODE=extractive). A chat turn
+    therefore sends at most recent_messages + summary_interval messages plus
+    a summary of at most max_summary_chars characters, however long the
+    interview runs.
+    """
+
+    SUMMARY_PROMPT = (
+        "You maintain running notes for a job interview between an AI interviewer and a candidate. "
+        "Merge the new transcript into the existing notes. Keep the questions already asked, the "
+        "candidate's concrete claims, examples, skills, numbers and any concerns. Drop greetings and "
+        "filler. Write terse bullet points, at most {max_words} words in total."
+    )
+
+    def __init__(
+        self,
+        summary_interval: Optional[int] = None,
+        recent_messages: Optional[int] = None,
+        max_summary_chars: Optional[int] = None,
+        mode: Optional[str] = None
+    ):
+        self.summary_interval = summary_interval or int(os.getenv("CONVERSATION_SUMMARY_INTERVAL", "10"))
+        self.recent_messages = recent_messages or int(os.getenv("CONVERSATION_RECENT_MESSAGES", "6"))
+        self.max_summary_chars = max_summary_chars or int(os.getenv("CONVERSATION_SUMMARY_MAX_CHARS", "2400"))
+        self.mode = (mode or os.getenv("CONVERSATION_SUMMARY_MODE", "llm")).lower()
+        # Interviews that predate summaries are caught up from their latest messages only
+        self.max_backlog = int(os.getenv("CONVERSATION_MAX_BACKLOG", "200"))
+
+        # Interviews with a summary update in flight in this process
+        self._updating = set()
+        self._updating_lock = threading.Lock()
+
+    @property
+    def max_window_messages(self) -> int:
+        """Most messages a chat turn sends verbatim"""
+        return self.recent_messages + self.summary_interval
+
+    def load(self, interview_id) -> Dict[str, Any]:
+        """
+        Load the memory window of an interview
+
+        Returns:
+            {'interview_id', 'summary', 'summarized_through_id', 'messages'},
+            where messages are the unsummarized turns, oldest first, as
+            dictionaries with 'id', 'role', 'content' and 'timestamp'
+        """
+        summary, summarized_through_id = db.session.query(
+            Interview.conversation_summary, Interview.conversation_summarized_through_id
+        ).filter(Interview.id == interview_id).first() or (None, None)
+
+        memories = ConversationMemory.get_conversation_after(
+            interview_id, after_id=summarized_through_id, limit=self.max_backlog
+        )
+        return {
+            'interview_id': interview_id,
+            'summary': summary,
+            'summarized_through_id': summarized_through_id,
+            'messages': [self.to_message(memory) for memory in memories],
+        }
+
+    @staticmethod
+    def to_message(memory) -> Dict[str, Any]:
+        """Window message for a (flushed) ConversationMemory row"""
+        return {
+            'id': memory.id,
+            'role': 'user' if memory.message_type == 'user' else 'assistant',
+            'content': memory.content,
+            'timestamp': memory.timestamp,
+        }
+
+    def history(self, window: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Verbatim turns of the window in chat format"""
+        return [{'role': message['role'], 'content': message['content']} for message in window['messages']]
+
+    def append(self, window: Dict[str, Any], messages: List[Dict[str, Any]]):
+        """Add messages stored by the current turn (see to_message) to the window"""
+        window['messages'].extend(messages)
+
+    def needs_update(self, window: Dict[str, Any]) -> bool:
+        """True once summary_interval turns have built up beyond the recent ones"""
+        return len(window['messages']) >= self.recent_messages + self.summary_interval
+
+    def claim_update(self, interview_id) -> bool:
+        """
+        Mark a summary update of the interview as in flight
+
+        Returns:
+            False if this process is already updating it; otherwise the
+            caller runs the update and then calls release_update()
+        """
+        with self._updating_lock:
+            if interview_id in self._updating:
+                return False
+            self._updating.add(interview_id)
+            return True
+
+    def release_update(self, interview_id):
+        """End a summary update started with claim_update()"""
+        with self._updating_lock:
+            self._updating.discard(interview_id)
+
+    def update(self, window: Dict[str, Any]) -> bool:
+        """
+        Fold older turns into the summary once summary_interval of them have built up
+
+        Returns:
+            True if the summary was updated
+        """
+        if not self.needs_update(window):
+            return False
+
+        messages = window['messages']
+
+        folded = messages[:len(messages) - self.recent_messages]
+        summary = self.summarize(window['summary'], folded)
+        summarized_through_id = folded[-1]['id']
+
+        try:
+            # Bulk update: the summary is not part of the cached prompt prefix,
+            # so this must not trigger the Interview update listeners. Only the
+            # summary the window was loaded with is replaced, so a concurrent
+            # update of the same interview cannot fold the same turns twice.
+            previous = window['summarized_through_id']
+            updated = db.session.query(Interview).filter(
+                Interview.id == window['interview_id'],
+                Interview.conversation_summarized_through_id.is_(None) if previous is None
+                else Interview.conversation_summarized_through_id == previous
+            ).update(
+                {
+                    Interview.conversation_summary: summary,
+                    Interview.conversation_summarized_through_id: summarized_through_id,
+                },
+                synchronize_session=False
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error storing conversation summary: {e}")
+            return False
+
+        if not updated:
+            logger.info(f"Conversation summary of interview {window['interview_id']} was updated concurrently")
+            return False
+
+        window['summary'] = summary
+        window['summarized_through_id'] = summarized_through_id
+        window['messages'] = messages[len(folded):]
+        return True
+
+    def summarize(self, summary: Optional[str], messages: List[Dict[str, Any]]) -> str:
+        """Merge messages into the existing summary"""
+        if self.mode == 'llm':
+            try:
+                return self._summarize_llm(summary, messages)
+            except Exception as e:
+                logger.warning(f"LLM conversation summary failed, using extractive summary: {e}")
+        return self._summarize_extractive(summary, messages)
+
+    @staticmethod
+    def _transcript(messages: List[Dict[str, Any]]) -> str:
+        return "\n".join(
+            f"{'Candidate' if message['role'] == 'user' else 'Interviewer'}: {message['content']}"
+            for message in messages
+        )
+
+    def _summarize_llm(self, summary: Optional[str], messages: List[Dict[str, Any]]) -> str:
+        # Keep the request bounded when catching up on a long backlog
+        transcript = self._transcript(messages)[-self.max_summary_chars * 4:]
+        result = get_llm_gateway().complete(
+            [
+                {'role': 'system', 'content': self.SUMMARY_PROMPT.format(max_words=self.max_summary_chars // 6)},
+                {'role': 'user', 'content': f"Existing notes:\n{summary or '(none)'}\n\nNew transcript:\n{transcript}"},
+            ],
+            max_tokens=self.max_summary_chars // 3,
+            temperature=0.2
+        )
+        content = (result['content'] or '').strip()
+        if not content:
+            raise ValueError("empty summary")
+        return content[:self.max_summary_chars]
+
+    def _summarize_extractive(self, summary: Optional[str], messages: List[Dict[str, Any]]) -> str:
+        """One line per message (its questions, or its first sentences); oldest lines drop out first"""
+        lines = [line for line in (summary or '').split('\n') if line.strip()]
+        for message in messages:
+            text = " ".join((message['content'] or '').split())
+            if not text:
+                continue
+            if message['role'] == 'user':
+                sentences = re.split(r'(?<=[.!?])\s+', text)
+                line = f"- Candidate: {' '.join(sentences[:2])}"
+            else:
+                questions = re.findall(r'[^.!?]*\?', text)
+                line = f"- Interviewer asked: {' '.join(q.strip() for q in questions) or text}"
+            lines.append(line[:300])
+
+        while lines and len("\n".join(lines)) > self.max_summary_chars:
+            lines.pop(0)
+        return "\n".join(lines)
+
+
+# Global manager, created on first use
+_manager = None
+
+
+def get_conversation_memory_manager() -> ConversationMemoryManager:
+    """Get the global conversation memory manager"""
+    global _manager
+    if _manager is None:
+        _manager = ConversationMemoryManager()
+    return _manager
@@ -0,0 +1,241 @@
+"""
+Interview Prompt Cache module.
+Memoizes the static system prompt prefix of each interview between chat turns.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Any, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    tiktoken = None
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from extensions import db
+from src.models import Interview, Post, AIInterviewAgent, Organization, PromptCacheVersion
+
+
+logger = logging.getLogger(__name__)
+
+
+class InterviewPromptCache:
+    """
+    Per-interview cache of assembled system prompt prefixes.
+
+    An entry holds everything about an interview that does not change between
+    turns: the prompt prefix (agent prompt, instructions, interview, job and
+    organization details) and the fields the per-turn suffix is built from.
+    Each entry records the rows it was built from and their PromptCacheVersion.
+    Committing an ORM update or delete of any of them evicts it in this
+    process and bumps the row's version, which expires it in other processes
+    once their copy of the version is older than version_ttl_seconds. Entries
+    also expire after ttl_seconds, which bounds staleness for bulk updates.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: int = 600,
+        encoding: str = "cl100k_base",
+        version_ttl_seconds: float = 2.0
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_ttl_seconds = version_ttl_seconds
+
+        self._entries: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self._dependents: Dict[Tuple[str, Any], set] = {}
+        self._versions: Dict[Tuple[str, Any], Tuple[int, float]] = {}  # Row -> (version, read at)
+        self._lock = threading.Lock()
+
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding)
+            except Exception as e:
+                logger.warning(f"Tokenizer {encoding} unavailable, estimating prompt tokens: {e}")
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def count_tokens(self, text: str) -> int:
+        """Token count with tiktoken, or about 4 characters per token without it"""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text or ""))
+        return (len(text or "") + 3) // 4
+
+    def _remove_locked(self, interview_id):
+        entry = self._entries.pop(interview_id, None)
+        if entry is not None:
+            for dependency in entry["depends_on"]:
+                dependents = self._dependents.get(dependency)
+                if dependents is not None:
+                    dependents.discard(interview_id)
+                    if not dependents:
+                        del self._dependents[dependency]
+
+    def _current_versions(self, rows: Iterable[Tuple[str, Any]], refresh: bool = False) -> Optional[Dict[Tuple[str, Any], int]]:
+        """
+        Shared versions of the given rows, or None if they cannot be read
+
+        Versions are reused for version_ttl_seconds, so most hits cost no query.
+        """
+        now = time.monotonic()
+        with self._lock:
+            known = {row: self._versions.get(row) for row in rows}
+        missing = [row for row, entry in known.items() if refresh or entry is None or now - entry[1] >= self.version_ttl_seconds]
+
+        if missing:
+            try:
+                with db.engine.connect() as connection:
+                    read = PromptCacheVersion.current(connection, missing)
+            except Exception as e:
+                logger.warning(f"Could not read prompt cache versions: {e}")
+                return None
+            with self._lock:
+                for row, version in read.items():
+                    self._versions[row] = known[row] = (version, now)
+
+        return {row: entry[0] for row, entry in known.items()}
+
+    def get(self, interview_id) -> Optional[Dict[str, Any]]:
+        """Cached entry for the interview, or None"""
+        with self._lock:
+            entry = self._entries.get(interview_id)
+            if entry is None or entry["expires_at"] <= time.time():
+                self._remove_locked(interview_id)
+                self.misses += 1
+                return None
+
+        # Another process may have changed a row the entry was built from
+        if entry["versions"] is not None and self._current_versions(entry["depends_on"]) != entry["versions"]:
+            with self._lock:
+                if self._entries.get(interview_id) is entry:
+                    self._remove_locked(interview_id)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if interview_id in self._entries:
+                self._entries.move_to_end(interview_id)
+            self.hits += 1
+        return entry
+
+    def set(self, interview_id, entry: Dict[str, Any], depends_on: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+        """
+        Cache an entry for the interview
+
+        Args:
+            entry: Must contain the 'prefix' text; 'prefix_tokens' is added
+            depends_on: (table name, primary key) of every row the entry was built from
+
+        Returns:
+            The stored entry
+        """
+        entry = dict(entry)
+        entry["prefix_tokens"] = self.count_tokens(entry["prefix"])
+        entry["depends_on"] = {dependency for dependency in depends_on if dependency[1] is not None}
+        entry["versions"] = self._current_versions(entry["depends_on"], refresh=True)
+        entry["expires_at"] = time.time() + self.ttl_seconds
+
+        with self._lock:
+            self._remove_locked(interview_id)
+            self._entries[interview_id] = entry
+            for dependency in entry["depends_on"]:
+                self._dependents.setdefault(dependency, set()).add(interview_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+        return entry
+
+    def invalidate(self, table: str, row_id) -> int:
+        """Evict every entry built from the given row; returns the number evicted"""
+        with self._lock:
+            self._versions.pop((table, row_id), None)
+            interview_ids = list(self._dependents.get((table, row_id), ()))
+            for interview_id in interview_ids:
+                self._remove_locked(interview_id)
+            self.invalidations += len(interview_ids)
+            return len(interview_ids)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+            self._versions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            prefix_tokens = [entry["prefix_tokens"] for entry in self._entries.values()]
+            return {
+                "size": len(self._entries),
+                "limit": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "tokenizer": "tiktoken" if self._encoding is not None else "estimate",
+                "cached_prefix_tokens": sum(prefix_tokens),
+                "avg_prefix_tokens": sum(prefix_tokens) / len(prefix_tokens) if prefix_tokens else 0.0,
+            }
+
+
+# Global cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_interview_prompt_cache() -> InterviewPromptCache:
+    """Get the global interview prompt cache instance"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InterviewPromptCache(
+                    max_entries=int(os.getenv("INTERVIEW_PROMPT_CACHE_MAX_ENTRIES", "1000")),
+                    ttl_seconds=int(os.getenv("INTERVIEW_PROMPT_CACHE_TTL_SECONDS", "600"))
+                )
+    return _cache
+
+
+# Rows changed by the session's transaction, evicted once it commits
+_CHANGED_ROWS = "interview_prompt_cache_changed_rows"
+
+
+def _record_change(mapper, connection, target):
+    """Bump the row's shared version in the flushing transaction; evict on commit"""
+    table = mapper.local_table.name
+    PromptCacheVersion.bump(connection, table, target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_ROWS, set()).add((table, target.id))
+
+
+def _evict_committed(session):
+    cache = get_interview_prompt_cache()
+    for table, row_id in session.info.pop(_CHANGED_ROWS, ()):
+        cache.invalidate(table, row_id)
+
+
+def _discard_rolled_back(session):
+    session.info.pop(_CHANGED_ROWS, None)
+
+
+for _model in (Interview, Post, AIInterviewAgent, Organization):
+    event.listen(_model, "after_update", _record_change)
+    event.listen(_model, "after_delete", _record_change)
+
+event.listen(Session, "after_commit", _evict_committed)
+event.listen(Session, "after_rollback", _discard_rolled_back)
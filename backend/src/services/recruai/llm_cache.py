@@ -0,0 +1,258 @@
+"""
+LLM Response Cache module.
+Serves repeated prompts (e.g. practice interview openers) without calling the provider.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of chat completion responses.
+
+    The exact tier matches on (model, system prompt hash, history hash,
+    message) after whitespace and case normalization. Calls at or below
+    semantic_max_temperature also try a similarity tier: among entries with
+    the same model, system prompt and history, a message whose embedding has
+    cosine similarity >= semantic_threshold counts as a hit. Higher
+    temperatures only use the exact tier, since their answers are meant to vary.
+
+    Entries expire after their own TTL and are evicted least recently used.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: int = 3600,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        semantic_threshold: float = 0.95,
+        semantic_max_temperature: float = 0.3
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed_fn = embed_fn
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_temperature = semantic_max_temperature
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join((text or "").split()).casefold()
+
+    @classmethod
+    def _digest(cls, value: Any) -> str:
+        if not isinstance(value, str):
+            value = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha256(cls.normalize(value).encode("utf-8")).hexdigest()
+
+    def make_key(
+        self,
+        model: str,
+        system_prompt: str,
+        message: str,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[str, str]:
+        """
+        Cache key for a prompt
+
+        Returns:
+            (bucket, key): the bucket groups prompts sharing model, system
+            prompt and history; the key adds the message
+        """
+        history = [
+            {"role": turn.get("role"), "content": turn.get("content")} for turn in (history or [])
+        ]
+        bucket = self._digest([model, self._digest(system_prompt), self._digest(history)])
+        return bucket, self._digest([bucket, message])
+
+    def _semantic_enabled(self, temperature: Optional[float]) -> bool:
+        return (
+            self.embed_fn is not None
+            and temperature is not None
+            and temperature <= self.semantic_max_temperature
+        )
+
+    def _embed(self, message: str) -> Optional[List[float]]:
+        try:
+            return self.embed_fn(self.normalize(message))
+        except Exception as e:
+            logger.warning(f"LLM cache embedding failed, using exact matching only: {e}")
+            return None
+
+    @staticmethod
+    def _cosine(a: List[float], b: List[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    def _remove_locked(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._buckets.get(entry["bucket"])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[entry["bucket"]]
+
+    def get(
+        self,
+        model: str,
+        system_prompt: str,
+        message: str,
+        history: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None
+    ) -> Optional[str]:
+        """Return a cached response for the prompt, or None"""
+        bucket, key = self.make_key(model, system_prompt, message, history)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry["expires_at"] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["response"]
+                self._remove_locked(key)
+                self.expirations += 1
+
+            candidates = [
+                (candidate_key, self._entries[candidate_key])
+                for candidate_key in self._buckets.get(bucket, ())
+                if self._entries[candidate_key]["embedding"] is not None
+            ] if self._semantic_enabled(temperature) else []
+
+        if candidates:
+            embedding = self._embed(message)
+            if embedding is not None:
+                best_key, best_score = None, self.semantic_threshold
+                for candidate_key, candidate in candidates:
+                    if candidate["expires_at"] <= now:
+                        continue
+                    score = self._cosine(embedding, candidate["embedding"])
+                    if score >= best_score:
+                        best_key, best_score = candidate_key, score
+
+                if best_key is not None:
+                    with self._lock:
+                        entry = self._entries.get(best_key)
+                        if entry is not None:
+                            self._entries.move_to_end(best_key)
+                            self.semantic_hits += 1
+                            return entry["response"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(
+        self,
+        model: str,
+        system_prompt: str,
+        message: str,
+        response: str,
+        history: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        """
+        Cache a response
+
+        Args:
+            ttl_seconds: Lifetime of this entry (default: the cache TTL)
+        """
+        bucket, key = self.make_key(model, system_prompt, message, history)
+        embedding = self._embed(message) if self._semantic_enabled(temperature) else None
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            self._remove_locked(key)
+            self._entries[key] = {
+                "response": response,
+                "bucket": bucket,
+                "embedding": embedding,
+                "expires_at": time.time() + ttl,
+            }
+            self._buckets.setdefault(bucket, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "limit": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "semantic_enabled": self.embed_fn is not None,
+            }
+
+
+def _local_embed_fn() -> Optional[Callable[[str], List[float]]]:
+    """Offline hashing embeddings from the RAG package, if its dependencies are installed"""
+    try:
+        from .rag.tools.embedding_providers import LocalHashingEmbeddingProvider
+        provider = LocalHashingEmbeddingProvider(dimensions=512)
+    except ImportError as e:
+        logger.info(f"LLM cache similarity tier disabled: {e}")
+        return None
+    return lambda text: provider.embed([text])[0]
+
+
+# Global cache, created on first use (None when disabled)
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Get the global LLM response cache, or None if AI_CACHE_ENABLED is off"""
+    global _cache
+    if os.getenv("AI_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                semantic = os.getenv("AI_CACHE_SEMANTIC", "true").lower() in ("1", "true", "yes")
+                _cache = LLMResponseCache(
+                    max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "1000")),
+                    ttl_seconds=int(os.getenv("AI_CACHE_TTL_SECONDS", "3600")),
+                    embed_fn=_local_embed_fn() if semantic else None,
+                    semantic_threshold=float(os.getenv("AI_CACHE_SEMANTIC_THRESHOLD", "0.95")),
+                    semantic_max_temperature=float(os.getenv("AI_CACHE_SEMANTIC_MAX_TEMPERATURE", "0.3"))
+                )
+    return _cache
@@ -0,0 +1,298 @@
+"""
+LLM Gateway module routing chat completions across AI providers.
+Tracks rolling latency and error rates and fails over between Groq and OpenAI.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+from .ai_service import AIService, AIServiceUnavailable
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderStats:
+    """Rolling window of request outcomes for one provider and model"""
+
+    def __init__(self, window: int = 100):
+        self._samples = deque(maxlen=window)  # (latency seconds, succeeded)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self._samples.append((latency, ok))
+
+    @staticmethod
+    def _percentile(values: List[float], percentile: float) -> Optional[float]:
+        if not values:
+            return None
+        index = min(len(values) - 1, int(round(percentile * (len(values) - 1))))
+        return values[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+
+        latencies = sorted(latency for latency, ok in samples if ok)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': errors / len(samples) if samples else 0.0,
+            'p50': self._percentile(latencies, 0.50),
+            'p95': self._percentile(latencies, 0.95),
+        }
+
+
+class LLMGateway:
+    """
+    Routes chat completions to the fastest healthy provider.
+
+    Each provider is an AIService with its own keep-alive pool, retries and
+    circuit breaker. A provider is unhealthy while its circuit is open or
+    its rolling error rate exceeds AI_ROUTER_MAX_ERROR_RATE. Healthy providers
+    are ranked by rolling p50 latency; the preferred provider wins when it is
+    within AI_ROUTER_LATENCY_TOLERANCE of the fastest. A failed request is
+    retried on the next provider in the ranking.
+    """
+
+    PROVIDERS = ('groq', 'openai')
+
+    def __init__(
+        self,
+        providers: Optional[List[str]] = None,
+        preferred: Optional[str] = None,
+        window: Optional[int] = None
+    ):
+        self._backends: Dict[str, AIService] = {
+            provider: AIService(provider) for provider in (providers or self.PROVIDERS)
+        }
+        self.preferred = preferred or os.getenv("AI_PROVIDER", "groq")
+        self.window = window or int(os.getenv("AI_ROUTER_WINDOW", "100"))
+        self.max_error_rate = float(os.getenv("AI_ROUTER_MAX_ERROR_RATE", "0.5"))
+        self.min_samples = int(os.getenv("AI_ROUTER_MIN_SAMPLES", "5"))
+        self.latency_tolerance = float(os.getenv("AI_ROUTER_LATENCY_TOLERANCE", "1.25"))
+
+        self._stats: Dict[Tuple[str, str], ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def get_backend(self, provider: str) -> AIService:
+        if provider not in self._backends:
+            raise ValueError(f"Unsupported AI provider: {provider}")
+        return self._backends[provider]
+
+    def set_preferred(self, provider: str):
+        """Prefer a provider when it is healthy and about as fast as the others"""
+        self.get_backend(provider)
+        self.preferred = provider
+
+    def available_providers(self) -> List[str]:
+        """Providers with an API key configured"""
+        return [provider for provider, backend in self._backends.items() if backend.api_key]
+
+    def _stats_for(self, provider: str, model: str) -> ProviderStats:
+        key = (provider, model)
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = ProviderStats(self.window)
+            return self._stats[key]
+
+    def _model_for(self, provider: str, models: Optional[Dict[str, str]]) -> str:
+        return (models or {}).get(provider) or self._backends[provider].model
+
+    def rank(self, preferred: Optional[str] = None, models: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        Order providers for a request: healthy before unhealthy, then by latency
+
+        Args:
+            preferred: Provider to favour (default: the gateway's preferred provider)
+            models: Model to use per provider, where it differs from the provider default
+
+        Returns:
+            Provider names, best first
+        """
+        preferred = preferred or self.preferred
+        candidates = []
+        for position, provider in enumerate(self.available_providers()):
+            stats = self._stats_for(provider, self._model_for(provider, models)).snapshot()
+            healthy = self._backends[provider].circuit_breaker.state != "open" and not (
+                stats['requests'] >= self.min_samples and stats['error_rate'] > self.max_error_rate
+            )
+            # Providers without successful samples rank as fastest so they get measured
+            latency = stats['p50'] or 0.0
+            candidates.append((provider, healthy, latency, provider != preferred, position))
+
+        healthy_latencies = [latency for _, healthy, latency, _, _ in candidates if healthy]
+        fastest = min(healthy_latencies) if healthy_latencies else 0.0
+
+        def sort_key(candidate):
+            provider, healthy, latency, not_preferred, position = candidate
+            within_tolerance = latency <= fastest * self.latency_tolerance
+            return (not healthy, 0.0 if within_tolerance else latency, not_preferred, position)
+
+        return [candidate[0] for candidate in sorted(candidates, key=sort_key)]
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        preferred: Optional[str] = None,
+        models: Optional[Dict[str, str]] = None,
+        **params
+    ) -> Dict[str, Any]:
+        """
+        Run a chat completion on the best provider, failing over on errors
+
+        Args:
+            messages: Chat messages, system prompt first
+            preferred: Provider to favour
+            models: Model to use per provider
+            **params: Request fields passed to AIService.complete (max_tokens, temperature, ...)
+
+        Returns:
+            AIService.complete result plus 'latency' in seconds
+
+        Raises:
+            AIServiceUnavailable: No provider is configured or every circuit is open
+            Exception: The last provider error when every provider failed
+        """
+        last_error = None
+        for provider in self.rank(preferred, models):
+            backend = self._backends[provider]
+            model = self._model_for(provider, models)
+            stats = self._stats_for(provider, model)
+
+            start = time.monotonic()
+            try:
+                result = backend.complete(messages, model=model, **params)
+            except AIServiceUnavailable as e:
+                last_error = e
+                continue
+            except Exception as e:
+                stats.record(time.monotonic() - start, ok=False)
+                logger.warning(f"LLM request to {provider}/{model} failed, failing over: {e}")
+                last_error = e
+                continue
+
+            result['latency'] = time.monotonic() - start
+            stats.record(result['latency'], ok=True)
+            return result
+
+        raise last_error or AIServiceUnavailable("No AI provider is configured")
+
+    async def acomplete(
+        self,
+        messages: List[Dict[str, str]],
+        preferred: Optional[str] = None,
+        models: Optional[Dict[str, str]] = None,
+        **params
+    ) -> Dict[str, Any]:
+        """Async counterpart of complete(): same ranking, failover and statistics"""
+        last_error = None
+        for provider in self.rank(preferred, models):
+            backend = self._backends[provider]
+            model = self._model_for(provider, models)
+            stats = self._stats_for(provider, model)
+
+            start = time.monotonic()
+            try:
+                result = await backend.acomplete(messages, model=model, **params)
+            except AIServiceUnavailable as e:
+                last_error = e
+                continue
+            except Exception as e:
+                stats.record(time.monotonic() - start, ok=False)
+                logger.warning(f"LLM request to {provider}/{model} failed, failing over: {e}")
+                last_error = e
+                continue
+
+            result['latency'] = time.monotonic() - start
+            stats.record(result['latency'], ok=True)
+            return result
+
+        raise last_error or AIServiceUnavailable("No AI provider is configured")
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        preferred: Optional[str] = None,
+        models: Optional[Dict[str, str]] = None,
+        **params
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a chat completion from the best provider
+
+        Fails over to the next provider only until the first token is sent.
+
+        Yields:
+            AIService.stream_complete events; the 'done' event also carries 'latency'
+        """
+        last_error = None
+        for provider in self.rank(preferred, models):
+            backend = self._backends[provider]
+            model = self._model_for(provider, models)
+            stats = self._stats_for(provider, model)
+
+            start = time.monotonic()
+            streamed = False
+            try:
+                for event in backend.stream_complete(messages, model=model, **params):
+                    if event['type'] == 'done':
+                        event['latency'] = time.monotonic() - start
+                        stats.record(event['latency'], ok=True)
+                    streamed = True
+                    yield event
+                return
+
+            except AIServiceUnavailable as e:
+                last_error = e
+                continue
+            except Exception as e:
+                stats.record(time.monotonic() - start, ok=False)
+                if streamed:
+                    raise
+                logger.warning(f"LLM stream from {provider}/{model} failed, failing over: {e}")
+                last_error = e
+                continue
+
+        raise last_error or AIServiceUnavailable("No AI provider is configured")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rolling latency and error statistics per provider and model"""
+        with self._lock:
+            keys = list(self._stats)
+
+        return {
+            'preferred': self.preferred,
+            'ranking': self.rank(),
+            'providers': {
+                provider: {
+                    'configured': bool(backend.api_key),
+                    'circuit': backend.circuit_breaker.state,
+                    'models': {
+                        model: self._stats[(stats_provider, model)].snapshot()
+                        for stats_provider, model in keys if stats_provider == provider
+                    },
+                }
+                for provider, backend in self._backends.items()
+            },
+        }
+
+
+# Global gateway, created on first use
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the global LLM gateway instance"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
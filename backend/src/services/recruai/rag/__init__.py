@@ -12,6 +12,8 @@ from .tools.ingestor import IngestorTool
 from .tools.embedder import EmbedderTool
 from .tools.retriever import RetrieverTool
 from .tools.generator import GeneratorTool
+from .tools.pipeline import IngestPipeline
+from .tools.job_queue import IngestJobQueue
 
 __all__ = [
     "RAGSupervisor",
@@ -19,4 +21,6 @@ __all__ = [
     "EmbedderTool",
     "RetrieverTool",
     "GeneratorTool",
+    "IngestPipeline",
+    "IngestJobQueue",
 ]
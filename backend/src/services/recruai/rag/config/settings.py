@@ -3,6 +3,7 @@ RAG System Configuration Settings
 """
 
 import os
+import tempfile
 from typing import Dict, Any, Optional
 
 
@@ -12,10 +13,11 @@ class RAGConfig:
     # OpenAI Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-ada-002"
-    OPENAI_EMBEDDING_DIMENSIONS: int = 1536
+    OPENAI_EMBEDDING_DIMENSIONS: int = 1536  # Also the dimension of local embeddings
     OPENAI_COMPLETION_MODEL: str = "gpt-4"
     OPENAI_MAX_TOKENS: int = 4000
     OPENAI_TEMPERATURE: float = 0.7
+    COMPLETION_PROVIDER: str = os.getenv("RAG_COMPLETION_PROVIDER", "openai")  # Preferred LLM gateway provider
 
     # Vector Database Configuration
     VECTOR_DB_HOST: str = os.getenv("VECTOR_DB_HOST", "localhost")
@@ -24,6 +26,14 @@ class RAGConfig:
     VECTOR_DB_USER: str = os.getenv("VECTOR_DB_USER", "postgres")
     VECTOR_DB_PASSWORD: str = os.getenv("VECTOR_DB_PASSWORD", "")
 
+    # Vector Index Configuration (pgvector)
+    VECTOR_INDEX_METHOD: str = os.getenv("VECTOR_INDEX_METHOD", "hnsw")  # 'hnsw' or 'ivfflat'
+    HNSW_M: int = int(os.getenv("HNSW_M", "16"))
+    HNSW_EF_CONSTRUCTION: int = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+    HNSW_EF_SEARCH: int = int(os.getenv("HNSW_EF_SEARCH", "40"))
+    IVFFLAT_LISTS: int = int(os.getenv("IVFFLAT_LISTS", "100"))
+    IVFFLAT_PROBES: int = int(os.getenv("IVFFLAT_PROBES", "10"))
+
     # Chunking Configuration
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
@@ -32,11 +42,43 @@ class RAGConfig:
     # Retrieval Configuration
     TOP_K_RESULTS: int = 5
     SIMILARITY_THRESHOLD: float = 0.7
-    MAX_CONTEXT_LENGTH: int = 8000
+    MAX_CONTEXT_LENGTH: int = 8000  # Token budget for retrieved context in a prompt
+    CONTEXT_TOKENIZER_ENCODING: str = "cl100k_base"  # tiktoken encoding used to count context tokens
+    CONTEXT_DEDUP_SIMILARITY: float = 0.9  # Cosine overlap above which a chunk counts as a near-duplicate
 
     # Rate Limiting
     MAX_REQUESTS_PER_MINUTE: int = 60
     MAX_REQUESTS_PER_HOUR: int = 1000
+    EMBEDDING_TOKENS_PER_MINUTE: int = int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "1000000"))
+
+    # Embedding Provider: 'openai', 'local' (offline CPU model) or 'auto'
+    # ('auto' uses OpenAI when OPENAI_API_KEY is set, local otherwise)
+    EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "auto")
+    LOCAL_EMBEDDING_MODEL_PATH: str = os.getenv("LOCAL_EMBEDDING_MODEL_PATH", "")  # Fitted IDF weights (.npz)
+
+    # Embedding Batching
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100000  # Per request (provider limit is higher)
+    EMBEDDING_BATCH_MAX_INPUTS: int = 2048  # OpenAI per-request input limit
+    EMBEDDING_MAX_WORKERS: int = int(os.getenv("EMBEDDING_MAX_WORKERS", "4"))
+    EMBEDDING_STREAM_WINDOW: int = 256  # Chunks embedded per window when streaming
+
+    # Ingestion
+    INGEST_WRITE_BATCH_SIZE: int = 200  # Chunks persisted per transaction
+    INGEST_JOB_WORKERS: int = int(os.getenv("INGEST_JOB_WORKERS", "2"))  # Background ingest threads per process
+    INGEST_JOB_STALE_SECONDS: int = 900  # Running jobs without a heartbeat for this long are requeued
+    INGEST_JOB_HEARTBEAT_SECONDS: int = 60  # How often a worker touches the job it is running
+    INGEST_JOB_RECOVER_INTERVAL_SECONDS: int = int(os.getenv("INGEST_JOB_RECOVER_INTERVAL_SECONDS", "300"))  # How often each process runs recover()
+    INGEST_JOB_MAX_ATTEMPTS: int = 3
+
+    # Hybrid Retrieval
+    KEYWORD_TS_CONFIG: str = os.getenv("KEYWORD_TS_CONFIG", "simple")  # PostgreSQL text search config; 'simple' keeps skill names unstemmed
+    HYBRID_FUSION: str = "rrf"  # 'rrf' (reciprocal rank fusion) or 'weighted' (normalized scores)
+    HYBRID_RRF_K: int = 60
+    HYBRID_CANDIDATE_MULTIPLIER: int = 4  # Candidates per retriever = top_k * multiplier
+    HYBRID_KEYWORD_ONLY_MAX_TERMS: int = 3  # Short exact-term queries skip the embedding call
+
+    # Workflow Orchestration
+    SUPERVISOR_MAX_WORKERS: int = int(os.getenv("SUPERVISOR_MAX_WORKERS", str(os.cpu_count() or 4)))
 
     # File Processing
     MAX_FILE_SIZE_MB: int = 10
@@ -45,6 +87,16 @@ class RAGConfig:
     # Caching
     CACHE_TTL_SECONDS: int = 3600  # 1 hour
     ENABLE_CACHE: bool = True
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = 2000  # Cached retrieval result lists, per process
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 300  # Writes for a tenant in any process invalidate its entries; the TTL bounds the rest
+    RETRIEVAL_CACHE_MARKER_TTL_SECONDS: float = 2.0  # How long tenant generations are reused before re-reading them
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 10000  # In-memory LRU tier, per process
+    EMBEDDING_CACHE_DISK_MAX_ENTRIES: int = 100000  # Shared on-disk tier
+    # Shared SQLite file for the on-disk tier; set to an empty string to disable
+    EMBEDDING_CACHE_PATH: str = os.getenv(
+        "EMBEDDING_CACHE_PATH",
+        os.path.join(tempfile.gettempdir(), "recruai_embedding_cache.db")
+    )
 
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -87,6 +139,18 @@ class RAGConfig:
             "api_key": cls.OPENAI_API_KEY,
         }
 
+    @classmethod
+    def get_vector_index_config(cls) -> Dict[str, Any]:
+        """Get pgvector index build and search configuration"""
+        return {
+            "method": cls.VECTOR_INDEX_METHOD,
+            "hnsw_m": cls.HNSW_M,
+            "hnsw_ef_construction": cls.HNSW_EF_CONSTRUCTION,
+            "hnsw_ef_search": cls.HNSW_EF_SEARCH,
+            "ivfflat_lists": cls.IVFFLAT_LISTS,
+            "ivfflat_probes": cls.IVFFLAT_PROBES,
+        }
+
     @classmethod
     def get_completion_config(cls) -> Dict[str, Any]:
         """Get completion-specific configuration"""
@@ -2,6 +2,34 @@
 RAG Database Models
 """
 
-from .vector_store import DocumentChunk, EmbeddingStore
+from .vector_store import (
+    DocumentChunk,
+    EmbeddingStore,
+    HAS_VECTOR,
+    content_tsvector,
+    create_keyword_index,
+    create_vector_index,
+    drop_keyword_index,
+    drop_vector_index,
+)
+from .index_change import IndexChange
+from .index_generation import IndexGeneration
+from .ingest_job import IngestJob
+from .keyword_index import KeywordIndex
+from .local_index import LocalVectorIndex
 
-__all__ = ["DocumentChunk", "EmbeddingStore"]
+__all__ = [
+    "DocumentChunk",
+    "EmbeddingStore",
+    "HAS_VECTOR",
+    "IndexChange",
+    "IndexGeneration",
+    "IngestJob",
+    "KeywordIndex",
+    "LocalVectorIndex",
+    "content_tsvector",
+    "create_keyword_index",
+    "create_vector_index",
+    "drop_keyword_index",
+    "drop_vector_index",
+]
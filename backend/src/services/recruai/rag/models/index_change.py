@@ -0,0 +1,32 @@
+"""
+Index Change Log Model for RAG System
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime
+
+from .vector_store import Base
+
+
+class IndexChange(Base):
+    """
+    Log of deleted DocumentChunk/EmbeddingStore rows.
+
+    The in-process indexes only pull new rows by primary-key high-water mark,
+    which cannot see deletions made by other processes. Every delete writes
+    one row here in the same transaction, and the indexes replay the log from
+    their own high-water mark.
+    """
+    __tablename__ = "rag_index_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chunk_id = Column(Integer, nullable=False)  # Deleted DocumentChunk id
+    embedding_id = Column(Integer, nullable=True)  # Deleted EmbeddingStore id, if the chunk had one
+    document_id = Column(String(255), nullable=False)
+    user_id = Column(String(255), nullable=True)
+    organization_id = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<IndexChange(id={self.id}, chunk_id={self.chunk_id}, embedding_id={self.embedding_id})>"
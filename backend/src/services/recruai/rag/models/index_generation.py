@@ -0,0 +1,75 @@
+"""
+Index Generation Model for RAG System
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Column, Integer, String, DateTime, update, insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .vector_store import Base
+
+
+class IndexGeneration(Base):
+    """
+    Per-tenant write counter for the retrieval cache.
+
+    Every transaction that inserts, updates or deletes chunks bumps the rows
+    of the scopes it touches: the global scope, its organization and its
+    user. Cached retrieval results record the generations of the scopes their
+    filters select, so a write expires cached results in every process, but
+    only for the tenants it could affect.
+    """
+    __tablename__ = "rag_index_generations"
+
+    GLOBAL_SCOPE = ('global', '')
+
+    scope = Column(String(20), primary_key=True)  # 'global', 'organization_id' or 'user_id'
+    scope_id = Column(String(255), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<IndexGeneration(scope={self.scope}, scope_id={self.scope_id}, generation={self.generation})>"
+
+    @classmethod
+    def write_scopes(cls, organization_id: Optional[Any] = None, user_id: Optional[Any] = None) -> List[Tuple[str, str]]:
+        """Scopes whose cached results a write for this tenant can change"""
+        scopes = [cls.GLOBAL_SCOPE]
+        if organization_id is not None:
+            scopes.append(('organization_id', str(organization_id)))
+        if user_id is not None:
+            scopes.append(('user_id', str(user_id)))
+        return scopes
+
+    @classmethod
+    def bump(cls, session, organization_id: Optional[Any] = None, user_id: Optional[Any] = None):
+        """Increment the tenant's generations inside the caller's transaction"""
+        upsert = _UPSERTS.get(session.get_bind().dialect.name)
+        for scope, scope_id in cls.write_scopes(organization_id, user_id):
+            if upsert is not None:
+                session.execute(
+                    upsert(cls)
+                    .values(scope=scope, scope_id=scope_id, generation=1, updated_at=datetime.utcnow())
+                    .on_conflict_do_update(
+                        index_elements=[cls.scope, cls.scope_id],
+                        set_={'generation': cls.generation + 1, 'updated_at': datetime.utcnow()}
+                    )
+                )
+                continue
+
+            bumped = session.execute(
+                update(cls)
+                .where(cls.scope == scope, cls.scope_id == scope_id)
+                .values(generation=cls.generation + 1)
+            ).rowcount
+            if not bumped:
+                session.execute(insert(cls).values(scope=scope, scope_id=scope_id, generation=1))
+
+
+# Dialects with INSERT ... ON CONFLICT, which bumps a new scope without racing its first insert
+_UPSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
@@ -0,0 +1,93 @@
+"""
+Ingest Job Model for RAG System
+"""
+
+from datetime import datetime
+from typing import Optional, Dict, Any
+import json
+
+from sqlalchemy import Column, Integer, String, Text, DateTime
+
+from .vector_store import Base
+
+
+class IngestJob(Base):
+    """
+    Model for a queued background ingestion job and its per-stage progress
+    """
+    __tablename__ = "rag_ingest_jobs"
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    # Pipeline stages, in the order they start
+    STAGES = ('chunking', 'embedding', 'storing', 'cleanup')
+
+    id = Column(String(64), primary_key=True)  # Job ID returned to the client
+    status = Column(String(20), nullable=False, default=STATUS_QUEUED, index=True)
+    current_stage = Column(String(20), nullable=True)
+
+    # What to ingest
+    document_id = Column(String(255), nullable=False, index=True)
+    source_type = Column(String(50), nullable=False)
+    user_id = Column(String(255), nullable=True, index=True)
+    organization_id = Column(String(255), nullable=True)
+    chunking_strategy = Column(String(50), nullable=False, default='semantic')
+    content = Column(Text, nullable=False)  # Raw text; cleared once the job finishes
+    job_metadata = Column(Text, nullable=True)  # JSON string for chunk metadata
+
+    # Progress and outcome
+    chunks_estimated = Column(Integer, nullable=True)
+    progress = Column(Text, nullable=True)  # JSON string: per-stage counters
+    result = Column(Text, nullable=True)  # JSON string: final ingest statistics
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<IngestJob(id={self.id}, document_id={self.document_id}, status={self.status})>"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
+
+    def get_stages(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage progress with a status for every stage"""
+        progress = json.loads(self.progress) if self.progress else {}
+
+        stages = {}
+        for stage in self.STAGES:
+            entry = dict(progress.get(stage, {}))
+            entry.setdefault('status', 'pending')
+            if self.status == self.STATUS_FAILED and entry['status'] == 'running':
+                entry['status'] = 'failed'
+            stages[stage] = entry
+        return stages
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation (without the raw content)"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "current_stage": self.current_stage,
+            "document_id": self.document_id,
+            "source_type": self.source_type,
+            "user_id": self.user_id,
+            "organization_id": self.organization_id,
+            "chunking_strategy": self.chunking_strategy,
+            "chunks_estimated": self.chunks_estimated,
+            "stages": self.get_stages(),
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,264 @@
+"""
+In-process Keyword Index for RAG System
+BM25 inverted index over DocumentChunk content, used when PostgreSQL full-text search is unavailable
+"""
+
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordIndex:
+    """
+    In-memory BM25 inverted index mirroring the rows of DocumentChunk.
+
+    Tokens keep the characters that matter in skill and technology names
+    (c++, c#, node.js, ci/cd), so exact-term queries such as "kubernetes" or
+    "c#" match without an embedding call. Postings map each term to the
+    chunks containing it, so a query only touches chunks sharing a term.
+    """
+
+    # Metadata columns that can be used as pre-filters (same as LocalVectorIndex)
+    FILTER_FIELDS = ('source_type', 'user_id', 'organization_id', 'document_id')
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./\-]*[a-z0-9+#]|[a-z0-9]")
+
+    STOPWORDS = frozenset((
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+        'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was',
+        'were', 'will', 'with',
+    ))
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._clear_locked()
+
+    def _clear_locked(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Dict[str, int]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._doc_meta: Dict[int, Dict[str, Any]] = {}
+        self._total_length = 0
+        self._max_chunk_id = 0
+        self._max_change_id = 0
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Lower-case terms with stopwords removed and trailing punctuation stripped"""
+        tokens = []
+        for token in cls.TOKEN_PATTERN.findall((text or '').lower()):
+            token = token.rstrip('.-/')
+            if token and token not in cls.STOPWORDS:
+                tokens.append(token)
+        return tokens
+
+    @staticmethod
+    def _normalize_value(value: Any) -> Optional[str]:
+        """Metadata columns are strings in the database, so compare as strings"""
+        return str(value) if value is not None else None
+
+    def add(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Add chunk rows to the index.
+
+        Args:
+            rows: Dictionaries with 'id', 'content' and the metadata fields in
+                  FILTER_FIELDS (DocumentChunk.to_dict() shape)
+
+        Returns:
+            Number of rows added
+        """
+        if not rows:
+            return 0
+
+        with self._lock:
+            for row in rows:
+                chunk_id = int(row['id'])
+                if chunk_id in self._doc_terms:
+                    self._remove_locked(chunk_id)
+
+                terms = Counter(self.tokenize(row.get('content', '')))
+                length = sum(terms.values())
+
+                for term, count in terms.items():
+                    self._postings.setdefault(term, {})[chunk_id] = count
+
+                self._doc_terms[chunk_id] = terms
+                self._doc_lengths[chunk_id] = length
+                self._doc_meta[chunk_id] = {
+                    field: self._normalize_value(row.get(field)) for field in self.FILTER_FIELDS
+                }
+                self._total_length += length
+                self._max_chunk_id = max(self._max_chunk_id, chunk_id)
+
+        return len(rows)
+
+    def _remove_locked(self, chunk_id: int) -> bool:
+        terms = self._doc_terms.pop(chunk_id, None)
+        if terms is None:
+            return False
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+
+        self._total_length -= self._doc_lengths.pop(chunk_id, 0)
+        self._doc_meta.pop(chunk_id, None)
+        return True
+
+    def remove(self, chunk_ids: List[int]) -> int:
+        """Drop rows from the index by DocumentChunk id"""
+        with self._lock:
+            return sum(1 for chunk_id in chunk_ids if self._remove_locked(int(chunk_id)))
+
+    def remove_document(self, document_id: str) -> int:
+        """Drop every row belonging to a document"""
+        document_id = self._normalize_value(document_id)
+        with self._lock:
+            chunk_ids = [
+                chunk_id for chunk_id, meta in self._doc_meta.items()
+                if meta['document_id'] == document_id
+            ]
+        return self.remove(chunk_ids)
+
+    def refresh(self, session, chunk_model, change_model=None) -> int:
+        """
+        Load DocumentChunk rows added since the last refresh.
+
+        Args:
+            session: SQLAlchemy session
+            chunk_model: The DocumentChunk model class
+            change_model: The IndexChange model class; chunks deleted since the
+                last refresh (by any process) are dropped
+
+        Returns:
+            Number of rows added to the index
+        """
+        with self._lock:
+            since_id = self._max_chunk_id
+            since_change_id = self._max_change_id
+
+        query = session.query(
+            chunk_model.id,
+            chunk_model.content,
+            chunk_model.document_id,
+            chunk_model.source_type,
+            chunk_model.user_id,
+            chunk_model.organization_id,
+        ).filter(chunk_model.id > since_id).order_by(chunk_model.id)
+
+        rows = [row._asdict() for row in query.yield_per(1000)]
+        added = self.add(rows)
+        if added:
+            logger.info(f"Keyword index loaded {added} new chunks (size={len(self)})")
+
+        if change_model is not None:
+            changes = session.query(change_model.id, change_model.chunk_id).filter(
+                change_model.id > since_change_id
+            ).order_by(change_model.id).all()
+            if changes:
+                removed = self.remove([change.chunk_id for change in changes])
+                with self._lock:
+                    self._max_change_id = max(self._max_change_id, changes[-1].id)
+                if removed:
+                    logger.info(f"Keyword index dropped {removed} deleted chunks (size={len(self)})")
+        return added
+
+    def _matches(self, chunk_id: int, filters: Optional[Dict[str, Any]]) -> bool:
+        if not filters:
+            return True
+        meta = self._doc_meta[chunk_id]
+        return all(
+            meta[field] == self._normalize_value(filters[field])
+            for field in self.FILTER_FIELDS if field in filters
+        )
+
+    def search(
+        self,
+        query_text: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        require_all_terms: bool = False
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank chunks against a keyword query with BM25.
+
+        Args:
+            query_text: Free-text query
+            top_k: Maximum number of results
+            filters: Exact-match metadata filters (see FILTER_FIELDS)
+            require_all_terms: Only return chunks containing every query term
+
+        Returns:
+            List of (row metadata, BM25 score) tuples, best first
+        """
+        terms = list(dict.fromkeys(self.tokenize(query_text)))
+        if not terms or top_k <= 0:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if doc_count == 0:
+                return []
+            average_length = self._total_length / doc_count
+
+            scores: Dict[int, float] = {}
+            matched_terms: Dict[int, int] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    if require_all_terms:
+                        return []
+                    continue
+
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    length_norm = 1 - self.b + self.b * self._doc_lengths[chunk_id] / average_length
+                    score = idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + score
+                    matched_terms[chunk_id] = matched_terms.get(chunk_id, 0) + 1
+
+            candidates = (
+                (chunk_id, score) for chunk_id, score in scores.items()
+                if (not require_all_terms or matched_terms[chunk_id] == len(terms))
+                and self._matches(chunk_id, filters)
+            )
+            top = heapq.nlargest(top_k, candidates, key=lambda item: item[1])
+
+            return [
+                ({'chunk_id': chunk_id, **self._doc_meta[chunk_id]}, score)
+                for chunk_id, score in top
+            ]
+
+    def clear(self):
+        """Drop all rows and reset the refresh high-water mark"""
+        with self._lock:
+            self._clear_locked()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size statistics"""
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            return {
+                'backend': 'bm25',
+                'chunks': doc_count,
+                'terms': len(self._postings),
+                'average_length': self._total_length / doc_count if doc_count else 0.0,
+                'max_chunk_id': self._max_chunk_id,
+                'max_change_id': self._max_change_id,
+            }
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
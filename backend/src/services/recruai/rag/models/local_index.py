@@ -0,0 +1,491 @@
+"""
+In-process Vector Index for RAG System
+Brute-force cosine search over a contiguous float32 matrix, used when pgvector is unavailable
+"""
+
+import json
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+from ..config import RAGConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+class LocalVectorIndex:
+    """
+    In-memory vector index mirroring the rows of EmbeddingStore.
+
+    Embeddings are L2-normalised and packed into a single contiguous float32
+    matrix so a query is one matrix-vector product. Filterable metadata is
+    stored as integer codes, which turns org/user/source_type filters into
+    boolean masks applied before scoring. Removed or replaced rows are only
+    masked out until they make up compact_threshold of the stored rows; the
+    storage is then rewritten with the live rows only.
+    """
+
+    # Metadata columns that can be used as pre-filters
+    FILTER_FIELDS = ('source_type', 'user_id', 'organization_id', 'document_id', 'embedding_model')
+
+    def __init__(self, dimensions: Optional[int] = None, initial_capacity: int = 1024, compact_threshold: float = 0.25):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy package not installed. Install with: pip install numpy")
+
+        self.dimensions = dimensions or RAGConfig.OPENAI_EMBEDDING_DIMENSIONS
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._initial_capacity = max(1, initial_capacity)
+        self._max_embedding_id = 0
+        self._max_change_id = 0
+        self._skipped_rows = 0
+        self._compactions = 0
+        self._allocate(self._initial_capacity)
+
+    def _allocate(self, capacity: int):
+        """Allocate empty storage for the given number of rows"""
+        self._size = 0
+        self._capacity = capacity
+        self._matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        self._embedding_ids = np.zeros(capacity, dtype=np.int64)
+        self._chunk_ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._codes = {field: np.zeros(capacity, dtype=np.int32) for field in self.FILTER_FIELDS}
+        self._vocab = {field: {} for field in self.FILTER_FIELDS}
+        self._values = {field: [] for field in self.FILTER_FIELDS}
+        self._row_by_embedding_id = {}
+
+    def _grow(self, min_capacity: int):
+        """Grow storage geometrically so appends stay amortised O(1)"""
+        new_capacity = self._capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+
+        if new_capacity == self._capacity:
+            return
+
+        matrix = np.zeros((new_capacity, self.dimensions), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+        self._embedding_ids = np.resize(self._embedding_ids, new_capacity)
+        self._chunk_ids = np.resize(self._chunk_ids, new_capacity)
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+        for field in self.FILTER_FIELDS:
+            self._codes[field] = np.resize(self._codes[field], new_capacity)
+
+        self._capacity = new_capacity
+
+    def _compact_if_needed(self):
+        """Rewrite storage without dead rows once they pass compact_threshold (caller holds the lock)"""
+        dead = self._size - len(self._row_by_embedding_id)
+        if dead == 0 or dead < self._size * self.compact_threshold:
+            return
+
+        live = np.flatnonzero(self._alive[:self._size])
+        size = live.size
+        capacity = self._initial_capacity
+        while capacity < size:
+            capacity *= 2
+
+        matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        matrix[:size] = self._matrix[live]
+        self._matrix = matrix
+
+        embedding_ids = np.zeros(capacity, dtype=np.int64)
+        embedding_ids[:size] = self._embedding_ids[live]
+        self._embedding_ids = embedding_ids
+        chunk_ids = np.zeros(capacity, dtype=np.int64)
+        chunk_ids[:size] = self._chunk_ids[live]
+        self._chunk_ids = chunk_ids
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:size] = True
+        for field in self.FILTER_FIELDS:
+            codes = np.zeros(capacity, dtype=np.int32)
+            codes[:size] = self._codes[field][live]
+            self._codes[field] = codes
+
+        self._row_by_embedding_id = {int(embedding_id): position for position, embedding_id in enumerate(embedding_ids[:size])}
+        self._size = size
+        self._capacity = capacity
+        self._compactions += 1
+        logger.info(f"Local vector index compacted away {dead} dead rows (size={size})")
+
+    def _encode(self, field: str, value: Any) -> int:
+        """Map a metadata value to its integer code, registering it if new"""
+        key = self._normalize_value(value)
+        vocab = self._vocab[field]
+        code = vocab.get(key)
+        if code is None:
+            code = len(self._values[field])
+            vocab[key] = code
+            self._values[field].append(key)
+        return code
+
+    @staticmethod
+    def _normalize_value(value: Any) -> Optional[str]:
+        """Metadata columns are strings in the database, so compare as strings"""
+        return str(value) if value is not None else None
+
+    @staticmethod
+    def _parse_embedding(embedding: Any) -> Optional[List[float]]:
+        """Decode an embedding stored either as a JSON string or a sequence"""
+        if embedding is None:
+            return None
+        if isinstance(embedding, (str, bytes)):
+            try:
+                embedding = json.loads(embedding)
+            except (TypeError, ValueError):
+                return None
+        if not isinstance(embedding, (list, tuple)) and not hasattr(embedding, '__len__'):
+            return None
+        return embedding
+
+    def add(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Add embedding rows to the index.
+
+        Args:
+            rows: Dictionaries with 'id', 'chunk_id', 'embedding' and the
+                  metadata fields in FILTER_FIELDS (EmbeddingStore.to_dict() shape)
+
+        Returns:
+            Number of rows added
+        """
+        if not rows:
+            return 0
+
+        vectors = []
+        accepted = []
+        for row in rows:
+            embedding = self._parse_embedding(row.get('embedding'))
+            if embedding is None or len(embedding) != self.dimensions:
+                self._skipped_rows += 1
+                continue
+            vectors.append(embedding)
+            accepted.append(row)
+
+        if not accepted:
+            return 0
+
+        batch = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        batch /= norms
+
+        with self._lock:
+            start = self._size
+            end = start + len(accepted)
+            self._grow(end)
+
+            self._matrix[start:end] = batch
+            self._alive[start:end] = True
+
+            for offset, row in enumerate(accepted):
+                position = start + offset
+                embedding_id = int(row.get('id') or 0)
+                previous = self._row_by_embedding_id.get(embedding_id)
+                if previous is not None:
+                    # Re-adding an existing row replaces the stale vector
+                    self._alive[previous] = False
+
+                self._embedding_ids[position] = embedding_id
+                self._chunk_ids[position] = int(row.get('chunk_id') or 0)
+                for field in self.FILTER_FIELDS:
+                    self._codes[field][position] = self._encode(field, row.get(field))
+                self._row_by_embedding_id[embedding_id] = position
+                self._max_embedding_id = max(self._max_embedding_id, embedding_id)
+
+            self._size = end
+            self._compact_if_needed()
+
+        return len(accepted)
+
+    def remove(self, embedding_ids: List[int]) -> int:
+        """Drop rows from the index by EmbeddingStore id"""
+        removed = 0
+        with self._lock:
+            for embedding_id in embedding_ids:
+                position = self._row_by_embedding_id.pop(int(embedding_id), None)
+                if position is not None and self._alive[position]:
+                    self._alive[position] = False
+                    removed += 1
+            self._compact_if_needed()
+        return removed
+
+    def remove_document(self, document_id: str) -> int:
+        """Drop every row belonging to a document"""
+        with self._lock:
+            code = self._vocab['document_id'].get(self._normalize_value(document_id))
+            if code is None:
+                return 0
+            positions = np.flatnonzero(
+                self._alive[:self._size] & (self._codes['document_id'][:self._size] == code)
+            )
+            ids = self._embedding_ids[positions].tolist()
+        return self.remove(ids)
+
+    def refresh(self, session, embedding_model, change_model=None, chunk_model=None) -> int:
+        """
+        Load EmbeddingStore rows added since the last refresh.
+
+        Rows are pulled by primary-key high-water mark, so rows written by other
+        workers or processes are picked up with one indexed range query. With
+        change_model, rows deleted since the last refresh (by any process) are
+        dropped the same way.
+
+        Args:
+            session: SQLAlchemy session
+            embedding_model: The EmbeddingStore model class
+            change_model: The IndexChange model class (deletion log)
+            chunk_model: The DocumentChunk model class, to load each row's
+                embedding_model for filtering
+
+        Returns:
+            Number of rows added to the index
+        """
+        with self._lock:
+            since_id = self._max_embedding_id
+            since_change_id = self._max_change_id
+
+        columns = [
+            embedding_model.id,
+            embedding_model.chunk_id,
+            embedding_model.document_id,
+            embedding_model.embedding,
+            embedding_model.source_type,
+            embedding_model.user_id,
+            embedding_model.organization_id,
+        ]
+        if chunk_model is not None:
+            columns.append(chunk_model.embedding_model)
+        query = session.query(*columns)
+        if chunk_model is not None:
+            query = query.outerjoin(chunk_model, chunk_model.id == embedding_model.chunk_id)
+        query = query.filter(embedding_model.id > since_id).order_by(embedding_model.id)
+
+        rows = [
+            {
+                'id': row.id,
+                'chunk_id': row.chunk_id,
+                'document_id': row.document_id,
+                'embedding': row.embedding,
+                'source_type': row.source_type,
+                'user_id': row.user_id,
+                'organization_id': row.organization_id,
+                'embedding_model': row.embedding_model if chunk_model is not None else None,
+            }
+            for row in query.yield_per(1000)
+        ]
+
+        added = self.add(rows)
+        if added:
+            logger.info(f"Local vector index loaded {added} new embeddings (size={len(self)})")
+
+        if change_model is not None:
+            changes = session.query(change_model.id, change_model.embedding_id).filter(
+                change_model.id > since_change_id
+            ).order_by(change_model.id).all()
+            if changes:
+                removed = self.remove([change.embedding_id for change in changes if change.embedding_id is not None])
+                with self._lock:
+                    self._max_change_id = max(self._max_change_id, changes[-1].id)
+                if removed:
+                    logger.info(f"Local vector index dropped {removed} deleted embeddings (size={len(self)})")
+        return added
+
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]):
+        """Build the boolean pre-filter mask for live rows; None means no match possible"""
+        mask = self._alive[:self._size].copy()
+        if not filters:
+            return mask
+
+        for field in self.FILTER_FIELDS:
+            if field not in filters:
+                continue
+            code = self._vocab[field].get(self._normalize_value(filters[field]))
+            if code is None:
+                return None
+            mask &= self._codes[field][:self._size] == code
+
+        return mask
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        similarity_threshold: float = 0.0,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the top-k most similar rows to a query embedding.
+
+        Args:
+            query_embedding: Query vector
+            top_k: Maximum number of results
+            similarity_threshold: Minimum cosine similarity
+            filters: Exact-match metadata filters (see FILTER_FIELDS)
+
+        Returns:
+            List of (row metadata, similarity) tuples, best first
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dimensions:
+            raise ValueError(f"Query has {query.shape[0]} dimensions, index expects {self.dimensions}")
+
+        norm = np.linalg.norm(query)
+        if norm == 0 or top_k <= 0:
+            return []
+        query = query / norm
+
+        with self._lock:
+            mask = self._filter_mask(filters)
+            if mask is None:
+                return []
+
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+
+            if candidates.size == self._size:
+                scores = self._matrix[:self._size] @ query
+            else:
+                scores = self._matrix[candidates] @ query
+
+            k = min(top_k, scores.shape[0])
+            if k < scores.shape[0]:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(scores.shape[0])
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for local_position in top:
+                score = float(scores[local_position])
+                if score < similarity_threshold:
+                    break
+                position = candidates[local_position]
+                results.append((self._row_metadata(position), score))
+
+        return results
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        similarity_threshold: float = 0.0,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """
+        Find the top-k rows for several queries with one matrix-matrix product.
+
+        Args:
+            query_embeddings: Query vectors
+            top_k: Maximum number of results per query
+            similarity_threshold: Minimum cosine similarity
+            filters: Exact-match metadata filters shared by all queries
+
+        Returns:
+            One list of (row metadata, similarity) tuples per query, best first
+        """
+        if not query_embeddings:
+            return []
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.dimensions:
+            raise ValueError(f"Queries must have {self.dimensions} dimensions")
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        empty_queries = norms[:, 0] == 0
+        norms[empty_queries] = 1.0
+        queries = queries / norms
+
+        results = [[] for _ in range(len(queries))]
+        if top_k <= 0:
+            return results
+
+        with self._lock:
+            mask = self._filter_mask(filters)
+            if mask is None:
+                return results
+
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return results
+
+            if candidates.size == self._size:
+                scores = self._matrix[:self._size] @ queries.T
+            else:
+                scores = self._matrix[candidates] @ queries.T
+
+            # scores is (candidates x queries); select the top k of every column at once
+            k = min(top_k, scores.shape[0])
+            if k < scores.shape[0]:
+                top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            else:
+                top = np.tile(np.arange(scores.shape[0])[:, None], (1, scores.shape[1]))
+            top_scores = np.take_along_axis(scores, top, axis=0)
+            order = np.argsort(-top_scores, axis=0)
+            top = np.take_along_axis(top, order, axis=0)
+            top_scores = np.take_along_axis(top_scores, order, axis=0)
+
+            for query_position in range(len(queries)):
+                if empty_queries[query_position]:
+                    continue
+                for local_position, score in zip(top[:, query_position], top_scores[:, query_position]):
+                    score = float(score)
+                    if score < similarity_threshold:
+                        break
+                    results[query_position].append(
+                        (self._row_metadata(candidates[local_position]), score)
+                    )
+
+        return results
+
+    def _row_metadata(self, position: int) -> Dict[str, Any]:
+        """Reconstruct the stored metadata for a row"""
+        row = {
+            'id': int(self._embedding_ids[position]),
+            'chunk_id': int(self._chunk_ids[position]),
+        }
+        for field in self.FILTER_FIELDS:
+            row[field] = self._values[field][self._codes[field][position]]
+        return row
+
+    def clear(self):
+        """Drop all rows and reset the refresh high-water mark"""
+        with self._lock:
+            self._allocate(self._initial_capacity)
+            self._max_embedding_id = 0
+            self._max_change_id = 0
+            self._skipped_rows = 0
+            self._compactions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and memory statistics"""
+        with self._lock:
+            return {
+                'backend': 'numpy',
+                'rows': len(self),
+                'capacity': self._capacity,
+                'dimensions': self.dimensions,
+                'matrix_bytes': int(self._matrix.nbytes),
+                'max_embedding_id': self._max_embedding_id,
+                'max_change_id': self._max_change_id,
+                'skipped_rows': self._skipped_rows,
+                'dead_rows': self._size - len(self._row_by_embedding_id),
+                'compactions': self._compactions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._row_by_embedding_id)
@@ -5,8 +5,10 @@ Vector Store Models for RAG System
 from datetime import datetime
 from typing import Optional, Dict, Any
 import json
+import re
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index, text, func, literal_column
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 
 # Try to import VECTOR for pgvector support, fallback to Text if not available
@@ -14,8 +16,12 @@ try:
     from sqlalchemy.dialects.postgresql import VECTOR
     HAS_VECTOR = True
 except ImportError:
-    HAS_VECTOR = False
-    VECTOR = None
+    try:
+        from pgvector.sqlalchemy import Vector as VECTOR
+        HAS_VECTOR = True
+    except ImportError:
+        HAS_VECTOR = False
+        VECTOR = None
 
 from ..config import RAGConfig
 
@@ -90,15 +96,44 @@ class DocumentChunk(Base):
         metadata: Optional[Dict[str, Any]] = None
     ) -> 'DocumentChunk':
         """Factory method to create a document chunk"""
+        return cls(**cls.chunk_values(
+            document_id=document_id,
+            chunk_index=chunk_index,
+            content=content,
+            source_type=source_type,
+            source_id=source_id,
+            user_id=user_id,
+            organization_id=organization_id,
+            metadata=metadata,
+        ))
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """SHA-256 of the chunk text, used to detect unchanged chunks on re-ingest"""
         import hashlib
 
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-        return cls(
+    @classmethod
+    def chunk_values(
+        cls,
+        document_id: str,
+        chunk_index: int,
+        content: str,
+        source_type: str,
+        source_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        embedding_model: Optional[str] = None,
+        chunking_strategy: str = 'semantic'
+    ) -> Dict[str, Any]:
+        """Column values for a chunk row, shared by create_chunk and bulk inserts"""
+        return dict(
             document_id=document_id,
             chunk_index=chunk_index,
             content=content,
-            content_hash=content_hash,
+            content_hash=cls.hash_content(content),
             source_type=source_type,
             source_id=source_id,
             user_id=user_id,
@@ -106,8 +141,8 @@ class DocumentChunk(Base):
             word_count=len(content.split()),
             char_count=len(content),
             language='en',  # TODO: Implement language detection
-            embedding_model=RAGConfig.OPENAI_EMBEDDING_MODEL,
-            chunking_strategy='semantic',  # TODO: Make configurable
+            embedding_model=embedding_model or RAGConfig.OPENAI_EMBEDDING_MODEL,
+            chunking_strategy=chunking_strategy,
             chunk_metadata=json.dumps(metadata) if metadata else None,
         )
 
@@ -176,13 +211,35 @@ class EmbeddingStore(Base):
         confidence: float = 1.0
     ) -> 'EmbeddingStore':
         """Factory method to create an embedding record"""
+        return cls(**cls.embedding_values(
+            chunk_id=chunk_id,
+            document_id=document_id,
+            embedding_vector=embedding_vector,
+            source_type=source_type,
+            user_id=user_id,
+            organization_id=organization_id,
+            confidence=confidence,
+        ))
+
+    @classmethod
+    def embedding_values(
+        cls,
+        chunk_id: int,
+        document_id: str,
+        embedding_vector: list,
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        confidence: float = 1.0
+    ) -> Dict[str, Any]:
+        """Column values for an embedding row, shared by create_embedding and bulk inserts"""
         # Handle embedding storage based on available vector support
         if HAS_VECTOR:
             embedding_value = embedding_vector
         else:
             embedding_value = json.dumps(embedding_vector)  # Store as JSON string
 
-        return cls(
+        return dict(
             chunk_id=chunk_id,
             document_id=document_id,
             embedding=embedding_value,
@@ -205,4 +262,135 @@ Index('idx_embedding_store_source_type', EmbeddingStore.source_type)
 Index('idx_embedding_store_user_id', EmbeddingStore.user_id)
 
 # Vector similarity index (requires pgvector extension)
-# This will be created via migration when pgvector is available
+# Created by the rag_embedding_vector_index migration or create_vector_index()
+VECTOR_INDEX_METHODS = ('hnsw', 'ivfflat')
+
+
+def vector_index_name(method: str) -> str:
+    """Name of the ANN index for the given access method"""
+    return f"idx_embedding_store_embedding_{method}"
+
+
+def create_vector_index(
+    connection,
+    method: Optional[str] = None,
+    concurrently: bool = False
+) -> Dict[str, Any]:
+    """
+    Create the pgvector ANN index on rag_embedding_store.embedding if missing.
+
+    Uses cosine distance (vector_cosine_ops) to match the <=> operator used by
+    RetrieverTool. Build parameters come from RAGConfig.
+
+    Args:
+        connection: SQLAlchemy connection or engine bound to PostgreSQL
+        method: 'hnsw' or 'ivfflat' (default: RAGConfig.VECTOR_INDEX_METHOD)
+        concurrently: Build without blocking writes (requires autocommit)
+
+    Returns:
+        Dictionary describing the index that was ensured
+    """
+    method = (method or RAGConfig.VECTOR_INDEX_METHOD).lower()
+    if method not in VECTOR_INDEX_METHODS:
+        raise ValueError(f"Unsupported vector index method: {method}")
+
+    if method == 'hnsw':
+        params = {'m': int(RAGConfig.HNSW_M), 'ef_construction': int(RAGConfig.HNSW_EF_CONSTRUCTION)}
+    else:
+        params = {'lists': int(RAGConfig.IVFFLAT_LISTS)}
+
+    with_clause = ", ".join(f"{key} = {value}" for key, value in params.items())
+    name = vector_index_name(method)
+
+    statements = [
+        "CREATE EXTENSION IF NOT EXISTS vector",
+        (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} "
+            f"ON {EmbeddingStore.__tablename__} USING {method} (embedding vector_cosine_ops) "
+            f"WITH ({with_clause})"
+        ),
+    ]
+
+    _execute_ddl(connection, statements, autocommit=concurrently)
+    return {'name': name, 'method': method, 'params': params}
+
+
+def drop_vector_index(connection, method: Optional[str] = None) -> str:
+    """Drop the pgvector ANN index for the given access method if present"""
+    method = (method or RAGConfig.VECTOR_INDEX_METHOD).lower()
+    name = vector_index_name(method)
+    _execute_ddl(connection, [f"DROP INDEX IF EXISTS {name}"])
+    return name
+
+
+# Full-text keyword index (PostgreSQL only)
+# Created by the rag_chunk_keyword_index migration or create_keyword_index()
+KEYWORD_INDEX_NAME = "idx_document_chunks_content_tsv"
+
+
+def keyword_ts_config(ts_config: Optional[str] = None) -> str:
+    """Validated text search configuration name (it is inlined into SQL)"""
+    ts_config = (ts_config or RAGConfig.KEYWORD_TS_CONFIG).lower()
+    if not re.fullmatch(r"[a-z_]+", ts_config):
+        raise ValueError(f"Invalid text search configuration: {ts_config}")
+    return ts_config
+
+
+def content_tsvector(ts_config: Optional[str] = None):
+    """
+    to_tsvector expression over DocumentChunk.content.
+
+    The configuration is inlined as a regconfig literal so the expression
+    matches the GIN index definition and the planner can use the index.
+    """
+    regconfig = literal_column(f"'{keyword_ts_config(ts_config)}'::regconfig")
+    return func.to_tsvector(regconfig, DocumentChunk.content)
+
+
+def create_keyword_index(
+    connection,
+    ts_config: Optional[str] = None,
+    concurrently: bool = False
+) -> Dict[str, Any]:
+    """
+    Create the GIN full-text index on rag_document_chunks.content if missing.
+
+    Args:
+        connection: SQLAlchemy connection or engine bound to PostgreSQL
+        ts_config: Text search configuration (default: RAGConfig.KEYWORD_TS_CONFIG)
+        concurrently: Build without blocking writes (requires autocommit)
+
+    Returns:
+        Dictionary describing the index that was ensured
+    """
+    ts_config = keyword_ts_config(ts_config)
+    statement = (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {KEYWORD_INDEX_NAME} "
+        f"ON {DocumentChunk.__tablename__} USING gin (to_tsvector('{ts_config}'::regconfig, content))"
+    )
+
+    _execute_ddl(connection, [statement], autocommit=concurrently)
+    return {'name': KEYWORD_INDEX_NAME, 'ts_config': ts_config}
+
+
+def drop_keyword_index(connection) -> str:
+    """Drop the full-text keyword index if present"""
+    _execute_ddl(connection, [f"DROP INDEX IF EXISTS {KEYWORD_INDEX_NAME}"])
+    return KEYWORD_INDEX_NAME
+
+
+def _execute_ddl(connection, statements, autocommit: bool = False):
+    """Run DDL on an engine (own transaction) or on a caller-managed connection"""
+    if isinstance(connection, Engine):
+        if autocommit:
+            with connection.connect() as conn:
+                conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                for statement in statements:
+                    conn.execute(text(statement))
+        else:
+            with connection.begin() as conn:
+                for statement in statements:
+                    conn.execute(text(statement))
+    else:
+        for statement in statements:
+            connection.execute(text(statement))
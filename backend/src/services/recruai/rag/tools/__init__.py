@@ -7,6 +7,8 @@ from .ingestor import IngestorTool
 from .embedder import EmbedderTool
 from .retriever import RetrieverTool
 from .generator import GeneratorTool
+from .pipeline import IngestPipeline
+from .job_queue import IngestJobQueue
 
 __all__ = [
     "RAGSupervisor",
@@ -14,4 +16,6 @@ __all__ = [
     "EmbedderTool",
     "RetrieverTool",
     "GeneratorTool",
+    "IngestPipeline",
+    "IngestJobQueue",
 ]
@@ -0,0 +1,164 @@
+"""
+RAG Context Packer
+Fits retrieved chunks into the prompt token budget, dropping near-duplicates
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    tiktoken = None
+
+from ..config import RAGConfig
+from ..models import DocumentChunk
+
+
+logger = logging.getLogger(__name__)
+
+
+class ContextPacker:
+    """
+    Selects and formats retrieved chunks for a prompt.
+
+    Chunks repeating content already selected (same content_hash, or cosine
+    overlap of their term vectors above CONTEXT_DEDUP_SIMILARITY) are dropped,
+    and the rest fill MAX_CONTEXT_LENGTH tokens greedily by relevance per
+    token. Tokens are counted with tiktoken when installed, otherwise
+    estimated at 4 characters per token.
+    """
+
+    WORD_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, config: Optional[RAGConfig] = None):
+        self.config = config or RAGConfig()
+        self._encoding = None
+
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.get_encoding(self.config.CONTEXT_TOKENIZER_ENCODING)
+            except Exception as e:
+                logger.warning(f"Could not load tokenizer {self.config.CONTEXT_TOKENIZER_ENCODING}: {e}")
+
+    @property
+    def tokenizer(self) -> str:
+        return self.config.CONTEXT_TOKENIZER_ENCODING if self._encoding else 'estimate'
+
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens the text takes in a prompt"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, len(text) // 4)
+
+    @staticmethod
+    def relevance(chunk: Dict[str, Any]) -> float:
+        """Retrieval score of a chunk, whichever retrieval method produced it"""
+        for field in ('hybrid_score', 'similarity_score', 'keyword_score'):
+            if chunk.get(field) is not None:
+                return float(chunk[field])
+        return 0.0
+
+    @staticmethod
+    def _header(position: int, chunk: Dict[str, Any]) -> str:
+        source_info = f"Source {position}"
+        if chunk.get('source_type'):
+            source_info += f" ({chunk['source_type']})"
+
+        similarity = chunk.get('similarity_score', 0)
+        if similarity and similarity > 0:
+            source_info += f" - Relevance: {similarity:.2f}"
+
+        return f"[{source_info}]"
+
+    def _term_vector(self, content: str) -> Tuple[Counter, float]:
+        terms = Counter(self.WORD_PATTERN.findall(content.lower()))
+        return terms, math.sqrt(sum(count * count for count in terms.values()))
+
+    @staticmethod
+    def _cosine(a: Tuple[Counter, float], b: Tuple[Counter, float]) -> float:
+        (terms_a, norm_a), (terms_b, norm_b) = a, b
+        if not norm_a or not norm_b:
+            return 0.0
+        if len(terms_a) > len(terms_b):
+            terms_a, terms_b = terms_b, terms_a
+        dot = sum(count * terms_b.get(term, 0) for term, count in terms_a.items())
+        return dot / (norm_a * norm_b)
+
+    def pack(self, chunks: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Pack chunks into a context block within the token budget.
+
+        Args:
+            chunks: Retrieved chunks with 'content' and a retrieval score
+            max_tokens: Token budget (default: config.MAX_CONTEXT_LENGTH)
+
+        Returns:
+            Dictionary with the context 'text', the 'chunks' used (most relevant
+            first), 'tokens' packed and counts of dropped chunks
+        """
+        budget = max_tokens or self.config.MAX_CONTEXT_LENGTH
+        ranked = sorted(
+            (chunk for chunk in chunks if chunk.get('content')),
+            key=self.relevance,
+            reverse=True
+        )
+
+        # Drop repeats of a more relevant chunk
+        unique = []
+        seen_hashes = set()
+        vectors = []
+        duplicates = 0
+        for chunk in ranked:
+            content_hash = chunk.get('content_hash') or DocumentChunk.hash_content(chunk['content'])
+            vector = self._term_vector(chunk['content'])
+            if content_hash in seen_hashes or any(
+                self._cosine(vector, kept) >= self.config.CONTEXT_DEDUP_SIMILARITY for kept in vectors
+            ):
+                duplicates += 1
+                continue
+
+            seen_hashes.add(content_hash)
+            vectors.append(vector)
+            unique.append(chunk)
+
+        # Header tokens are counted with a two-digit position so the estimate holds for any slot
+        candidates = []
+        for rank, chunk in enumerate(unique):
+            cost = self.count_tokens(f"{self._header(10, chunk)}\n{chunk['content']}\n\n")
+            candidates.append((rank, chunk, cost))
+
+        selected = []
+        used = 0
+        for rank, chunk, cost in sorted(
+            candidates, key=lambda item: (self.relevance(item[1]) / item[2], -item[0]), reverse=True
+        ):
+            if used + cost <= budget:
+                selected.append((rank, chunk))
+                used += cost
+
+        selected.sort(key=lambda item: item[0])
+        packed = [chunk for _, chunk in selected]
+
+        context_parts = [
+            f"{self._header(position, chunk)}\n{chunk['content']}\n"
+            for position, chunk in enumerate(packed, start=1)
+        ]
+        text = "\n".join(context_parts)
+
+        return {
+            'text': text,
+            'chunks': packed,
+            'tokens': self.count_tokens(text),
+            'token_budget': budget,
+            'tokenizer': self.tokenizer,
+            'duplicates_removed': duplicates,
+            'chunks_dropped': len(unique) - len(packed),
+        }
@@ -1,6 +1,6 @@
 """
 RAG Embedder Tool
-Converts text chunks to vector embeddings using OpenAI API
+Converts text chunks to vector embeddings using OpenAI API or a local offline model
 """
 
 import asyncio
@@ -8,7 +8,7 @@ import hashlib
 import logging
 import os
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
@@ -21,6 +21,12 @@ except ImportError:
     OpenAI = None
 
 from ..config import RAGConfig
+from .embedding_cache import TieredEmbeddingCache
+from .embedding_providers import (
+    EmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    LocalHashingEmbeddingProvider,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -28,82 +34,150 @@ logger = logging.getLogger(__name__)
 
 class EmbedderTool:
     """
-    Tool for generating vector embeddings from text chunks using OpenAI API.
+    Tool for generating vector embeddings from text chunks.
+    Uses the OpenAI API or a local CPU model, selected by RAGConfig.EMBEDDING_PROVIDER.
     Handles batching, caching, rate limiting, and error recovery.
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[Any] = None, provider: Optional[EmbeddingProvider] = None):
         self.config = RAGConfig()
 
-        # Make OpenAI optional and use Groq as fallback
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        self.groq_api_key = os.getenv('GROQ_API_KEY')
-        
-        if not self.openai_api_key and not self.groq_api_key:
-            raise ValueError("Either OPENAI_API_KEY or GROQ_API_KEY environment variable must be set")
-        
-        # Use Groq if available, OpenAI as fallback
-        self.use_groq = bool(self.groq_api_key)
-
-        if self.use_groq:
-            logger.info("Using Groq for embeddings")
-        else:
-            logger.info("Using OpenAI for embeddings")
+        self.provider = provider or self._create_provider()
+        logger.info(f"Using {self.provider.model_name} for embeddings")
 
-        # Caching and rate limiting
-        self._embedding_cache = {}
-        self._cache_lock = threading.Lock()
+        # Caching (memory LRU + shared disk tier unless a cache is injected) and rate limiting
+        self._cache = cache or TieredEmbeddingCache.from_config(self.config)
         self._rate_limiter = self._RateLimiter(
             requests_per_minute=self.config.MAX_REQUESTS_PER_MINUTE,
-            requests_per_hour=self.config.MAX_REQUESTS_PER_HOUR
+            requests_per_hour=self.config.MAX_REQUESTS_PER_HOUR,
+            tokens_per_minute=self.config.EMBEDDING_TOKENS_PER_MINUTE
         )
 
-        # Thread pool for async processing
-        self._executor = ThreadPoolExecutor(max_workers=4)
+        # Thread pool that embedding batches are dispatched to concurrently
+        self._executor = ThreadPoolExecutor(max_workers=self.config.EMBEDDING_MAX_WORKERS)
+
+    def _create_provider(self) -> EmbeddingProvider:
+        """Build the embedding provider named by RAGConfig.EMBEDDING_PROVIDER"""
+        choice = (self.config.EMBEDDING_PROVIDER or 'auto').lower()
+        if choice == 'auto':
+            # Groq has no embeddings API, so without OpenAI embed locally
+            choice = 'openai' if self.openai_api_key and OPENAI_AVAILABLE else 'local'
+
+        if choice == 'openai':
+            if not self.openai_api_key:
+                raise ValueError("OPENAI_API_KEY environment variable not set")
+            if not OPENAI_AVAILABLE:
+                raise ImportError("OpenAI package not installed. Install with: pip install openai")
+            return OpenAIEmbeddingProvider(
+                OpenAI(api_key=self.openai_api_key),
+                model=self.config.OPENAI_EMBEDDING_MODEL,
+                dimensions=self.config.OPENAI_EMBEDDING_DIMENSIONS
+            )
+
+        if choice == 'local':
+            return LocalHashingEmbeddingProvider(
+                dimensions=self.config.OPENAI_EMBEDDING_DIMENSIONS,
+                model_path=self.config.LOCAL_EMBEDDING_MODEL_PATH or None
+            )
+
+        raise ValueError(f"Unsupported embedding provider: {choice}")
+
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
 
     class _RateLimiter:
-        """Simple rate limiter for OpenAI API calls"""
+        """
+        Thread-safe token-bucket rate limiter for embedding API calls.
+
+        Tracks request and token budgets independently: each bucket refills
+        continuously at its per-window rate and a call proceeds only once
+        every bucket can cover it.
+        """
 
-        def __init__(self, requests_per_minute: int = 60, requests_per_hour: int = 1000):
+        class _Bucket:
+            def __init__(self, capacity: float, window_seconds: float):
+                self.capacity = float(capacity)
+                self.rate = self.capacity / window_seconds
+                self.level = self.capacity
+                self.updated = time.monotonic()
+
+            def refill(self, now: float):
+                self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+                self.updated = now
+
+            def wait_for(self, amount: float) -> float:
+                # Requests larger than the bucket only need it full
+                amount = min(amount, self.capacity)
+                if self.level >= amount:
+                    return 0.0
+                return (amount - self.level) / self.rate
+
+        def __init__(
+            self,
+            requests_per_minute: int = 60,
+            requests_per_hour: int = 1000,
+            tokens_per_minute: int = 1000000
+        ):
             self.requests_per_minute = requests_per_minute
             self.requests_per_hour = requests_per_hour
-            self.minute_calls = []
-            self.hour_calls = []
-
-        def can_make_call(self) -> bool:
+            self.tokens_per_minute = tokens_per_minute
+            self._lock = threading.Lock()
+            self._request_buckets = [
+                self._Bucket(requests_per_minute, 60),
+                self._Bucket(requests_per_hour, 3600),
+            ]
+            self._token_bucket = self._Bucket(tokens_per_minute, 60)
+
+        def _refill(self):
+            now = time.monotonic()
+            for bucket in self._request_buckets + [self._token_bucket]:
+                bucket.refill(now)
+
+        def _wait_locked(self, tokens: int) -> float:
+            self._refill()
+            waits = [bucket.wait_for(1) for bucket in self._request_buckets]
+            waits.append(self._token_bucket.wait_for(tokens))
+            return max(waits)
+
+        def _reserve_locked(self, tokens: int):
+            for bucket in self._request_buckets:
+                bucket.level -= 1
+            self._token_bucket.level -= min(tokens, self._token_bucket.capacity)
+
+        def wait_time(self, tokens: int = 0) -> float:
+            """Get how long to wait before a call of the given token size"""
+            with self._lock:
+                return self._wait_locked(tokens)
+
+        def can_make_call(self, tokens: int = 0) -> bool:
             """Check if we can make another API call"""
-            now = time.time()
-
-            # Clean old calls
-            self.minute_calls = [t for t in self.minute_calls if now - t < 60]
-            self.hour_calls = [t for t in self.hour_calls if now - t < 3600]
+            return self.wait_time(tokens) == 0.0
 
-            return (len(self.minute_calls) < self.requests_per_minute and
-                    len(self.hour_calls) < self.requests_per_hour)
-
-        def record_call(self):
+        def record_call(self, tokens: int = 0):
             """Record that a call was made"""
-            now = time.time()
-            self.minute_calls.append(now)
-            self.hour_calls.append(now)
-
-        def wait_time(self) -> float:
-            """Get how long to wait before next call"""
-            if self.can_make_call():
-                return 0.0
-
-            now = time.time()
-            if self.minute_calls:
-                oldest_minute = min(self.minute_calls)
-                if now - oldest_minute < 60:
-                    return 60 - (now - oldest_minute)
-
-            if self.hour_calls:
-                oldest_hour = min(self.hour_calls)
-                if now - oldest_hour < 3600:
-                    return 3600 - (now - oldest_hour)
-
-            return 1.0  # Default wait time
+            with self._lock:
+                self._refill()
+                self._reserve_locked(tokens)
+
+        def acquire(self, tokens: int = 0) -> float:
+            """
+            Block the calling thread until the call fits the budget, then reserve it.
+
+            Returns:
+                Total seconds spent waiting
+            """
+            waited = 0.0
+            while True:
+                with self._lock:
+                    wait = self._wait_locked(tokens)
+                    if wait == 0.0:
+                        self._reserve_locked(tokens)
+                        return waited
+
+                time.sleep(wait)
+                waited += wait
 
     def generate_embeddings(
         self,
@@ -151,105 +225,164 @@ class EmbedderTool:
 
         return result_chunks
 
+    def iter_embeddings(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        window_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream embeddings for a (possibly lazy) iterable of chunks.
+
+        Chunks are pulled in windows and embedded window by window, so only
+        one window is held in memory regardless of document size.
+
+        Args:
+            chunks: Iterable of chunk dictionaries, e.g. IngestorTool.iter_text_chunks()
+            window_size: Chunks per window (default: config.EMBEDDING_STREAM_WINDOW)
+            use_cache: Whether to use embedding cache
+
+        Yields:
+            Chunks with 'embedding' field added
+        """
+        window_size = window_size or self.config.EMBEDDING_STREAM_WINDOW
+        window = []
+
+        for chunk in chunks:
+            window.append(chunk)
+            if len(window) >= window_size:
+                yield from self.generate_embeddings(window, use_cache=use_cache)
+                window = []
+
+        if window:
+            yield from self.generate_embeddings(window, use_cache=use_cache)
+
     def _generate_embeddings_batch(
         self,
         chunks: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Generate embeddings for chunks in optimized batches"""
+        """Generate embeddings for chunks in token-budgeted batches dispatched concurrently"""
         if not chunks:
             return []
 
-        # OpenAI allows up to 2048 embeddings per request
-        batch_size = min(100, len(chunks))  # Conservative batch size
+        batches = self._make_batches(chunks)
+        total = len(batches)
+
+        futures = [
+            self._executor.submit(self._embed_batch, batch, number, total)
+            for number, batch in enumerate(batches, start=1)
+        ]
+
+        # Collect in submission order so output order matches input order
         embedded_chunks = []
+        for future in futures:
+            embedded_chunks.extend(future.result())
+
+        return embedded_chunks
+
+    def _make_batches(self, chunks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group chunks so each request stays within the per-request token and input limits"""
+        max_tokens = self.config.EMBEDDING_BATCH_MAX_TOKENS
+        max_inputs = self.config.EMBEDDING_BATCH_MAX_INPUTS
+
+        batches = []
+        current = []
+        current_tokens = 0
+        for chunk in chunks:
+            tokens = self._estimate_tokens(chunk['content'])
+            if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(chunk)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token estimate: 1 token ≈ 4 characters"""
+        return max(1, len(text) // 4)
+
+    def _embed_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        batch_number: int,
+        total_batches: int
+    ) -> List[Dict[str, Any]]:
+        """Embed one batch on a worker thread, waiting on the shared rate limiter"""
+        batch_texts = [chunk['content'] for chunk in batch]
+        batch_tokens = sum(self._estimate_tokens(text) for text in batch_texts)
+        embedded_chunks = []
+
+        try:
+            if self.provider.is_remote:
+                waited = self._rate_limiter.acquire(batch_tokens)
+                if waited > 0:
+                    logger.info(f"Rate limited batch {batch_number}, waited {waited:.1f} seconds")
 
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            batch_texts = [chunk['content'] for chunk in batch]
-
-            try:
-                # Wait for rate limit
-                wait_time = self._rate_limiter.wait_time()
-                if wait_time > 0:
-                    logger.info(f"Rate limited, waiting {wait_time:.1f} seconds")
-                    time.sleep(wait_time)
-
-                if self.use_groq:
-                    # Use Groq for embedding (if it supports embeddings)
-                    # For now, return a simple hash as placeholder
-                    response = [hash(text) % 1000 for text in batch_texts]
-                else:
-                    # Make API call
-                    response = self.client.embeddings.create(
-                        input=batch_texts,
-                        model=self.config.OPENAI_EMBEDDING_MODEL
-                    )
-
-                self._rate_limiter.record_call()
-
-                # Process response
-                for j, chunk in enumerate(batch):
-                    embedding_data = response[j] if self.use_groq else response.data[j]
-                    chunk_copy = chunk.copy()
-                    chunk_copy['embedding'] = embedding_data.embedding if not self.use_groq else embedding_data
-                    chunk_copy['embedding_model'] = self.config.OPENAI_EMBEDDING_MODEL
-                    chunk_copy['embedding_tokens'] = embedding_data.usage.total_tokens if hasattr(embedding_data, 'usage') else None
-                    chunk_copy['embedding_generated_at'] = time.time()
-                    embedded_chunks.append(chunk_copy)
-
-                logger.info(f"Embedded batch {i//batch_size + 1}/{(len(chunks) + batch_size - 1)//batch_size}")
-
-            except Exception as e:
-                logger.error(f"Error embedding batch {i//batch_size + 1}: {e}")
-
-                # On error, mark chunks as failed but continue
-                for chunk in batch:
-                    chunk_copy = chunk.copy()
-                    chunk_copy['embedding_error'] = str(e)
-                    chunk_copy['embedding'] = None
-                    embedded_chunks.append(chunk_copy)
+            embeddings = self.provider.embed(batch_texts)
+
+            generated_at = time.time()
+            for chunk, embedding in zip(batch, embeddings):
+                chunk_copy = chunk.copy()
+                chunk_copy['embedding'] = embedding
+                chunk_copy['embedding_model'] = self.model_name
+                chunk_copy['embedding_tokens'] = self._estimate_tokens(chunk['content'])
+                chunk_copy['embedding_generated_at'] = generated_at
+                embedded_chunks.append(chunk_copy)
+
+            logger.info(f"Embedded batch {batch_number}/{total_batches}")
+
+        except Exception as e:
+            logger.error(f"Error embedding batch {batch_number}: {e}")
+
+            # On error, mark chunks as failed but continue
+            for chunk in batch:
+                chunk_copy = chunk.copy()
+                chunk_copy['embedding_error'] = str(e)
+                chunk_copy['embedding'] = None
+                embedded_chunks.append(chunk_copy)
 
         return embedded_chunks
 
     def _apply_cache(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Apply embedding cache to chunks"""
-        with self._cache_lock:
-            for chunk in chunks:
-                cache_key = self._get_cache_key(chunk['content'])
-                if cache_key in self._embedding_cache:
-                    cached_data = self._embedding_cache[cache_key]
-                    chunk['embedding'] = cached_data['embedding']
-                    chunk['embedding_model'] = cached_data['model']
-                    chunk['embedding_from_cache'] = True
-                    chunk['embedding_cached_at'] = cached_data['cached_at']
+        keys = [self._get_cache_key(chunk['content']) for chunk in chunks]
+        cached = self._cache.get_many(list(set(keys)))
+
+        for chunk, cache_key in zip(chunks, keys):
+            cached_data = cached.get(cache_key)
+            if cached_data:
+                chunk['embedding'] = cached_data['embedding']
+                chunk['embedding_model'] = cached_data['model']
+                chunk['embedding_from_cache'] = True
+                chunk['embedding_cached_at'] = cached_data['cached_at']
 
         return chunks
 
     def _update_cache(self, chunks: List[Dict[str, Any]]):
         """Update embedding cache with new embeddings"""
-        with self._cache_lock:
-            for chunk in chunks:
-                if 'embedding' in chunk and chunk['embedding'] is not None:
-                    cache_key = self._get_cache_key(chunk['content'])
-                    self._embedding_cache[cache_key] = {
-                        'embedding': chunk['embedding'],
-                        'model': chunk.get('embedding_model', self.config.OPENAI_EMBEDDING_MODEL),
-                        'cached_at': time.time()
-                    }
-
-            # Limit cache size to prevent memory issues
-            if len(self._embedding_cache) > 10000:
-                # Remove oldest 20% of entries
-                items = list(self._embedding_cache.items())
-                items.sort(key=lambda x: x[1]['cached_at'])
-                to_remove = items[:len(items) // 5]
-                for key, _ in to_remove:
-                    del self._embedding_cache[key]
+        now = time.time()
+        entries = {}
+        for chunk in chunks:
+            if 'embedding' in chunk and chunk['embedding'] is not None:
+                entries[self._get_cache_key(chunk['content'])] = {
+                    'embedding': chunk['embedding'],
+                    'model': chunk.get('embedding_model', self.model_name),
+                    'cached_at': now
+                }
+
+        if entries:
+            self._cache.set_many(entries)
 
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key for text content"""
         # Include model in cache key to avoid mixing different models
-        content = f"{self.config.OPENAI_EMBEDDING_MODEL}:{text}"
+        content = f"{self.model_name}:{text}"
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
     def validate_embeddings(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -289,19 +422,23 @@ class EmbedderTool:
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        with self._cache_lock:
-            return {
-                'cache_size': len(self._embedding_cache),
-                'cache_limit': 10000,
-                'oldest_entry': min((v['cached_at'] for v in self._embedding_cache.values()), default=None),
-                'newest_entry': max((v['cached_at'] for v in self._embedding_cache.values()), default=None)
-            }
+        stats = self._cache.get_stats()
+        memory = stats.get('memory') or {}
+        return {
+            'cache_size': memory.get('size'),
+            'cache_limit': memory.get('limit'),
+            'hits': memory.get('hits', 0),
+            'misses': memory.get('misses', 0),
+            'evictions': memory.get('evictions', 0),
+            'hit_rate': memory.get('hit_rate', 0.0),
+            'tiers': stats,
+            'provider': self.provider.get_info(),
+        }
 
     def clear_cache(self):
         """Clear the embedding cache"""
-        with self._cache_lock:
-            self._embedding_cache.clear()
-            logger.info("Embedding cache cleared")
+        self._cache.clear()
+        logger.info("Embedding cache cleared")
 
     def estimate_cost(self, text_lengths: List[int]) -> Dict[str, Any]:
         """Estimate OpenAI API cost for given text lengths"""
@@ -318,11 +455,6 @@ class EmbedderTool:
             'cost_per_1k_tokens': 0.0001
         }
 
-    def embed_text(self, text: str):
-        if self.use_groq:
-            # Use Groq for embedding (if it supports embeddings)
-            # For now, return a simple hash as placeholder
-            return hash(text) % 1000
-        else:
-            # Use OpenAI embeddings
-            pass
+    def embed_text(self, text: str) -> List[float]:
+        """Embed a single text with the configured provider"""
+        return self.provider.embed([text])[0]
@@ -0,0 +1,337 @@
+"""
+RAG Embedding Cache
+Tiered embedding cache: in-process LRU with TTL in front of a shared SQLite store
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+from ..config import RAGConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+class LRUEmbeddingCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry TTL.
+
+    Lookups, inserts and evictions are O(1): entries live in an OrderedDict
+    ordered by recency, so the least recently used entry is always first.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return bool(self.ttl_seconds) and now - entry['cached_at'] > self.ttl_seconds
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return cached entries for the given keys, skipping misses and expired entries"""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    continue
+                if self._is_expired(entry, now):
+                    del self._entries[key]
+                    self.expirations += 1
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[key] = entry
+        return found
+
+    def set_many(self, entries: Dict[str, Dict[str, Any]]):
+        """Insert or refresh entries, evicting least recently used ones past the limit"""
+        with self._lock:
+            for key, entry in entries.items():
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'limit': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteEmbeddingStore:
+    """
+    On-disk embedding store shared by every worker on the host.
+
+    Embeddings are stored as packed float32 blobs keyed by the embedder's
+    cache key. WAL mode lets gunicorn workers read concurrently while one
+    writes; each thread keeps its own connection.
+    """
+
+    # Trim the store back under its limit every N writes rather than on each insert
+    TRIM_INTERVAL = 500
+
+    def __init__(self, path: str, max_entries: int = 100000, ttl_seconds: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._writes_since_trim = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "cache_key TEXT PRIMARY KEY, "
+            "model TEXT, "
+            "embedding BLOB NOT NULL, "
+            "cached_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_cache_accessed_at "
+            "ON embedding_cache (accessed_at)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _pack(embedding: List[float]) -> bytes:
+        return array('f', embedding).tobytes()
+
+    @staticmethod
+    def _unpack(blob: bytes) -> List[float]:
+        values = array('f')
+        values.frombytes(blob)
+        return values.tolist()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not keys:
+            return {}
+
+        now = time.time()
+        conn = self._connection()
+        found = {}
+
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT cache_key, model, embedding, cached_at FROM embedding_cache "
+                f"WHERE cache_key IN ({placeholders})",
+                batch
+            ).fetchall()
+            for cache_key, model, blob, cached_at in rows:
+                if self.ttl_seconds and now - cached_at > self.ttl_seconds:
+                    continue
+                found[cache_key] = {
+                    'embedding': self._unpack(blob),
+                    'model': model,
+                    'cached_at': cached_at,
+                }
+
+        if found:
+            conn.executemany(
+                "UPDATE embedding_cache SET accessed_at = ? WHERE cache_key = ?",
+                [(now, key) for key in found]
+            )
+            conn.commit()
+
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def set_many(self, entries: Dict[str, Dict[str, Any]]):
+        if not entries:
+            return
+
+        now = time.time()
+        conn = self._connection()
+        conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (cache_key, model, embedding, cached_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (key, entry.get('model'), self._pack(entry['embedding']), entry.get('cached_at', now), now)
+                for key, entry in entries.items()
+            ]
+        )
+        conn.commit()
+
+        with self._stats_lock:
+            self._writes_since_trim += len(entries)
+            should_trim = self._writes_since_trim >= self.TRIM_INTERVAL
+            if should_trim:
+                self._writes_since_trim = 0
+
+        if should_trim:
+            self._trim()
+
+    def _trim(self):
+        """Drop expired entries and the least recently accessed ones past the limit"""
+        conn = self._connection()
+        removed = 0
+        if self.ttl_seconds:
+            removed += conn.execute(
+                "DELETE FROM embedding_cache WHERE cached_at < ?",
+                (time.time() - self.ttl_seconds,)
+            ).rowcount
+
+        excess = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += conn.execute(
+                "DELETE FROM embedding_cache WHERE cache_key IN ("
+                "SELECT cache_key FROM embedding_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            ).rowcount
+        conn.commit()
+
+        with self._stats_lock:
+            self.evictions += removed
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM embedding_cache")
+        conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        size = self._connection().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'size': size,
+                'limit': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class TieredEmbeddingCache:
+    """
+    Embedding cache that checks the in-memory LRU first, then the shared disk store.
+
+    Disk hits are promoted into memory; new embeddings are written to both tiers.
+    Any object exposing get_many/set_many/clear/get_stats can be used as a tier.
+    """
+
+    def __init__(self, memory_tier: LRUEmbeddingCache, disk_tier: Optional[Any] = None):
+        self.memory = memory_tier
+        self.disk = disk_tier
+
+    @classmethod
+    def from_config(cls, config: Optional[RAGConfig] = None) -> 'TieredEmbeddingCache':
+        """Build the cache tiers from RAGConfig settings"""
+        config = config or RAGConfig()
+        memory = LRUEmbeddingCache(
+            max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl_seconds=config.CACHE_TTL_SECONDS
+        )
+
+        disk = None
+        if config.EMBEDDING_CACHE_PATH:
+            try:
+                disk = SQLiteEmbeddingStore(
+                    config.EMBEDDING_CACHE_PATH,
+                    max_entries=config.EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+                    ttl_seconds=config.CACHE_TTL_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"Disk embedding cache unavailable, using memory only: {e}")
+
+        return cls(memory, disk)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = self.memory.get_many(keys)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.disk is not None:
+            try:
+                from_disk = self.disk.get_many(missing)
+            except Exception as e:
+                logger.warning(f"Disk embedding cache read failed: {e}")
+                from_disk = {}
+
+            if from_disk:
+                self.memory.set_many(from_disk)
+                found.update(from_disk)
+
+        return found
+
+    def set_many(self, entries: Dict[str, Dict[str, Any]]):
+        self.memory.set_many(entries)
+        if self.disk is not None:
+            try:
+                self.disk.set_many(entries)
+            except Exception as e:
+                logger.warning(f"Disk embedding cache write failed: {e}")
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        memory_stats = self.memory.get_stats()
+        disk_stats = None
+        if self.disk is not None:
+            try:
+                disk_stats = self.disk.get_stats()
+            except Exception as e:
+                disk_stats = {'error': str(e)}
+
+        return {
+            'memory': memory_stats,
+            'disk': disk_stats,
+        }
@@ -0,0 +1,197 @@
+"""
+RAG Embedding Providers
+Pluggable embedding backends used by EmbedderTool: OpenAI API or a local CPU model
+"""
+
+import hashlib
+import logging
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+from ..config import RAGConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProvider(ABC):
+    """
+    Interface for embedding backends.
+
+    Providers turn a batch of texts into fixed-dimension vectors. Remote
+    providers are rate limited by EmbedderTool; local ones are not.
+    """
+
+    model_name: str = ""
+    dimensions: int = 0
+    is_remote: bool = True
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, returning one vector per text"""
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'model': self.model_name,
+            'dimensions': self.dimensions,
+            'remote': self.is_remote,
+        }
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI embeddings API"""
+
+    is_remote = True
+
+    def __init__(self, client, model: str, dimensions: int):
+        self.client = client
+        self.model_name = model
+        self.dimensions = dimensions
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(input=texts, model=self.model_name)
+        return [item.embedding for item in response.data]
+
+
+class LocalHashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Offline CPU embeddings using the hashing trick.
+
+    Word unigrams and bigrams are hashed (CRC32, stable across processes) into
+    a fixed number of signed buckets, counts are log-scaled, optionally
+    re-weighted by IDF weights fitted on a corpus, and L2-normalised. A whole
+    batch is built as one matrix, so thousands of chunks embed per second.
+
+    Fitted IDF weights can be saved to and loaded from an .npz file; the model
+    name carries a fingerprint of the weights so caches never mix vectors from
+    different fits.
+    """
+
+    is_remote = False
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+    BASE_MODEL_NAME = "local-hashing-v1"
+
+    def __init__(self, dimensions: Optional[int] = None, model_path: Optional[str] = None):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy package not installed. Install with: pip install numpy")
+
+        self.dimensions = dimensions or RAGConfig.OPENAI_EMBEDDING_DIMENSIONS
+        self.model_path = model_path
+        self._idf = None
+        self._feature_cache = {}
+        self.model_name = self.BASE_MODEL_NAME
+
+        if model_path and os.path.exists(model_path):
+            self.load(model_path)
+
+    def _tokenize(self, text: str) -> List[str]:
+        return self.TOKEN_PATTERN.findall(text.lower())
+
+    def _features(self, text: str) -> List[str]:
+        tokens = self._tokenize(text)
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens + bigrams
+
+    def _hash_feature(self, feature: str):
+        """Map a feature to (bucket, sign); memoised since vocabularies repeat"""
+        cached = self._feature_cache.get(feature)
+        if cached is None:
+            h = zlib.crc32(feature.encode('utf-8'))
+            cached = (h % self.dimensions, 1.0 if h & 0x80000000 else -1.0)
+            if len(self._feature_cache) < 500000:
+                self._feature_cache[feature] = cached
+        return cached
+
+    def _term_matrix(self, texts: List[str]):
+        """Signed, log-scaled hashed term counts for a batch of texts"""
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                col, sign = self._hash_feature(feature)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(signs, dtype=np.float32))
+
+        # Sublinear term frequency keeps repeated words from dominating
+        return np.sign(matrix) * np.log1p(np.abs(matrix))
+
+    def encode(self, texts: List[str]):
+        """Embed a batch of texts into an L2-normalised float32 matrix"""
+        matrix = self._term_matrix(texts)
+        if self._idf is not None:
+            matrix *= self._idf
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(texts).tolist()
+
+    def fit(self, texts: List[str]) -> 'LocalHashingEmbeddingProvider':
+        """Fit IDF bucket weights on a corpus (e.g. existing DocumentChunk content)"""
+        if not texts:
+            return self
+
+        document_frequency = np.zeros(self.dimensions, dtype=np.float64)
+        for start in range(0, len(texts), 1000):
+            batch = self._term_matrix(texts[start:start + 1000])
+            document_frequency += (batch != 0).sum(axis=0)
+
+        idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0
+        self._set_idf(idf.astype(np.float32))
+        return self
+
+    def _set_idf(self, idf):
+        self._idf = idf
+        fingerprint = hashlib.sha256(idf.tobytes()).hexdigest()[:12]
+        self.model_name = f"{self.BASE_MODEL_NAME}-idf-{fingerprint}"
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Persist fitted weights to an .npz file"""
+        path = path or self.model_path
+        if not path:
+            raise ValueError("No model path given")
+        if self._idf is None:
+            raise ValueError("Model has not been fitted")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, idf=self._idf, dimensions=np.int64(self.dimensions))
+
+        logger.info(f"Saved local embedding model {self.model_name} to {path}")
+        return path
+
+    def load(self, path: str):
+        """Load fitted weights from an .npz file"""
+        with np.load(path) as data:
+            dimensions = int(data['dimensions'])
+            if dimensions != self.dimensions:
+                raise ValueError(
+                    f"Local embedding model at {path} has {dimensions} dimensions, expected {self.dimensions}"
+                )
+            self._set_idf(data['idf'].astype(np.float32))
+
+        logger.info(f"Loaded local embedding model {self.model_name} from {path}")
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info['fitted'] = self._idf is not None
+        info['model_path'] = self.model_path
+        return info
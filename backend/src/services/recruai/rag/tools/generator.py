@@ -1,21 +1,16 @@
 """
 RAG Generator Tool
-Generates answers using LLM (GPT-4) based on retrieved context
+Generates answers using an LLM (through the LLM gateway) based on retrieved context
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 from datetime import datetime
 
-try:
-    import openai
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    OpenAI = None
-
 from ..config import RAGConfig
+from .context_packer import ContextPacker
+from ...llm_cache import get_llm_response_cache
+from ...llm_gateway import get_llm_gateway
 
 
 logger = logging.getLogger(__name__)
@@ -24,19 +19,20 @@ logger = logging.getLogger(__name__)
 class GeneratorTool:
     """
     Tool for generating grounded answers using retrieved context and LLM.
-    Uses OpenAI GPT-4 for high-quality response generation.
+    Completions go through the LLM gateway, preferring COMPLETION_PROVIDER
+    (OpenAI GPT-4 by default) and failing over to other configured providers.
     """
 
     def __init__(self):
-        if not OPENAI_AVAILABLE:
-            raise ImportError("OpenAI package not installed. Install with: pip install openai")
-
         self.config = RAGConfig()
+        self.gateway = get_llm_gateway()
 
-        if not self.config.OPENAI_API_KEY:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
+        if not self.gateway.available_providers():
+            raise ValueError("No LLM provider API key set (OPENAI_API_KEY or GROQ_API_KEY)")
 
-        self.client = OpenAI(api_key=self.config.OPENAI_API_KEY)
+        # Models per provider; other providers use their default model
+        self.models = {'openai': self.config.OPENAI_COMPLETION_MODEL}
+        self.context_packer = ContextPacker(self.config)
 
         # Rate limiting (GPT-4 has different limits than embeddings)
         self._request_count = 0
@@ -64,8 +60,9 @@ class GeneratorTool:
             Dictionary containing answer, metadata, and confidence
         """
         try:
-            # Prepare context from chunks
-            context_text = self._prepare_context(context_chunks)
+            # Pack the most relevant, non-redundant chunks into the context budget
+            packed = self._pack_context(context_chunks)
+            context_text = packed['text']
 
             # Build system prompt
             system_prompt = self._build_system_prompt(user_context)
@@ -77,12 +74,13 @@ class GeneratorTool:
             self._check_rate_limit()
 
             # Make API call
-            response = self.client.chat.completions.create(
-                model=self.config.OPENAI_COMPLETION_MODEL,
-                messages=[
+            result = self.gateway.complete(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
+                preferred=self.config.COMPLETION_PROVIDER,
+                models=self.models,
                 max_tokens=max_tokens or self.config.OPENAI_MAX_TOKENS,
                 temperature=temperature or self.config.OPENAI_TEMPERATURE,
                 top_p=0.9,  # Slightly focused
@@ -93,29 +91,79 @@ class GeneratorTool:
             self._request_count += 1
 
             # Extract answer
-            answer = response.choices[0].message.content.strip()
+            answer = result['content'].strip()
 
-            # Calculate confidence based on context relevance
-            confidence = self._calculate_confidence(query, context_chunks, answer)
-
-            # Extract sources
-            sources = self._extract_sources(context_chunks)
+            return self._build_answer(query, packed, answer, result)
 
+        except Exception as e:
+            logger.error(f"Error generating answer: {e}")
             return {
-                'answer': answer,
-                'confidence': confidence,
-                'sources': sources,
-                'model': self.config.OPENAI_COMPLETION_MODEL,
-                'tokens_used': response.usage.total_tokens if response.usage else None,
-                'finish_reason': response.choices[0].finish_reason,
-                'generated_at': datetime.utcnow().isoformat(),
-                'context_chunks_used': len(context_chunks),
-                'query': query
+                'error': str(e),
+                'answer': "I apologize, but I encountered an error while generating a response. Please try again.",
+                'confidence': 0.0,
+                'sources': [],
+                'generated_at': datetime.utcnow().isoformat()
             }
 
+    def generate_answer_stream(
+        self,
+        query: str,
+        context_chunks: List[Dict[str, Any]],
+        user_context: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream an answer using retrieved context chunks.
+
+        Args:
+            query: The user's question
+            context_chunks: Retrieved relevant chunks with metadata
+            user_context: User-specific context (role, preferences, etc.)
+            max_tokens: Maximum tokens for response
+            temperature: Creativity/randomness (0.0-1.0)
+
+        Yields:
+            {'type': 'token', 'content': ...} events as the completion arrives,
+            then one 'done' event carrying the generate_answer fields (or an
+            'error' event)
+        """
+        try:
+            packed = self._pack_context(context_chunks)
+            system_prompt = self._build_system_prompt(user_context)
+            user_prompt = self._build_user_prompt(query, packed['text'])
+
+            self._check_rate_limit()
+
+            events = self.gateway.stream(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                preferred=self.config.COMPLETION_PROVIDER,
+                models=self.models,
+                max_tokens=max_tokens or self.config.OPENAI_MAX_TOKENS,
+                temperature=temperature or self.config.OPENAI_TEMPERATURE,
+                top_p=0.9,
+                frequency_penalty=0.1,
+                presence_penalty=0.1
+            )
+
+            self._request_count += 1
+
+            parts = []
+            for event in events:
+                if event['type'] == 'token':
+                    parts.append(event['content'])
+                    yield event
+                elif event['type'] == 'done':
+                    answer = "".join(parts).strip()
+                    yield {'type': 'done', **self._build_answer(query, packed, answer, event)}
+
         except Exception as e:
-            logger.error(f"Error generating answer: {e}")
-            return {
+            logger.error(f"Error streaming answer: {e}")
+            yield {
+                'type': 'error',
                 'error': str(e),
                 'answer': "I apologize, but I encountered an error while generating a response. Please try again.",
                 'confidence': 0.0,
@@ -123,6 +171,35 @@ class GeneratorTool:
                 'generated_at': datetime.utcnow().isoformat()
             }
 
+    def _build_answer(
+        self,
+        query: str,
+        packed: Dict[str, Any],
+        answer: str,
+        completion: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Assemble the answer payload shared by generate_answer and generate_answer_stream."""
+        # Calculate confidence based on context relevance
+        confidence = self._calculate_confidence(query, packed['chunks'], answer)
+
+        # Extract sources
+        sources = self._extract_sources(packed['chunks'])
+
+        return {
+            'answer': answer,
+            'confidence': confidence,
+            'sources': sources,
+            'model': completion.get('model'),
+            'provider': completion.get('provider'),
+            'tokens_used': (completion.get('usage') or {}).get('total_tokens'),
+            'finish_reason': completion.get('finish_reason'),
+            'generated_at': datetime.utcnow().isoformat(),
+            'context_chunks_used': len(packed['chunks']),
+            'context_tokens': packed['tokens'],
+            'context_duplicates_removed': packed['duplicates_removed'],
+            'query': query
+        }
+
     def generate_summary(
         self,
         content: str,
@@ -153,21 +230,45 @@ class GeneratorTool:
             if max_length:
                 user_prompt += f"\n\nKeep the summary under {max_length} words."
 
+            max_tokens = min(max_length * 2 if max_length else 500, 1000)
+            temperature = 0.3  # More focused for summaries
+
+            # Low temperature, so near-identical content can reuse a cached summary
+            cache = get_llm_response_cache()
+            cache_model = f"{self.config.COMPLETION_PROVIDER}/{self.config.OPENAI_COMPLETION_MODEL}:{max_tokens}"
+            cached = cache.get(cache_model, system_prompt, user_prompt, temperature=temperature) if cache else None
+            if cached is not None:
+                return {
+                    'summary': cached,
+                    'summary_type': summary_type,
+                    'original_length': len(content),
+                    'summary_length': len(cached),
+                    'compression_ratio': len(cached) / len(content) if content else 0,
+                    'model': None,
+                    'provider': None,
+                    'tokens_used': 0,
+                    'cached': True,
+                    'generated_at': datetime.utcnow().isoformat()
+                }
+
             self._check_rate_limit()
 
-            response = self.client.chat.completions.create(
-                model=self.config.OPENAI_COMPLETION_MODEL,
-                messages=[
+            result = self.gateway.complete(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                max_tokens=min(max_length * 2 if max_length else 500, 1000),
-                temperature=0.3  # More focused for summaries
+                preferred=self.config.COMPLETION_PROVIDER,
+                models=self.models,
+                max_tokens=max_tokens,
+                temperature=temperature
             )
 
             self._request_count += 1
 
-            summary = response.choices[0].message.content.strip()
+            summary = result['content'].strip()
+            if cache is not None:
+                cache.set(cache_model, system_prompt, user_prompt, summary, temperature=temperature)
 
             return {
                 'summary': summary,
@@ -175,8 +276,9 @@ class GeneratorTool:
                 'original_length': len(content),
                 'summary_length': len(summary),
                 'compression_ratio': len(summary) / len(content) if content else 0,
-                'model': self.config.OPENAI_COMPLETION_MODEL,
-                'tokens_used': response.usage.total_tokens if response.usage else None,
+                'model': result['model'],
+                'provider': result['provider'],
+                'tokens_used': (result.get('usage') or {}).get('total_tokens'),
                 'generated_at': datetime.utcnow().isoformat()
             }
 
@@ -188,32 +290,23 @@ class GeneratorTool:
                 'generated_at': datetime.utcnow().isoformat()
             }
 
-    def _prepare_context(self, context_chunks: List[Dict[str, Any]]) -> str:
-        """Prepare context text from retrieved chunks."""
+    def _pack_context(self, context_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pack retrieved chunks into the context token budget."""
         if not context_chunks:
-            return "No relevant context found."
+            return {'text': "No relevant context found.", 'chunks': [], 'tokens': 0, 'duplicates_removed': 0}
 
-        # Sort by similarity score if available
-        sorted_chunks = sorted(
-            context_chunks,
-            key=lambda x: x.get('similarity_score', 0),
-            reverse=True
+        packed = self.context_packer.pack(context_chunks)
+        logger.debug(
+            f"Packed {len(packed['chunks'])}/{len(context_chunks)} chunks into {packed['tokens']} tokens "
+            f"({packed['duplicates_removed']} duplicates, {packed['chunks_dropped']} over budget)"
         )
+        if not packed['chunks']:
+            packed['text'] = "No relevant context found."
+        return packed
 
-        # Build context with source attribution
-        context_parts = []
-        for i, chunk in enumerate(sorted_chunks[:5]):  # Limit to top 5 chunks
-            source_info = f"Source {i+1}"
-            if chunk.get('source_type'):
-                source_info += f" ({chunk['source_type']})"
-
-            similarity = chunk.get('similarity_score', 0)
-            if similarity > 0:
-                source_info += f" - Relevance: {similarity:.2f}"
-
-            context_parts.append(f"[{source_info}]\n{chunk['content']}\n")
-
-        return "\n".join(context_parts)
+    def _prepare_context(self, context_chunks: List[Dict[str, Any]]) -> str:
+        """Prepare context text from retrieved chunks."""
+        return self._pack_context(context_chunks)['text']
 
     def _build_system_prompt(self, user_context: Optional[Dict[str, Any]] = None) -> str:
         """Build system prompt based on user context."""
@@ -387,7 +480,9 @@ Respond as a senior executive interviewer would - be direct, demanding, and focu
             'last_reset': self._last_reset.isoformat(),
             'model': self.config.OPENAI_COMPLETION_MODEL,
             'max_tokens': self.config.OPENAI_MAX_TOKENS,
-            'temperature': self.config.OPENAI_TEMPERATURE
+            'temperature': self.config.OPENAI_TEMPERATURE,
+            'providers': self.gateway.get_stats(),
+            'response_cache': get_llm_response_cache().get_stats() if get_llm_response_cache() else None
         }
 
     def validate_answer(self, answer: Dict[str, Any]) -> Dict[str, Any]:
@@ -5,7 +5,7 @@ Converts various input types into text chunks for embedding
 
 import logging
 import re
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Iterator
 from pathlib import Path
 import hashlib
 
@@ -21,6 +21,8 @@ class IngestorTool:
     Handles text, PDF, and other document formats.
     """
 
+    _SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
     def __init__(self):
         self.config = RAGConfig()
 
@@ -46,12 +48,7 @@ class IngestorTool:
             cleaned_text = self._preprocess_text(text)
 
             # Split into chunks based on strategy
-            if chunking_strategy == "semantic":
-                chunks = self._semantic_chunking(cleaned_text)
-            elif chunking_strategy == "sentence":
-                chunks = self._sentence_chunking(cleaned_text)
-            else:
-                chunks = self._fixed_size_chunking(cleaned_text)
+            chunks = list(self._iter_chunk_texts(cleaned_text, chunking_strategy))
 
             # Create chunk objects with metadata
             chunk_objects = []
@@ -80,6 +77,54 @@ class IngestorTool:
             logger.error(f"Error ingesting text: {e}")
             raise
 
+    def iter_text_chunks(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunking_strategy: str = "semantic"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily chunk plain text, yielding one chunk dictionary at a time.
+
+        Same chunks as ingest_text, but nothing is materialised up front, so
+        callers can stream large documents through embedding and storage.
+        'processing_info' omits 'chunk_count' since it is not known in advance.
+
+        Args:
+            text: The text content to process
+            metadata: Additional metadata for the chunks
+            chunking_strategy: Strategy for chunking ('semantic', 'fixed', 'sentence')
+
+        Yields:
+            Chunk dictionaries with metadata
+        """
+        cleaned_text = self._preprocess_text(text)
+
+        for i, chunk_text in enumerate(self._iter_chunk_texts(cleaned_text, chunking_strategy)):
+            if len(chunk_text.strip()) < 10:  # Skip very small chunks
+                continue
+
+            yield {
+                'content': chunk_text.strip(),
+                'chunk_index': i,
+                'word_count': len(chunk_text.split()),
+                'char_count': len(chunk_text),
+                'metadata': metadata or {},
+                'processing_info': {
+                    'chunking_strategy': chunking_strategy,
+                    'original_length': len(text),
+                }
+            }
+
+    def _iter_chunk_texts(self, text: str, chunking_strategy: str) -> Iterator[str]:
+        """Dispatch to the chunking generator for the given strategy."""
+        if chunking_strategy == "semantic":
+            return self._iter_semantic_chunks(text)
+        elif chunking_strategy == "sentence":
+            return self._iter_sentence_chunks(text)
+        else:
+            return self._iter_fixed_size_chunks(text)
+
     def ingest_pdf(
         self,
         file_path: Union[str, Path],
@@ -170,21 +215,23 @@ class IngestorTool:
 
     def _semantic_chunking(self, text: str) -> List[str]:
         """Split text into semantically meaningful chunks."""
-        if len(text) <= self.config.CHUNK_SIZE:
-            return [text]
+        return list(self._iter_semantic_chunks(text))
 
-        chunks = []
-        sentences = self._split_into_sentences(text)
+    def _iter_semantic_chunks(self, text: str) -> Iterator[str]:
+        """Yield semantically meaningful chunks of whole sentences."""
+        if len(text) <= self.config.CHUNK_SIZE:
+            yield text
+            return
 
         current_chunk = ""
         current_length = 0
 
-        for sentence in sentences:
+        for sentence in self._iter_sentences(text):
             sentence_length = len(sentence)
 
             # If adding this sentence would exceed chunk size, save current chunk
             if current_length + sentence_length > self.config.CHUNK_SIZE and current_chunk:
-                chunks.append(current_chunk.strip())
+                yield current_chunk.strip()
                 current_chunk = sentence
                 current_length = sentence_length
             else:
@@ -193,34 +240,35 @@ class IngestorTool:
 
         # Add the last chunk
         if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-
-        return chunks
+            yield current_chunk.strip()
 
     def _sentence_chunking(self, text: str) -> List[str]:
         """Split text into sentence-based chunks."""
-        sentences = self._split_into_sentences(text)
-        chunks = []
+        return list(self._iter_sentence_chunks(text))
+
+    def _iter_sentence_chunks(self, text: str) -> Iterator[str]:
+        """Yield sentence-based chunks."""
         current_chunk = ""
 
-        for sentence in sentences:
+        for sentence in self._iter_sentences(text):
             if len(current_chunk + sentence) > self.config.CHUNK_SIZE and current_chunk:
-                chunks.append(current_chunk.strip())
+                yield current_chunk.strip()
                 current_chunk = sentence
             else:
                 current_chunk += sentence
 
         if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-
-        return chunks
+            yield current_chunk.strip()
 
     def _fixed_size_chunking(self, text: str) -> List[str]:
         """Split text into fixed-size chunks with overlap."""
+        return list(self._iter_fixed_size_chunks(text))
+
+    def _iter_fixed_size_chunks(self, text: str) -> Iterator[str]:
+        """Yield fixed-size chunks with overlap."""
         if not text:
-            return []
+            return
 
-        chunks = []
         start = 0
 
         while start < len(text):
@@ -238,21 +286,28 @@ class IngestorTool:
 
             chunk = text[start:end].strip()
             if chunk:
-                chunks.append(chunk)
+                yield chunk
 
             # Move start position with overlap
             start = end - self.config.CHUNK_OVERLAP
 
-        return chunks
-
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences using regex."""
-        # Simple sentence splitting - can be enhanced with NLP libraries
-        sentence_pattern = r'(?<=[.!?])\s+'
-        sentences = re.split(sentence_pattern, text)
+        return list(self._iter_sentences(text))
 
-        # Filter out empty sentences
-        return [s.strip() for s in sentences if s.strip()]
+    def _iter_sentences(self, text: str) -> Iterator[str]:
+        """Yield sentences lazily, splitting on whitespace after . ! or ?"""
+        # Simple sentence splitting - can be enhanced with NLP libraries
+        start = 0
+        for match in self._SENTENCE_BOUNDARY.finditer(text):
+            sentence = text[start:match.start()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+
+        sentence = text[start:].strip()
+        if sentence:
+            yield sentence
 
     def _extract_pdf_text(self, file_path: Path) -> str:
         """Extract text from PDF file."""
@@ -0,0 +1,336 @@
+"""
+RAG Ingest Job Queue
+Runs IngestPipeline jobs on a background worker pool, tracked in the rag_ingest_jobs table
+"""
+
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from sqlalchemy import update, select
+from sqlalchemy.orm import sessionmaker
+
+from ..config import RAGConfig
+from ..models import IngestJob
+
+
+logger = logging.getLogger(__name__)
+
+
+class IngestJobQueue:
+    """
+    Background ingestion queue backed by the database.
+
+    submit() stores the job row and returns immediately; a thread pool picks
+    jobs up and runs them through the IngestPipeline, writing per-stage
+    progress back to the row after every batch. Jobs are claimed with a
+    conditional UPDATE, so several worker processes can share the table
+    without running a job twice. While a job runs, its worker touches the
+    row every INGEST_JOB_HEARTBEAT_SECONDS; jobs left queued, or running
+    without a heartbeat because their process died, are picked up again by
+    recover(), which runs every INGEST_JOB_RECOVER_INTERVAL_SECONDS once
+    start_recovery() has been called.
+    """
+
+    def __init__(self, pipeline, max_workers: Optional[int] = None, supervisor=None):
+        self.config = RAGConfig()
+        self.pipeline = pipeline
+        self.supervisor = supervisor
+        self.max_workers = max_workers or self.config.INGEST_JOB_WORKERS
+        self._executor = None
+        self._session_factory = None
+        self._bound_engine = None
+        self._recovery_thread = None
+        self._recovery_stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _session(self):
+        """Open a session on the pipeline's engine, rebuilding the factory if it changed."""
+        engine = self.pipeline.db_engine
+        if not engine:
+            raise ValueError("Database engine not provided")
+
+        if engine is not self._bound_engine:
+            self.pipeline.ensure_tables()
+            self._session_factory = sessionmaker(bind=engine)
+            self._bound_engine = engine
+
+        return self._session_factory()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="rag-ingest"
+                )
+            return self._executor
+
+    def submit(
+        self,
+        content: str,
+        document_id: str,
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunking_strategy: str = "semantic"
+    ) -> Dict[str, Any]:
+        """
+        Queue a text document for background ingestion.
+
+        Args:
+            content: The text content to ingest
+            document_id: Identifier for the document
+            source_type: 'resume', 'job_description', 'user_input', etc.
+            user_id: Owning user ID
+            organization_id: Owning organization ID
+            metadata: Extra metadata stored on each chunk
+            chunking_strategy: Strategy for chunking ('semantic', 'fixed', 'sentence')
+
+        Returns:
+            The queued job as a dictionary
+        """
+        self.start_recovery()
+
+        job = IngestJob(
+            id=uuid.uuid4().hex,
+            status=IngestJob.STATUS_QUEUED,
+            document_id=document_id,
+            source_type=source_type,
+            user_id=str(user_id) if user_id is not None else None,
+            organization_id=str(organization_id) if organization_id is not None else None,
+            chunking_strategy=chunking_strategy,
+            content=content,
+            job_metadata=json.dumps(metadata) if metadata else None,
+            chunks_estimated=self.pipeline.estimate_chunks(content),
+            attempts=0,
+        )
+
+        with self._session() as session, session.begin():
+            session.add(job)
+            session.flush()
+            job_data = job.to_dict()
+
+        self._log(job_data['job_id'], 'ingest_job_queued', {'document_id': document_id}, None)
+        self._get_executor().submit(self._run, job_data['job_id'])
+
+        return job_data
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status and per-stage progress"""
+        with self._session() as session:
+            job = session.get(IngestJob, job_id)
+            return job.to_dict() if job else None
+
+    def recover(self) -> int:
+        """
+        Requeue jobs that no worker is running.
+
+        Picks up jobs still queued (e.g. submitted before a restart) and
+        running jobs whose worker has not sent a heartbeat for
+        INGEST_JOB_STALE_SECONDS.
+        Stalled jobs that used up INGEST_JOB_MAX_ATTEMPTS are marked failed.
+
+        Returns:
+            Number of jobs handed to the worker pool
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=self.config.INGEST_JOB_STALE_SECONDS)
+
+        with self._session() as session, session.begin():
+            stalled = (IngestJob.status == IngestJob.STATUS_RUNNING) & (IngestJob.updated_at < stale_before)
+
+            session.execute(
+                update(IngestJob)
+                .where(stalled & (IngestJob.attempts >= self.config.INGEST_JOB_MAX_ATTEMPTS))
+                .values(
+                    status=IngestJob.STATUS_FAILED,
+                    error="Job stalled too many times",
+                    content='',
+                    finished_at=datetime.utcnow(),
+                )
+            )
+            session.execute(
+                update(IngestJob)
+                .where(stalled)
+                .values(status=IngestJob.STATUS_QUEUED)
+            )
+
+            job_ids = session.execute(
+                select(IngestJob.id)
+                .where(IngestJob.status == IngestJob.STATUS_QUEUED)
+                .order_by(IngestJob.created_at)
+            ).scalars().all()
+
+        executor = self._get_executor()
+        for job_id in job_ids:
+            executor.submit(self._run, job_id)
+
+        if job_ids:
+            logger.info(f"Requeued {len(job_ids)} pending ingest jobs")
+        return len(job_ids)
+
+    def start_recovery(self, interval: Optional[float] = None):
+        """
+        Run recover() now and then every interval seconds on a daemon thread
+
+        Safe to call repeatedly; only the first call starts the thread.
+        """
+        interval = interval or self.config.INGEST_JOB_RECOVER_INTERVAL_SECONDS
+        with self._lock:
+            if self._recovery_thread is not None:
+                return
+            self._recovery_stop = threading.Event()
+            self._recovery_thread = threading.Thread(
+                target=self._recovery_loop, args=(interval, self._recovery_stop),
+                name="rag-ingest-recovery", daemon=True
+            )
+            self._recovery_thread.start()
+
+    def _recovery_loop(self, interval: float, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                self.recover()
+            except Exception as e:
+                logger.error(f"Ingest job recovery failed: {e}")
+            stop.wait(interval)
+
+    def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically move a queued job to running; None if another worker owns it."""
+        with self._session() as session, session.begin():
+            claimed = session.execute(
+                update(IngestJob)
+                .where(IngestJob.id == job_id, IngestJob.status == IngestJob.STATUS_QUEUED)
+                .values(
+                    status=IngestJob.STATUS_RUNNING,
+                    started_at=datetime.utcnow(),
+                    attempts=IngestJob.attempts + 1,
+                )
+            ).rowcount
+            if claimed != 1:
+                return None
+
+            job = session.get(IngestJob, job_id)
+            return {
+                'content': job.content,
+                'document_id': job.document_id,
+                'source_type': job.source_type,
+                'user_id': job.user_id,
+                'organization_id': job.organization_id,
+                'metadata': json.loads(job.job_metadata) if job.job_metadata else None,
+                'chunking_strategy': job.chunking_strategy,
+            }
+
+    def _run(self, job_id: str):
+        """Worker entry point: claim the job, ingest it and record the outcome."""
+        try:
+            job = self._claim(job_id)
+        except Exception as e:
+            logger.error(f"Could not claim ingest job {job_id}: {e}")
+            return
+
+        if job is None:
+            return
+
+        self._log(job_id, 'ingest_job_started', {'document_id': job['document_id']}, None)
+
+        stop_heartbeat = threading.Event()
+        threading.Thread(
+            target=self._heartbeat, args=(job_id, stop_heartbeat),
+            name="rag-ingest-heartbeat", daemon=True
+        ).start()
+
+        content = job.pop('content')
+        try:
+            result = self.pipeline.ingest_text(
+                text=content,
+                progress_callback=lambda progress: self._save_progress(job_id, progress),
+                **job
+            )
+            if result.get('status') == 'partial':
+                # The document is left half updated; report it so it gets re-ingested
+                error = f"{result['chunks_failed']} chunks could not be embedded; previous chunks were kept"
+                self._finish(job_id, IngestJob.STATUS_FAILED, result=result, error=error)
+                self._log(job_id, 'ingest_job_error', {'error': error}, result)
+            else:
+                self._finish(job_id, IngestJob.STATUS_COMPLETED, result=result)
+                self._log(job_id, 'ingest_job_complete', {'document_id': job['document_id']}, result)
+
+        except Exception as e:
+            logger.error(f"Ingest job {job_id} failed: {e}")
+            self._finish(job_id, IngestJob.STATUS_FAILED, error=str(e))
+            self._log(job_id, 'ingest_job_error', {'error': str(e)}, None)
+
+        finally:
+            stop_heartbeat.set()
+
+    def _heartbeat(self, job_id: str, stop: threading.Event):
+        """Keep a running job's updated_at fresh so recover() leaves it alone."""
+        while not stop.wait(self.config.INGEST_JOB_HEARTBEAT_SECONDS):
+            try:
+                with self._session() as session, session.begin():
+                    session.execute(
+                        update(IngestJob)
+                        .where(IngestJob.id == job_id, IngestJob.status == IngestJob.STATUS_RUNNING)
+                        .values(updated_at=datetime.utcnow())
+                    )
+            except Exception as e:
+                logger.warning(f"Could not send heartbeat for ingest job {job_id}: {e}")
+
+    def _save_progress(self, job_id: str, progress: Dict[str, Dict[str, Any]]):
+        """Persist per-stage progress; the latest running stage becomes current_stage."""
+        running = [stage for stage in IngestJob.STAGES if progress.get(stage, {}).get('status') == 'running']
+        current_stage = running[-1] if running else None
+
+        try:
+            with self._session() as session, session.begin():
+                session.execute(
+                    update(IngestJob)
+                    .where(IngestJob.id == job_id)
+                    .values(
+                        progress=json.dumps(progress),
+                        current_stage=current_stage,
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+        except Exception as e:
+            # Progress is advisory; never fail the ingest over it
+            logger.warning(f"Could not save progress for ingest job {job_id}: {e}")
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        """Record the final status and drop the stored content."""
+        with self._session() as session, session.begin():
+            session.execute(
+                update(IngestJob)
+                .where(IngestJob.id == job_id)
+                .values(
+                    status=status,
+                    current_stage=None,
+                    result=json.dumps(result) if result is not None else None,
+                    error=error,
+                    content='',
+                    finished_at=datetime.utcnow(),
+                )
+            )
+
+    def _log(self, job_id: str, activity_type: str, input_data: Any, output_data: Any):
+        if self.supervisor is not None:
+            self.supervisor.log_activity(job_id, activity_type, input_data, output_data)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the recovery thread and the worker pool"""
+        self._recovery_stop.set()
+        with self._lock:
+            self._recovery_thread = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
@@ -0,0 +1,522 @@
+"""
+RAG Ingest Pipeline
+Streams content through IngestorTool and EmbedderTool into DocumentChunk/EmbeddingStore rows
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Callable
+
+from sqlalchemy import or_, insert, update, delete, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+
+from ..config import RAGConfig
+from ..models import DocumentChunk, EmbeddingStore, IndexChange, IndexGeneration
+from ..models.vector_store import Base, HAS_VECTOR, create_vector_index, create_keyword_index
+
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentOwnershipError(PermissionError):
+    """The document_id already holds chunks of a different owner"""
+
+
+class IngestPipeline:
+    """
+    Storage stage of the RAG ingestion workflow.
+
+    Chunks are produced lazily by the ingestor, embedded window by window and
+    written with multi-row INSERTs, one transaction per write batch. At no
+    point is the whole document held in memory as chunk dictionaries.
+
+    Re-ingesting a document_id is incremental: incoming chunks are matched by
+    content_hash against the stored rows, unchanged chunks keep their rows and
+    embeddings, and only new or edited chunks are embedded. Stored chunks that
+    no longer appear in the document are deleted, unless some chunks failed to
+    embed: the result is then 'partial' and the old rows are all kept.
+
+    A document_id belongs to the owner (source_type, user_id, organization_id)
+    that first ingested it; ingesting it for anyone else raises
+    DocumentOwnershipError, and every diff and delete is scoped to the owner.
+    """
+
+    def __init__(self, ingestor, embedder, db_engine: Optional[Engine] = None, retriever=None):
+        self.config = RAGConfig()
+        self.ingestor = ingestor
+        self.embedder = embedder
+        self.retriever = retriever  # Notified of deleted embeddings so its local index stays in sync
+        self.db_engine = db_engine
+        self._session_factory = sessionmaker(bind=db_engine) if db_engine else None
+        self._tables_ready = False
+        self._tables_lock = threading.Lock()
+        self._document_locks = [threading.Lock() for _ in range(64)]
+
+    def bind(self, db_engine: Engine):
+        """Attach a database engine after construction."""
+        self.db_engine = db_engine
+        self._session_factory = sessionmaker(bind=db_engine)
+        self._tables_ready = False
+
+    def ensure_tables(self):
+        """Create the RAG tables and their indexes on first use; they live outside the app's metadata."""
+        if not self._tables_ready:
+            # The ingest workers and the job recovery thread can get here at once
+            with self._tables_lock:
+                if not self._tables_ready:
+                    Base.metadata.create_all(bind=self.db_engine)
+                    self.ensure_indexes()
+                    self._tables_ready = True
+
+    def ensure_indexes(self):
+        """
+        Create the PostgreSQL search indexes if missing
+
+        The migrations skip them when the RAG tables do not exist yet, which
+        is the case on a fresh deploy, so they are also ensured here right
+        after the tables are created.
+        """
+        if self.db_engine.dialect.name != 'postgresql':
+            return
+
+        if HAS_VECTOR:
+            try:
+                create_vector_index(self.db_engine)
+            except Exception as e:
+                logger.warning(f"Could not create vector index: {e}")
+
+        try:
+            create_keyword_index(self.db_engine)
+        except Exception as e:
+            logger.warning(f"Could not create keyword index: {e}")
+
+    @staticmethod
+    def _owner_conditions(owner: Dict[str, Any]) -> List[Any]:
+        """WHERE clauses matching rows of exactly this owner (NULL matches NULL)"""
+        conditions = []
+        for key in ('source_type', 'user_id', 'organization_id'):
+            column = getattr(DocumentChunk, key)
+            conditions.append(column.is_(None) if owner.get(key) is None else column == owner[key])
+        return conditions
+
+    @staticmethod
+    def _other_owner_condition(owner: Dict[str, Any]):
+        """WHERE clause matching rows of any other owner (NULL differs from a value)"""
+        conditions = []
+        for key in ('source_type', 'user_id', 'organization_id'):
+            column = getattr(DocumentChunk, key)
+            if owner.get(key) is None:
+                conditions.append(column.is_not(None))
+            else:
+                conditions.append(or_(column != owner[key], column.is_(None)))
+        return or_(*conditions)
+
+    def check_document_owner(
+        self,
+        document_id: str,
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None
+    ):
+        """
+        Make sure a document_id is new or already owned by this owner
+
+        Raises:
+            DocumentOwnershipError: Chunks stored under document_id belong to someone else
+        """
+        if not self.db_engine:
+            raise ValueError("Database engine not provided")
+        self.ensure_tables()
+
+        owner = {
+            'source_type': source_type,
+            'user_id': self._as_str(user_id),
+            'organization_id': self._as_str(organization_id),
+        }
+        with self._session_factory() as session:
+            foreign = session.execute(
+                select(DocumentChunk.id)
+                .where(DocumentChunk.document_id == document_id)
+                .where(self._other_owner_condition(owner))
+                .limit(1)
+            ).first()
+        if foreign is not None:
+            raise DocumentOwnershipError(f"Document {document_id} belongs to another owner")
+
+    def ingest_text(
+        self,
+        text: str,
+        document_id: str,
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        source_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunking_strategy: str = "semantic",
+        progress_callback: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Chunk, embed and persist a text document.
+
+        Args:
+            text: The text content to ingest
+            document_id: Identifier for the document; all chunks are stored under it
+            source_type: 'resume', 'job_description', 'user_input', etc.
+            user_id: Owning user ID
+            organization_id: Owning organization ID
+            source_id: ID of the record in the source system
+            metadata: Extra metadata stored on each chunk
+            chunking_strategy: Strategy for chunking ('semantic', 'fixed', 'sentence')
+            progress_callback: Called with per-stage progress after every write batch
+
+        Returns:
+            Ingestion statistics
+        """
+        chunks = self.ingestor.iter_text_chunks(text, metadata, chunking_strategy)
+        return self.ingest_chunks(
+            chunks,
+            document_id=document_id,
+            source_type=source_type,
+            user_id=user_id,
+            organization_id=organization_id,
+            source_id=source_id,
+            chunking_strategy=chunking_strategy,
+            progress_callback=progress_callback,
+        )
+
+    def estimate_chunks(self, text: str) -> int:
+        """Rough chunk count for a text, used to report progress before chunking"""
+        return max(1, -(-len(text) // self.config.CHUNK_SIZE))
+
+    def ingest_chunks(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        document_id: str,
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        source_id: Optional[str] = None,
+        chunking_strategy: str = "semantic",
+        progress_callback: Optional[Callable[[Dict[str, Dict[str, Any]]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Embed and persist an iterable of chunk dictionaries.
+
+        Args:
+            chunks: Chunk dictionaries (lazy iterables are consumed incrementally)
+            document_id, source_type, user_id, organization_id, source_id:
+                Row metadata applied to every chunk
+            chunking_strategy: Recorded on each DocumentChunk
+            progress_callback: Called with per-stage progress ('chunking', 'embedding',
+                'storing', 'cleanup'); chunking, embedding and storing run interleaved
+
+        Returns:
+            Ingestion statistics
+        """
+        if not self.db_engine:
+            raise ValueError("Database engine not provided")
+
+        start_time = time.time()
+
+        owner = {
+            'document_id': document_id,
+            'source_type': source_type,
+            'user_id': self._as_str(user_id),
+            'organization_id': self._as_str(organization_id),
+            'source_id': self._as_str(source_id),
+        }
+
+        stats = {
+            'document_id': document_id,
+            'status': 'completed',
+            'chunks_stored': 0,
+            'embeddings_stored': 0,
+            'chunks_reused': 0,
+            'chunks_deleted': 0,
+            'chunks_failed': 0,
+            'batches_written': 0,
+        }
+
+        progress = {
+            'chunking': {'status': 'running', 'chunks_produced': 0},
+            'embedding': {'status': 'running', 'chunks_embedded': 0, 'chunks_reused': 0},
+            'storing': {'status': 'running', 'chunks_stored': 0, 'batches_written': 0},
+        }
+        report = progress_callback or (lambda _progress: None)
+
+        # Concurrent ingests of one document would diff against the same rows
+        # and both insert the changed chunks
+        with self._document_lock(document_id):
+            self.check_document_owner(document_id, source_type, user_id, organization_id)
+            report(progress)
+
+            existing, stale_ids = self._load_existing_chunks(owner)
+            reused = []
+
+            # Only chunks without a stored row for the same content reach the embedder
+            fresh = self._diff_chunks(self._counted(chunks, progress['chunking']), existing, reused)
+            embedded = self.embedder.iter_embeddings(fresh)
+            for batch in self._batched(embedded, self.config.INGEST_WRITE_BATCH_SIZE):
+                stored, failed = self._write_batch(batch, owner, chunking_strategy)
+                stats['chunks_stored'] += stored
+                stats['embeddings_stored'] += stored
+                stats['chunks_failed'] += failed
+                stats['batches_written'] += 1
+                if stored:
+                    self._invalidate_retrieval_cache(owner)
+
+                progress['embedding'].update(chunks_embedded=stats['embeddings_stored'], chunks_reused=len(reused))
+                progress['storing'].update(chunks_stored=stats['chunks_stored'], batches_written=stats['batches_written'])
+                report(progress)
+
+            for stage in ('chunking', 'embedding', 'storing'):
+                progress[stage]['status'] = 'completed'
+            progress['embedding']['chunks_reused'] = len(reused)
+            stats['chunks_reused'] = len(reused)
+
+            if stats['chunks_failed']:
+                # The orphans include the old versions of the chunks that failed
+                # to embed; keep them all until a re-ingest stores every chunk
+                stats['status'] = 'partial'
+                progress['cleanup'] = {'status': 'skipped', 'chunks_deleted': 0}
+                report(progress)
+            else:
+                progress['cleanup'] = {'status': 'running', 'chunks_deleted': 0}
+                report(progress)
+
+                orphan_ids = stale_ids + [row['id'] for rows in existing.values() for row in rows]
+                self._finalize_document(reused, orphan_ids, owner)
+                self._invalidate_retrieval_cache(owner)
+                stats['chunks_deleted'] = len(orphan_ids)
+
+                progress['cleanup'].update(status='completed', chunks_deleted=len(orphan_ids))
+                report(progress)
+
+        stats['processing_time'] = time.time() - start_time
+        logger.info(
+            f"Ingested document {document_id}: {stats['chunks_stored']} chunks stored, "
+            f"{stats['chunks_reused']} reused, {stats['chunks_deleted']} deleted, "
+            f"{stats['chunks_failed']} failed in {stats['processing_time']:.2f}s"
+        )
+        return stats
+
+    @contextmanager
+    def _document_lock(self, document_id: str):
+        """
+        Serialize ingests of one document_id
+
+        Threads of this process share a striped lock; on PostgreSQL a session
+        advisory lock, held on its own connection, also covers other processes.
+        """
+        key = int.from_bytes(hashlib.sha256(document_id.encode('utf-8')).digest()[:8], 'big', signed=True)
+        with self._document_locks[key % len(self._document_locks)]:
+            if self.db_engine.dialect.name != 'postgresql':
+                yield
+                return
+
+            with self.db_engine.connect() as connection:
+                connection.execute(text("SELECT pg_advisory_lock(:key)"), {'key': key})
+                connection.commit()
+                try:
+                    yield
+                finally:
+                    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': key})
+                    connection.commit()
+
+    def _load_existing_chunks(self, owner: Dict[str, Any]) -> Tuple[Dict[str, List[Dict[str, Any]]], List[int]]:
+        """
+        Load the owner's stored chunks of a document for diffing.
+
+        Returns:
+            Reusable rows grouped by content_hash, and IDs of rows embedded with
+            a different model (never reusable, always replaced)
+        """
+        model_name = self.embedder.model_name
+        existing = {}
+        stale_ids = []
+
+        with self._session_factory() as session:
+            rows = session.execute(
+                select(
+                    DocumentChunk.id,
+                    DocumentChunk.chunk_index,
+                    DocumentChunk.content_hash,
+                    DocumentChunk.chunk_metadata,
+                    DocumentChunk.embedding_model,
+                )
+                .where(DocumentChunk.document_id == owner['document_id'], *self._owner_conditions(owner))
+                .order_by(DocumentChunk.chunk_index)
+            ).all()
+
+        for row in rows:
+            if row.embedding_model != model_name:
+                stale_ids.append(row.id)
+                continue
+            existing.setdefault(row.content_hash, []).append({
+                'id': row.id,
+                'chunk_index': row.chunk_index,
+                'chunk_metadata': row.chunk_metadata,
+            })
+
+        return existing, stale_ids
+
+    @staticmethod
+    def _diff_chunks(
+        chunks: Iterable[Dict[str, Any]],
+        existing: Dict[str, List[Dict[str, Any]]],
+        reused: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield chunks that need embedding; matched chunks are claimed from `existing`.
+
+        Each stored row is claimed at most once, so repeated passages in a
+        document keep one row each. Rows left in `existing` afterwards are orphans.
+        """
+        for chunk in chunks:
+            candidates = existing.get(DocumentChunk.hash_content(chunk['content']))
+            if candidates:
+                reused.append((candidates.pop(0), chunk))
+            else:
+                yield chunk
+
+    def _invalidate_retrieval_cache(self, owner: Dict[str, Any]):
+        """Expire cached retrieval results that could include this document's rows."""
+        if self.retriever is not None:
+            self.retriever.invalidate_cache(
+                organization_id=owner['organization_id'], user_id=owner['user_id']
+            )
+
+    def _finalize_document(
+        self,
+        reused: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        orphan_ids: List[int],
+        owner: Dict[str, Any]
+    ):
+        """Re-position reused chunks and delete orphaned chunks in one transaction."""
+        updates = []
+        for row, chunk in reused:
+            metadata = chunk.get('metadata')
+            chunk_metadata = json.dumps(metadata) if metadata else None
+            if row['chunk_index'] != chunk['chunk_index'] or row['chunk_metadata'] != chunk_metadata:
+                updates.append({
+                    'id': row['id'],
+                    'chunk_index': chunk['chunk_index'],
+                    'chunk_metadata': chunk_metadata,
+                })
+
+        if not updates and not orphan_ids:
+            return
+
+        deleted_embedding_ids = []
+        with self._session_factory() as session, session.begin():
+            # Expires this tenant's cached retrievals in every process on commit
+            IndexGeneration.bump(session, owner['organization_id'], owner['user_id'])
+
+            if updates:
+                session.execute(update(DocumentChunk), updates)
+
+            if orphan_ids:
+                # Re-check ownership in the delete itself, not just in the diff
+                orphan_ids = session.execute(
+                    select(DocumentChunk.id).where(
+                        DocumentChunk.id.in_(orphan_ids),
+                        DocumentChunk.document_id == owner['document_id'],
+                        *self._owner_conditions(owner)
+                    )
+                ).scalars().all()
+                embedding_ids = dict(session.execute(
+                    select(EmbeddingStore.chunk_id, EmbeddingStore.id).where(EmbeddingStore.chunk_id.in_(orphan_ids))
+                ).all())
+                deleted_embedding_ids = list(embedding_ids.values())
+                session.execute(delete(EmbeddingStore).where(EmbeddingStore.chunk_id.in_(orphan_ids)))
+                session.execute(delete(DocumentChunk).where(DocumentChunk.id.in_(orphan_ids)))
+
+                # Other processes drop these rows from their indexes by replaying the log
+                if orphan_ids:
+                    session.execute(insert(IndexChange), [
+                        {
+                            'chunk_id': chunk_id,
+                            'embedding_id': embedding_ids.get(chunk_id),
+                            'document_id': owner['document_id'],
+                            'user_id': owner['user_id'],
+                            'organization_id': owner['organization_id'],
+                        }
+                        for chunk_id in orphan_ids
+                    ])
+
+        if self.retriever is not None:
+            self.retriever.discard_embeddings(deleted_embedding_ids, chunk_ids=orphan_ids)
+
+    def _write_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        owner: Dict[str, Any],
+        chunking_strategy: str
+    ) -> Tuple[int, int]:
+        """Insert one batch of chunks and their embeddings in a single transaction."""
+        usable = [chunk for chunk in batch if chunk.get('embedding') is not None]
+        failed = len(batch) - len(usable)
+        if not usable:
+            return 0, failed
+
+        chunk_rows = [
+            DocumentChunk.chunk_values(
+                chunk_index=chunk['chunk_index'],
+                content=chunk['content'],
+                metadata=chunk.get('metadata'),
+                embedding_model=chunk.get('embedding_model'),
+                chunking_strategy=chunking_strategy,
+                **owner
+            )
+            for chunk in usable
+        ]
+
+        with self._session_factory() as session, session.begin():
+            chunk_table = DocumentChunk.__table__
+            chunk_ids = session.execute(
+                insert(chunk_table).returning(chunk_table.c.id, sort_by_parameter_order=True),
+                chunk_rows
+            ).scalars().all()
+
+            embedding_rows = [
+                EmbeddingStore.embedding_values(
+                    chunk_id=chunk_id,
+                    document_id=owner['document_id'],
+                    embedding_vector=chunk['embedding'],
+                    source_type=owner['source_type'],
+                    user_id=owner['user_id'],
+                    organization_id=owner['organization_id'],
+                )
+                for chunk_id, chunk in zip(chunk_ids, usable)
+            ]
+            session.execute(insert(EmbeddingStore.__table__), embedding_rows)
+            IndexGeneration.bump(session, owner['organization_id'], owner['user_id'])
+
+        return len(usable), failed
+
+    @staticmethod
+    def _counted(chunks: Iterable[Dict[str, Any]], counters: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Pass chunks through, counting them as they are produced."""
+        for chunk in chunks:
+            counters['chunks_produced'] += 1
+            yield chunk
+
+    @staticmethod
+    def _batched(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _as_str(value: Any) -> Optional[str]:
+        return str(value) if value is not None else None
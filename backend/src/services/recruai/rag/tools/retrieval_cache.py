@@ -0,0 +1,140 @@
+"""
+RAG Retrieval Cache
+In-process cache of retrieval results, invalidated per tenant when new embeddings are ingested
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+
+from ..config import RAGConfig
+from .embedding_cache import LRUEmbeddingCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalCache:
+    """
+    LRU + TTL cache of retrieval result lists.
+
+    Every entry records the generation of the tenant scopes its filters
+    select (organization, user, or the global scope for unfiltered queries).
+    Ingestion bumps those generations, so a cached result is served only
+    while no rows have been written for the tenants it could include.
+
+    Those generations live in this process. Writes by other processes are
+    caught by the tenants' IndexGeneration rows, which the caller passes in
+    as the marker and which are stored with the generation.
+    """
+
+    GLOBAL_SCOPE = ('global', '')
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: Optional[int] = 300):
+        self._entries = LRUEmbeddingCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.stale = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[RAGConfig] = None) -> 'RetrievalCache':
+        """Build the cache from RAGConfig settings"""
+        config = config or RAGConfig()
+        return cls(
+            max_entries=config.RETRIEVAL_CACHE_MAX_ENTRIES,
+            ttl_seconds=config.RETRIEVAL_CACHE_TTL_SECONDS
+        )
+
+    @staticmethod
+    def normalize_query(query_text: str) -> str:
+        """Case- and whitespace-insensitive form of a text query"""
+        return " ".join((query_text or "").lower().split())
+
+    @staticmethod
+    def embedding_digest(embedding: List[float]) -> str:
+        """Stable digest of a query embedding (float32 precision)"""
+        return hashlib.sha256(array('f', embedding).tobytes()).hexdigest()
+
+    @staticmethod
+    def make_key(kind: str, query: str, filters: Optional[Dict[str, Any]], **params) -> str:
+        """Cache key for a retrieval call"""
+        payload = json.dumps(
+            [kind, query, filters or {}, params], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def scopes(cls, filters: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """Tenant scopes selected by retrieval filters"""
+        scopes = []
+        if filters:
+            for field in ('organization_id', 'user_id'):
+                if filters.get(field) is not None:
+                    scopes.append((field, str(filters[field])))
+        return scopes or [cls.GLOBAL_SCOPE]
+
+    def generation(self, filters: Optional[Dict[str, Any]], marker: Tuple[Any, ...] = ()) -> Tuple[Any, ...]:
+        """Current generation of the scopes selected by the filters, followed by the marker"""
+        with self._lock:
+            return tuple(self._generations.get(scope, 0) for scope in self.scopes(filters)) + tuple(marker)
+
+    def get(
+        self,
+        key: str,
+        filters: Optional[Dict[str, Any]],
+        marker: Tuple[Any, ...] = ()
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached results, or None on a miss or stale entry"""
+        entry = self._entries.get_many([key]).get(key)
+        if entry is None:
+            return None
+
+        if entry['generation'] != self.generation(filters, marker):
+            with self._lock:
+                self.stale += 1
+            return None
+
+        return [dict(result) for result in entry['results']]
+
+    def set(self, key: str, results: List[Dict[str, Any]], generation: Tuple[int, ...]):
+        """
+        Store results computed under the given generation.
+
+        Take the generation before running the search, so results that race
+        with an ingest are stored as already stale.
+        """
+        self._entries.set_many({key: {
+            'results': [dict(result) for result in results],
+            'generation': generation,
+            'cached_at': time.time(),
+        }})
+
+    def bump(self, organization_id: Optional[Any] = None, user_id: Optional[Any] = None):
+        """Invalidate cached results that could include rows of this tenant"""
+        with self._lock:
+            scopes = [self.GLOBAL_SCOPE]
+            if organization_id is not None:
+                scopes.append(('organization_id', str(organization_id)))
+            if user_id is not None:
+                scopes.append(('user_id', str(user_id)))
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._entries.get_stats()
+        with self._lock:
+            # Stale entries were found by the LRU but not served
+            stats['hits'] -= self.stale
+            stats['misses'] += self.stale
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+            stats['stale'] = self.stale
+            stats['tenants_tracked'] = len(self._generations)
+        return stats
@@ -1,16 +1,31 @@
 """
 RAG Retriever Tool
-Performs similarity search on vector embeddings using pgvector
+Performs similarity search on vector embeddings using pgvector, or an
+in-process NumPy index when pgvector is unavailable, plus keyword search
+for hybrid retrieval
 """
 
+import json
 import logging
+import threading
+import time
 from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy import text, func
+from sqlalchemy import text, func, Float, Integer, select, values, column, true, cast, or_, and_
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import Engine
 
 from ..config import RAGConfig
-from ..models import EmbeddingStore
+from .retrieval_cache import RetrievalCache
+from ..models import (
+    DocumentChunk,
+    EmbeddingStore,
+    HAS_VECTOR,
+    IndexChange,
+    IndexGeneration,
+    KeywordIndex,
+    LocalVectorIndex,
+    content_tsvector,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -19,20 +34,30 @@ logger = logging.getLogger(__name__)
 class RetrieverTool:
     """
     Tool for retrieving relevant document chunks based on semantic similarity.
-    Uses pgvector for efficient vector similarity search.
+    Uses pgvector for efficient vector similarity search, falling back to a
+    LocalVectorIndex when embeddings are stored as JSON text.
     """
 
     def __init__(self, db_engine: Optional[Engine] = None):
         self.config = RAGConfig()
         self.db_engine = db_engine
         self._session_factory = sessionmaker(bind=db_engine) if db_engine else None
+        self._local_index = None  # Built lazily on first search without pgvector
+        self._keyword_index = None  # Built lazily on first keyword search without PostgreSQL
+        self._result_cache = RetrievalCache.from_config(self.config) if self.config.ENABLE_CACHE else None
+        self._change_log_engine = None  # Engine the change tables are known to exist on
+        self._change_log_lock = threading.Lock()
+        self._markers: Dict[Tuple[str, str], Tuple[int, float]] = {}  # Tenant generation, time read
+        self._markers_lock = threading.Lock()
 
     def retrieve_similar(
         self,
         query_embedding: List[float],
         top_k: Optional[int] = None,
         similarity_threshold: Optional[float] = None,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve top-k most similar chunks to the query embedding.
@@ -42,6 +67,8 @@ class RetrieverTool:
             top_k: Number of results to return (default: config.TOP_K_RESULTS)
             similarity_threshold: Minimum similarity score (default: config.SIMILARITY_THRESHOLD)
             filters: Additional filters (source_type, user_id, organization_id, etc.)
+            ef_search: HNSW candidate list size for this query (pgvector only)
+            probes: IVFFlat lists to probe for this query (pgvector only)
 
         Returns:
             List of similar chunks with metadata and similarity scores
@@ -52,42 +79,53 @@ class RetrieverTool:
         top_k = top_k or self.config.TOP_K_RESULTS
         similarity_threshold = similarity_threshold or self.config.SIMILARITY_THRESHOLD
 
+        cache_key, generation, cached = self._cache_lookup(
+            'similar', RetrievalCache.embedding_digest(query_embedding), filters,
+            top_k=top_k, similarity_threshold=similarity_threshold, ef_search=ef_search, probes=probes
+        )
+        if cached is not None:
+            return cached
+
+        results = self._search_similar(query_embedding, top_k, similarity_threshold, filters, ef_search, probes)
+        self._cache_store(cache_key, results, generation)
+        return results
+
+    def _search_similar(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        similarity_threshold: float,
+        filters: Optional[Dict[str, Any]],
+        ef_search: Optional[int],
+        probes: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """retrieve_similar without the result cache, for callers that cache their own results"""
+        if not self.db_engine:
+            raise ValueError("Database engine not provided")
+
         try:
             with self._session_factory() as session:
-                # Build the query with pgvector similarity search
-                query = session.query(
-                    EmbeddingStore,
-                    func.cosine_similarity(EmbeddingStore.embedding, query_embedding).label('similarity')
-                )
+                if HAS_VECTOR:
+                    matches = self._search_pgvector(
+                        session, query_embedding, top_k, filters, ef_search, probes
+                    )
+                else:
+                    matches = self._search_local(
+                        session, query_embedding, top_k, similarity_threshold, filters
+                    )
 
-                # Apply filters
-                if filters:
-                    query = self._apply_filters(query, filters)
+                matches = [(row, similarity) for row, similarity in matches if similarity >= similarity_threshold]
 
-                # Order by similarity (descending) and limit results
-                query = query.order_by(text('similarity DESC')).limit(top_k)
+                # Fetch all matched chunks in one query instead of one per hit
+                chunks_data = self._get_chunks_data(session, [row['chunk_id'] for row, _ in matches])
 
                 results = []
-                for embedding_store, similarity in query.all():
-                    if similarity >= similarity_threshold:
-                        # Get the associated document chunk
-                        chunk_data = self._get_chunk_data(session, embedding_store.chunk_id)
-
-                        if chunk_data:
-                            result = {
-                                'chunk_id': embedding_store.chunk_id,
-                                'document_id': embedding_store.document_id,
-                                'content': chunk_data['content'],
-                                'similarity_score': float(similarity),
-                                'source_type': embedding_store.source_type,
-                                'user_id': embedding_store.user_id,
-                                'organization_id': embedding_store.organization_id,
-                                'metadata': chunk_data.get('metadata', {}),
-                                'word_count': chunk_data.get('word_count', 0),
-                                'char_count': chunk_data.get('char_count', 0),
-                                'processed_at': chunk_data.get('processed_at'),
-                            }
-                            results.append(result)
+                for row, similarity in matches:
+                    chunk_data = chunks_data.get(row['chunk_id'])
+                    if chunk_data:
+                        result = self._build_result(row, chunk_data)
+                        result['similarity_score'] = float(similarity)
+                        results.append(result)
 
                 logger.info(f"Retrieved {len(results)} similar chunks with similarity >= {similarity_threshold}")
                 return results
@@ -96,13 +134,365 @@ class RetrieverTool:
             logger.error(f"Error retrieving similar chunks: {e}")
             raise
 
+    def retrieve_similar_many(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve top-k similar chunks for many query embeddings in one search.
+
+        pgvector runs a single LATERAL join over a VALUES list of queries; the
+        local index scores every query with one matrix-matrix product. Chunk
+        data for all hits is loaded with one IN query.
+
+        Args:
+            query_embeddings: Query vectors
+            top_k: Number of results per query (default: config.TOP_K_RESULTS)
+            similarity_threshold: Minimum similarity score (default: config.SIMILARITY_THRESHOLD)
+            filters: Additional filters shared by all queries
+            ef_search: HNSW candidate list size (pgvector only)
+            probes: IVFFlat lists to probe (pgvector only)
+
+        Returns:
+            One result list per query embedding, in input order
+        """
+        if not self.db_engine:
+            raise ValueError("Database engine not provided")
+        if not query_embeddings:
+            return []
+
+        top_k = top_k or self.config.TOP_K_RESULTS
+        similarity_threshold = similarity_threshold or self.config.SIMILARITY_THRESHOLD
+
+        try:
+            with self._session_factory() as session:
+                if HAS_VECTOR:
+                    grouped = self._search_pgvector_many(
+                        session, query_embeddings, top_k, filters, ef_search, probes
+                    )
+                else:
+                    grouped = self.get_local_index(session).search_many(
+                        query_embeddings,
+                        top_k=top_k,
+                        similarity_threshold=similarity_threshold,
+                        filters=filters
+                    )
+
+                grouped = [
+                    [(row, similarity) for row, similarity in matches if similarity >= similarity_threshold]
+                    for matches in grouped
+                ]
+                chunks_data = self._get_chunks_data(
+                    session, [row['chunk_id'] for matches in grouped for row, _ in matches]
+                )
+
+                all_results = []
+                for matches in grouped:
+                    results = []
+                    for row, similarity in matches:
+                        chunk_data = chunks_data.get(row['chunk_id'])
+                        if chunk_data:
+                            result = self._build_result(row, chunk_data)
+                            result['similarity_score'] = float(similarity)
+                            results.append(result)
+                    all_results.append(results)
+
+                logger.info(
+                    f"Retrieved {sum(len(results) for results in all_results)} similar chunks "
+                    f"for {len(all_results)} queries"
+                )
+                return all_results
+
+        except Exception as e:
+            logger.error(f"Error retrieving similar chunks for many queries: {e}")
+            raise
+
+    def _search_pgvector_many(
+        self,
+        session,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """
+        Run one set-based nearest-neighbour search for all queries.
+
+        Each query row of a VALUES list drives an index-ordered LATERAL
+        subquery, so the database does N index scans in one round trip.
+        """
+        self._apply_search_params(session, ef_search, probes)
+
+        queries = values(
+            column('ord', Integer),
+            column('embedding', EmbeddingStore.embedding.type),
+            name='queries'
+        ).data([(position, embedding) for position, embedding in enumerate(query_embeddings)])
+
+        # VALUES parameters arrive untyped, so cast back to vector for <=>
+        query_vector = cast(queries.c.embedding, EmbeddingStore.embedding.type)
+        distance = EmbeddingStore.embedding.op('<=>', return_type=Float)(query_vector)
+        nearest = select(
+            EmbeddingStore.id,
+            EmbeddingStore.chunk_id,
+            EmbeddingStore.document_id,
+            EmbeddingStore.source_type,
+            EmbeddingStore.user_id,
+            EmbeddingStore.organization_id,
+            distance.label('distance'),
+        )
+        if filters:
+            nearest = self._apply_filters(nearest, filters)
+        nearest = nearest.order_by(distance).limit(top_k).lateral('nearest')
+
+        statement = (
+            select(queries.c.ord, nearest)
+            .select_from(queries.join(nearest, true()))
+            .order_by(queries.c.ord, nearest.c.distance)
+        )
+
+        grouped = [[] for _ in query_embeddings]
+        for row in session.execute(statement).mappings():
+            row = dict(row)
+            position = row.pop('ord')
+            distance_value = row.pop('distance')
+            grouped[position].append((row, 1.0 - float(distance_value)))
+        return grouped
+
+    def _search_pgvector(
+        self,
+        session,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Run the similarity search inside PostgreSQL using pgvector.
+
+        Orders directly by the <=> cosine distance operator so the planner can
+        serve the query from the HNSW/IVFFlat index instead of scoring every row.
+        """
+        self._apply_search_params(session, ef_search, probes)
+
+        distance = EmbeddingStore.embedding.op('<=>', return_type=Float)(query_embedding)
+        query = session.query(EmbeddingStore, distance.label('distance'))
+
+        # Apply filters
+        if filters:
+            query = self._apply_filters(query, filters)
+
+        # Nearest first; similarity threshold is applied after the index scan
+        query = query.order_by(distance).limit(top_k)
+
+        return [
+            (self._embedding_row(embedding_store), 1.0 - float(distance_value))
+            for embedding_store, distance_value in query.all()
+        ]
+
+    def _apply_search_params(
+        self,
+        session,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ):
+        """Set per-query ANN search parameters for the current transaction."""
+        method = self.config.VECTOR_INDEX_METHOD
+        if ef_search is None and method == 'hnsw':
+            ef_search = self.config.HNSW_EF_SEARCH
+        if probes is None and method == 'ivfflat':
+            probes = self.config.IVFFLAT_PROBES
+
+        # SET does not accept bind parameters; values are cast to int first
+        if ef_search is not None:
+            session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+        if probes is not None:
+            session.execute(text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+
+    def _search_local(
+        self,
+        session,
+        query_embedding: List[float],
+        top_k: int,
+        similarity_threshold: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Run the similarity search against the in-process NumPy index."""
+        index = self.get_local_index(session)
+        return index.search(
+            query_embedding,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+            filters=filters
+        )
+
+    def get_local_index(self, session=None) -> LocalVectorIndex:
+        """
+        Get the in-process vector index, syncing rows added since the last call.
+
+        Args:
+            session: Optional open session; a new one is used if omitted
+
+        Returns:
+            The LocalVectorIndex shared by this retriever
+        """
+        if self._local_index is None:
+            self._local_index = LocalVectorIndex(self.config.OPENAI_EMBEDDING_DIMENSIONS)
+        self._ensure_change_log()
+
+        if session is not None:
+            self._local_index.refresh(session, EmbeddingStore, IndexChange, DocumentChunk)
+        elif self._session_factory:
+            with self._session_factory() as own_session:
+                self._local_index.refresh(own_session, EmbeddingStore, IndexChange, DocumentChunk)
+
+        return self._local_index
+
+    def _cache_lookup(self, kind: str, query: str, filters: Optional[Dict[str, Any]], **params):
+        """
+        Look up a cached retrieval result.
+
+        Returns:
+            (cache key, generation snapshot, cached results or None); the key is
+            None when caching is disabled
+        """
+        if self._result_cache is None or not self.db_engine:
+            return None, None, None
+
+        try:
+            marker = self._tenant_marker(RetrievalCache.scopes(filters))
+        except Exception as e:
+            logger.warning(f"Could not read the tenant generations, bypassing the retrieval cache: {e}")
+            return None, None, None
+
+        cache_key = RetrievalCache.make_key(kind, query, filters, **params)
+        generation = self._result_cache.generation(filters, marker)
+        return cache_key, generation, self._result_cache.get(cache_key, filters, marker)
+
+    def _tenant_marker(self, scopes: List[Tuple[str, str]]) -> Tuple[int, ...]:
+        """
+        Database generations of the given tenant scopes
+
+        Any process that writes chunks for a tenant bumps its IndexGeneration
+        rows (see IndexGeneration.bump), so cached results computed under an
+        older marker are stale. Generations are reused for
+        RETRIEVAL_CACHE_MARKER_TTL_SECONDS, so most cache hits cost no query.
+        """
+        now = time.monotonic()
+        ttl = self.config.RETRIEVAL_CACHE_MARKER_TTL_SECONDS
+        with self._markers_lock:
+            known = {scope: self._markers.get(scope) for scope in scopes}
+        missing = [scope for scope, entry in known.items() if entry is None or now - entry[1] >= ttl]
+
+        if missing:
+            self._ensure_change_log()
+            with self._session_factory() as session:
+                rows = session.execute(
+                    select(IndexGeneration.scope, IndexGeneration.scope_id, IndexGeneration.generation)
+                    .where(or_(*[
+                        and_(IndexGeneration.scope == scope, IndexGeneration.scope_id == scope_id)
+                        for scope, scope_id in missing
+                    ]))
+                ).all()
+            read = {scope: 0 for scope in missing}
+            read.update({(row.scope, row.scope_id): row.generation for row in rows})
+            with self._markers_lock:
+                for scope, generation in read.items():
+                    self._markers[scope] = known[scope] = (generation, now)
+
+        return tuple(known[scope][0] for scope in scopes)
+
+    def _ensure_change_log(self):
+        """Create the change tables if this process reads before anything was ingested"""
+        engine = self.db_engine
+        if engine is None or engine is self._change_log_engine:
+            return
+        with self._change_log_lock:
+            if engine is not self._change_log_engine:
+                IndexChange.__table__.create(bind=engine, checkfirst=True)
+                IndexGeneration.__table__.create(bind=engine, checkfirst=True)
+                self._change_log_engine = engine
+
+    def _cache_store(self, cache_key: Optional[str], results: List[Dict[str, Any]], generation):
+        if cache_key is not None:
+            self._result_cache.set(cache_key, results, generation)
+
+    def invalidate_cache(self, organization_id: Optional[Any] = None, user_id: Optional[Any] = None):
+        """
+        Invalidate cached results covering a tenant; called after ingestion writes.
+
+        Args:
+            organization_id: Organization whose rows changed
+            user_id: User whose rows changed
+        """
+        if self._result_cache is not None:
+            self._result_cache.bump(organization_id=organization_id, user_id=user_id)
+            # Re-read this tenant's generations so the write is seen right away
+            with self._markers_lock:
+                for scope in IndexGeneration.write_scopes(organization_id, user_id):
+                    self._markers.pop(scope, None)
+
+    def clear_cache(self):
+        """Drop all cached retrieval results"""
+        if self._result_cache is not None:
+            self._result_cache.clear()
+
+    def discard_embeddings(self, embedding_ids: List[int], chunk_ids: Optional[List[int]] = None) -> int:
+        """
+        Drop deleted rows from the in-process indexes, if they are loaded.
+
+        Args:
+            embedding_ids: IDs of EmbeddingStore rows that no longer exist
+            chunk_ids: IDs of DocumentChunk rows that no longer exist
+
+        Returns:
+            Number of rows removed from the vector index
+        """
+        if self._keyword_index is not None and chunk_ids:
+            self._keyword_index.remove(chunk_ids)
+
+        if self._local_index is None or not embedding_ids:
+            return 0
+        return self._local_index.remove(embedding_ids)
+
+    @staticmethod
+    def _embedding_row(embedding_store) -> Dict[str, Any]:
+        """Extract the metadata used to build results from an EmbeddingStore row."""
+        return {
+            'id': embedding_store.id,
+            'chunk_id': embedding_store.chunk_id,
+            'document_id': embedding_store.document_id,
+            'source_type': embedding_store.source_type,
+            'user_id': embedding_store.user_id,
+            'organization_id': embedding_store.organization_id,
+        }
+
+    @staticmethod
+    def _model_filters(filters: Optional[Dict[str, Any]], embedder_tool) -> Dict[str, Any]:
+        """
+        Filters restricted to rows embedded by the embedder's model
+
+        Vectors of different models live in different spaces (and may share a
+        dimension count), so a query is only compared with its own model's rows.
+        """
+        return dict(filters or {}, embedding_model=embedder_tool.model_name)
+
     def retrieve_by_text(
         self,
         query_text: str,
         embedder_tool,
         top_k: Optional[int] = None,
         similarity_threshold: Optional[float] = None,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve similar chunks by text query (combines embedding + retrieval).
@@ -113,10 +503,37 @@ class RetrieverTool:
             top_k: Number of results to return
             similarity_threshold: Minimum similarity score
             filters: Additional filters
+            ef_search: HNSW candidate list size (pgvector only)
+            probes: IVFFlat lists to probe (pgvector only)
 
         Returns:
             List of similar chunks with metadata
         """
+        # A repeated query is served without embedding it again
+        cache_key, generation, cached = self._cache_lookup(
+            'text', RetrievalCache.normalize_query(query_text), filters,
+            top_k=top_k or self.config.TOP_K_RESULTS,
+            similarity_threshold=similarity_threshold or self.config.SIMILARITY_THRESHOLD,
+            ef_search=ef_search, probes=probes, embedding_model=embedder_tool.model_name
+        )
+        if cached is not None:
+            return cached
+
+        results = self._search_by_text(query_text, embedder_tool, top_k, similarity_threshold, filters, ef_search, probes)
+        self._cache_store(cache_key, results, generation)
+        return results
+
+    def _search_by_text(
+        self,
+        query_text: str,
+        embedder_tool,
+        top_k: Optional[int],
+        similarity_threshold: Optional[float],
+        filters: Optional[Dict[str, Any]],
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """retrieve_by_text without the result cache"""
         try:
             # Generate embedding for the query
             query_chunks = embedder_tool.generate_embeddings([{
@@ -133,15 +550,80 @@ class RetrieverTool:
             query_embedding = query_chunks[0]['embedding']
 
             # Perform similarity search
-            return self.retrieve_similar(
-                query_embedding=query_embedding,
+            return self._search_similar(
+                query_embedding,
+                top_k or self.config.TOP_K_RESULTS,
+                similarity_threshold or self.config.SIMILARITY_THRESHOLD,
+                self._model_filters(filters, embedder_tool),
+                ef_search,
+                probes
+            )
+
+        except Exception as e:
+            logger.error(f"Error retrieving by text query: {e}")
+            raise
+
+    def retrieve_many(
+        self,
+        queries: List[str],
+        embedder_tool,
+        top_k: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve similar chunks for many text queries at once.
+
+        All queries are embedded in one batched embedder call and searched
+        with retrieve_similar_many, instead of one embedding call and one
+        search per query.
+
+        Args:
+            queries: Text queries
+            embedder_tool: Instance of EmbedderTool to generate query embeddings
+            top_k: Number of results per query
+            similarity_threshold: Minimum similarity score
+            filters: Additional filters shared by all queries
+            ef_search: HNSW candidate list size (pgvector only)
+            probes: IVFFlat lists to probe (pgvector only)
+
+        Returns:
+            One result list per query, in input order
+        """
+        if not queries:
+            return []
+
+        try:
+            embedded = embedder_tool.generate_embeddings([
+                {
+                    'content': query_text,
+                    'chunk_index': position,
+                    'word_count': len(query_text.split()),
+                    'char_count': len(query_text),
+                    'metadata': {}
+                }
+                for position, query_text in enumerate(queries)
+            ], use_cache=True)
+
+            # Cached and freshly embedded chunks come back in different order
+            embeddings = {chunk['chunk_index']: chunk.get('embedding') for chunk in embedded}
+            missing = [position for position in range(len(queries)) if embeddings.get(position) is None]
+            if missing:
+                raise ValueError(f"Failed to generate embeddings for {len(missing)} queries")
+
+            return self.retrieve_similar_many(
+                [embeddings[position] for position in range(len(queries))],
                 top_k=top_k,
                 similarity_threshold=similarity_threshold,
-                filters=filters
+                filters=self._model_filters(filters, embedder_tool),
+                ef_search=ef_search,
+                probes=probes
             )
 
         except Exception as e:
-            logger.error(f"Error retrieving by text query: {e}")
+            logger.error(f"Error retrieving for many text queries: {e}")
             raise
 
     def retrieve_hybrid(
@@ -151,42 +633,253 @@ class RetrieverTool:
         keyword_filters: Optional[Dict[str, Any]] = None,
         semantic_weight: float = 0.7,
         keyword_weight: float = 0.3,
-        top_k: Optional[int] = None
+        top_k: Optional[int] = None,
+        fusion: Optional[str] = None,
+        similarity_threshold: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform hybrid search combining semantic similarity with keyword matching.
 
+        Short queries whose terms all appear in at least top_k of the keyword
+        candidates (typically a skill or technology name) are answered from the
+        keyword index alone, without embedding the query. The keyword search
+        runs once per query and also feeds the fusion.
+
         Args:
             query_text: The text query
             embedder_tool: EmbedderTool instance
-            keyword_filters: Keyword-based filters
+            keyword_filters: Metadata filters applied to both searches
             semantic_weight: Weight for semantic similarity (0-1)
             keyword_weight: Weight for keyword matching (0-1)
             top_k: Number of results to return
+            fusion: 'rrf' or 'weighted' (default: config.HYBRID_FUSION)
+            similarity_threshold: Minimum similarity for semantic candidates
 
         Returns:
-            List of results with combined scores
+            List of results with combined scores ('hybrid_score')
         """
         if not self.db_engine:
             raise ValueError("Database engine not provided")
 
+        top_k = top_k or self.config.TOP_K_RESULTS
+        fusion = (fusion or self.config.HYBRID_FUSION).lower()
+        if fusion not in ('rrf', 'weighted'):
+            raise ValueError(f"Unsupported fusion method: {fusion}")
+        candidates = top_k * self.config.HYBRID_CANDIDATE_MULTIPLIER
+
+        cache_key, generation, cached = self._cache_lookup(
+            'hybrid', RetrievalCache.normalize_query(query_text), keyword_filters,
+            top_k=top_k, fusion=fusion, semantic_weight=semantic_weight,
+            keyword_weight=keyword_weight, similarity_threshold=similarity_threshold,
+            embedding_model=embedder_tool.model_name
+        )
+        if cached is not None:
+            return cached
+
         try:
-            # Get semantic results
-            semantic_results = self.retrieve_by_text(
-                query_text=query_text,
-                embedder_tool=embedder_tool,
-                top_k=top_k * 2 if top_k else None,  # Get more for reranking
-                filters=keyword_filters
+            if keyword_weight > 0:
+                # One keyword search serves both the keyword-only shortcut and fusion
+                keyword_hits = self.retrieve_keyword(query_text, top_k=candidates, filters=keyword_filters)
+
+                terms = KeywordIndex.tokenize(query_text)
+                if semantic_weight <= 0:
+                    exact_hits = keyword_hits[:top_k]
+                elif 0 < len(terms) <= self.config.HYBRID_KEYWORD_ONLY_MAX_TERMS:
+                    exact_hits = self._hits_with_all_terms(keyword_hits, terms)[:top_k]
+                else:
+                    exact_hits = []
+
+                if semantic_weight <= 0 or len(exact_hits) >= top_k:
+                    for result in exact_hits:
+                        result['hybrid_score'] = result['keyword_score']
+                        result['retrieval_method'] = 'keyword'
+                    self._cache_store(cache_key, exact_hits, generation)
+                    return exact_hits
+            else:
+                keyword_hits = []
+
+            semantic_hits = self._search_by_text(
+                query_text, embedder_tool, candidates, similarity_threshold, keyword_filters
             )
 
-            # For now, just return semantic results
-            # TODO: Implement keyword scoring and combination
-            return semantic_results[:top_k] if top_k else semantic_results
+            results = self._fuse_results(semantic_hits, keyword_hits, semantic_weight, keyword_weight, fusion, top_k)
+            self._cache_store(cache_key, results, generation)
+            return results
 
         except Exception as e:
             logger.error(f"Error in hybrid retrieval: {e}")
             raise
 
+    @staticmethod
+    def _hits_with_all_terms(hits: List[Dict[str, Any]], terms: List[str]) -> List[Dict[str, Any]]:
+        """Keyword hits whose content contains every query term, in their original order"""
+        terms = set(terms)
+        return [hit for hit in hits if terms <= set(KeywordIndex.tokenize(hit['content']))]
+
+    def _fuse_results(
+        self,
+        semantic_hits: List[Dict[str, Any]],
+        keyword_hits: List[Dict[str, Any]],
+        semantic_weight: float,
+        keyword_weight: float,
+        fusion: str,
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge ranked semantic and keyword results into one list.
+
+        'rrf' adds weight / (k + rank) from each list; 'weighted' adds the
+        weighted min-max normalised score from each list.
+        """
+        fused: Dict[int, Dict[str, Any]] = {}
+
+        for hits, weight, score_key in (
+            (semantic_hits, semantic_weight, 'similarity_score'),
+            (keyword_hits, keyword_weight, 'keyword_score'),
+        ):
+            if not hits or weight <= 0:
+                continue
+
+            scores = [hit[score_key] for hit in hits]
+            low, high = min(scores), max(scores)
+
+            for rank, hit in enumerate(hits, start=1):
+                entry = fused.get(hit['chunk_id'])
+                if entry is None:
+                    entry = fused[hit['chunk_id']] = dict(hit, hybrid_score=0.0)
+                entry[score_key] = hit[score_key]
+
+                if fusion == 'rrf':
+                    entry['hybrid_score'] += weight / (self.config.HYBRID_RRF_K + rank)
+                else:
+                    normalized = (hit[score_key] - low) / (high - low) if high > low else 1.0
+                    entry['hybrid_score'] += weight * normalized
+
+        results = sorted(fused.values(), key=lambda result: result['hybrid_score'], reverse=True)[:top_k]
+        for result in results:
+            result['retrieval_method'] = 'hybrid'
+        return results
+
+    def retrieve_keyword(
+        self,
+        query_text: str,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        require_all_terms: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve chunks by keyword relevance, without an embedding call.
+
+        Uses PostgreSQL full-text search when the database is PostgreSQL,
+        otherwise an in-process BM25 KeywordIndex.
+
+        Args:
+            query_text: Free-text query; terms are matched exactly (unstemmed)
+            top_k: Number of results to return
+            filters: Metadata filters (source_type, user_id, organization_id, document_id)
+            require_all_terms: Only return chunks containing every query term
+
+        Returns:
+            List of matching chunks with 'keyword_score', best first
+        """
+        if not self.db_engine:
+            raise ValueError("Database engine not provided")
+
+        top_k = top_k or self.config.TOP_K_RESULTS
+        terms = KeywordIndex.tokenize(query_text)
+        if not terms:
+            return []
+
+        try:
+            with self._session_factory() as session:
+                if self.db_engine.dialect.name == 'postgresql':
+                    matches = self._search_fulltext(session, terms, top_k, filters, require_all_terms)
+                else:
+                    matches = self.get_keyword_index(session).search(
+                        query_text, top_k=top_k, filters=filters, require_all_terms=require_all_terms
+                    )
+
+                chunks_data = self._get_chunks_data(session, [row['chunk_id'] for row, _ in matches])
+
+                results = []
+                for row, score in matches:
+                    chunk_data = chunks_data.get(row['chunk_id'])
+                    if chunk_data:
+                        result = self._build_result(row, chunk_data)
+                        result['keyword_score'] = float(score)
+                        results.append(result)
+
+                logger.info(f"Retrieved {len(results)} chunks by keyword")
+                return results
+
+        except Exception as e:
+            logger.error(f"Error retrieving by keyword: {e}")
+            raise
+
+    def _search_fulltext(
+        self,
+        session,
+        terms: List[str],
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        require_all_terms: bool
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank chunks with PostgreSQL full-text search.
+
+        The match uses the same to_tsvector expression as the GIN index created
+        by create_keyword_index, so it is served from the index.
+        """
+        ts_config = self.config.KEYWORD_TS_CONFIG
+        document = content_tsvector(ts_config)
+        # websearch_to_tsquery treats its input as plain words, so tokens cannot inject operators
+        tsquery = func.websearch_to_tsquery(
+            ts_config, (' ' if require_all_terms else ' or ').join(terms)
+        )
+        rank = func.ts_rank_cd(document, tsquery)
+
+        query = session.query(
+            DocumentChunk.id.label('chunk_id'),
+            DocumentChunk.document_id,
+            DocumentChunk.source_type,
+            DocumentChunk.user_id,
+            DocumentChunk.organization_id,
+            rank.label('rank'),
+        ).filter(document.op('@@')(tsquery))
+
+        if filters:
+            query = self._apply_chunk_filters(query, filters)
+
+        query = query.order_by(rank.desc()).limit(top_k)
+
+        matches = []
+        for row in query.all():
+            row = row._asdict()
+            matches.append((row, row.pop('rank')))
+        return matches
+
+    def get_keyword_index(self, session=None) -> KeywordIndex:
+        """
+        Get the in-process keyword index, syncing chunks added since the last call.
+
+        Args:
+            session: Optional open session; a new one is used if omitted
+
+        Returns:
+            The KeywordIndex shared by this retriever
+        """
+        if self._keyword_index is None:
+            self._keyword_index = KeywordIndex()
+        self._ensure_change_log()
+
+        if session is not None:
+            self._keyword_index.refresh(session, DocumentChunk, IndexChange)
+        elif self._session_factory:
+            with self._session_factory() as own_session:
+                self._keyword_index.refresh(own_session, DocumentChunk, IndexChange)
+
+        return self._keyword_index
+
     def search_by_metadata(
         self,
         filters: Dict[str, Any],
@@ -207,29 +900,25 @@ class RetrieverTool:
 
         try:
             with self._session_factory() as session:
-                query = session.query(EmbeddingStore)
+                # Join chunk content in the same query; embeddings are not loaded
+                query = session.query(
+                    EmbeddingStore.id,
+                    EmbeddingStore.chunk_id,
+                    EmbeddingStore.document_id,
+                    EmbeddingStore.source_type,
+                    EmbeddingStore.user_id,
+                    EmbeddingStore.organization_id,
+                    *self._chunk_columns()
+                ).join(DocumentChunk, DocumentChunk.id == EmbeddingStore.chunk_id)
 
                 # Apply filters
                 query = self._apply_filters(query, filters)
                 query = query.limit(limit)
 
                 results = []
-                for embedding_store in query.all():
-                    chunk_data = self._get_chunk_data(session, embedding_store.chunk_id)
-                    if chunk_data:
-                        result = {
-                            'chunk_id': embedding_store.chunk_id,
-                            'document_id': embedding_store.document_id,
-                            'content': chunk_data['content'],
-                            'source_type': embedding_store.source_type,
-                            'user_id': embedding_store.user_id,
-                            'organization_id': embedding_store.organization_id,
-                            'metadata': chunk_data.get('metadata', {}),
-                            'word_count': chunk_data.get('word_count', 0),
-                            'char_count': chunk_data.get('char_count', 0),
-                            'processed_at': chunk_data.get('processed_at'),
-                        }
-                        results.append(result)
+                for row in query.all():
+                    row = row._asdict()
+                    results.append(self._build_result(row, self._chunk_row_to_data(row)))
 
                 logger.info(f"Found {len(results)} chunks matching metadata filters")
                 return results
@@ -267,6 +956,11 @@ class RetrieverTool:
                         'earliest': date_range[0].isoformat() if date_range[0] else None,
                         'latest': date_range[1].isoformat() if date_range[1] else None
                     },
+                    'vector_backend': 'pgvector' if HAS_VECTOR else 'numpy',
+                    'local_index': self._local_index.get_stats() if self._local_index else None,
+                    'keyword_backend': 'tsvector' if self.db_engine.dialect.name == 'postgresql' else 'bm25',
+                    'keyword_index': self._keyword_index.get_stats() if self._keyword_index else None,
+                    'result_cache': self._result_cache.get_stats() if self._result_cache else None,
                     'database_connected': True
                 }
 
@@ -291,24 +985,86 @@ class RetrieverTool:
         if 'document_id' in filters:
             query = query.filter(EmbeddingStore.document_id == filters['document_id'])
 
+        if 'embedding_model' in filters:
+            # The model is recorded on the chunk row
+            query = query.join(DocumentChunk, DocumentChunk.id == EmbeddingStore.chunk_id)\
+                         .filter(DocumentChunk.embedding_model == filters['embedding_model'])
+
         # Add more filters as needed
         return query
 
+    def _apply_chunk_filters(self, query, filters: Dict[str, Any]):
+        """Apply metadata filters to a query over DocumentChunk."""
+        for field in KeywordIndex.FILTER_FIELDS:
+            if field in filters:
+                query = query.filter(getattr(DocumentChunk, field) == filters[field])
+        return query
+
     def _get_chunk_data(self, session, chunk_id: int) -> Optional[Dict[str, Any]]:
         """Get document chunk data by ID."""
-        # This is a placeholder - in production, you'd have a DocumentChunk model
-        # For now, return mock data
+        return self._get_chunks_data(session, [chunk_id]).get(chunk_id)
+
+    def _get_chunks_data(self, session, chunk_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get document chunk data for many IDs with a single IN query."""
+        if not chunk_ids:
+            return {}
+
         try:
-            # Mock implementation - replace with actual DocumentChunk query
-            return {
-                'content': f"Mock content for chunk {chunk_id}",
-                'metadata': {'chunk_id': chunk_id},
-                'word_count': 50,
-                'char_count': 300,
-                'processed_at': '2024-01-01T00:00:00Z'
-            }
-        except Exception:
-            return None
+            rows = session.query(*self._chunk_columns()).filter(
+                DocumentChunk.id.in_(set(chunk_ids))
+            ).all()
+            return {row.chunk_pk: self._chunk_row_to_data(row._asdict()) for row in rows}
+        except Exception as e:
+            logger.error(f"Error loading chunk data: {e}")
+            return {}
+
+    @staticmethod
+    def _chunk_columns():
+        """DocumentChunk columns needed to build a retrieval result."""
+        return (
+            DocumentChunk.id.label('chunk_pk'),
+            DocumentChunk.content,
+            DocumentChunk.content_hash,
+            DocumentChunk.chunk_metadata,
+            DocumentChunk.word_count,
+            DocumentChunk.char_count,
+            DocumentChunk.processed_at,
+        )
+
+    @staticmethod
+    def _chunk_row_to_data(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert selected DocumentChunk columns to the chunk data contract."""
+        try:
+            metadata = json.loads(row['chunk_metadata']) if row.get('chunk_metadata') else {}
+        except (TypeError, ValueError):
+            metadata = {}
+
+        processed_at = row.get('processed_at')
+        return {
+            'content': row['content'],
+            'content_hash': row.get('content_hash'),
+            'metadata': metadata,
+            'word_count': row.get('word_count') or 0,
+            'char_count': row.get('char_count') or 0,
+            'processed_at': processed_at.isoformat() if processed_at else None,
+        }
+
+    @staticmethod
+    def _build_result(row: Dict[str, Any], chunk_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine embedding metadata and chunk data into a result dictionary."""
+        return {
+            'chunk_id': row['chunk_id'],
+            'document_id': row['document_id'],
+            'content': chunk_data['content'],
+            'content_hash': chunk_data.get('content_hash'),
+            'source_type': row['source_type'],
+            'user_id': row['user_id'],
+            'organization_id': row['organization_id'],
+            'metadata': chunk_data.get('metadata', {}),
+            'word_count': chunk_data.get('word_count', 0),
+            'char_count': chunk_data.get('char_count', 0),
+            'processed_at': chunk_data.get('processed_at'),
+        }
 
     def validate_query_embedding(self, embedding: List[float]) -> Dict[str, Any]:
         """Validate query embedding dimensions and quality."""
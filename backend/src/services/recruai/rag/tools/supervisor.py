@@ -4,8 +4,10 @@ Directs workflow and decides which tools to call based on input type
 """
 
 import logging
+import threading
 import time
-from typing import Dict, Any, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Optional, Union, Callable
 from datetime import datetime
 
 from ..config import RAGConfig
@@ -18,11 +20,83 @@ class RAGSupervisor:
     """
     Supervisor tool that orchestrates the RAG workflow.
     Routes inputs to appropriate tools and manages the overall process.
+
+    Tools are looked up in a registry and each workflow is run as a DAG:
+    steps whose inputs are ready run concurrently on a bounded thread pool,
+    and batch items run concurrently on a second pool. With an IngestPipeline
+    registered, ingestion ends in a 'store' step that embeds new or changed
+    chunks and persists them; without one, chunks are only embedded.
     """
 
-    def __init__(self):
+    # Tools that only inspect or annotate the input; their output is not passed down the chain
+    SIDE_TOOLS = ('metadata_manager', 'safety')
+
+    # Tools routed to when available; unregistered ones are skipped instead of failing the workflow
+    OPTIONAL_TOOLS = ('safety', 'transcriber', 'ocr')
+
+    def __init__(
+        self,
+        ingestor=None,
+        embedder=None,
+        retriever=None,
+        generator=None,
+        max_workers: Optional[int] = None
+    ):
         self.config = RAGConfig()
         self._activity_log = []
+        self.job_queue = None  # IngestJobQueue, once attached
+
+        self.max_workers = max_workers or self.config.SUPERVISOR_MAX_WORKERS
+        self._step_executor = None
+        self._batch_executor = None
+        self._executor_lock = threading.Lock()
+
+        self.ingestor = None
+        self.embedder = None
+        self.retriever = None
+        self.generator = None
+        self.pipeline = None
+        self._tools: Dict[str, Callable[[Any, Dict[str, Any]], Dict[str, Any]]] = {}
+        self.register_tool('metadata_manager', self._run_metadata_manager)
+        self.register_tools(ingestor=ingestor, embedder=embedder, retriever=retriever, generator=generator)
+
+    def register_tool(self, tool_name: str, handler: Callable[[Any, Dict[str, Any]], Dict[str, Any]]) -> None:
+        """
+        Register a tool handler.
+
+        Args:
+            tool_name: Name used by route_input ('ingestor', 'ocr', ...)
+            handler: Callable taking (input_data, context) and returning a dict
+                     with 'success' and 'output'
+        """
+        self._tools[tool_name] = handler
+
+    def register_tools(self, ingestor=None, embedder=None, retriever=None, generator=None, pipeline=None) -> None:
+        """Wire the standard RAG tools (and the IngestPipeline as 'store') into the registry"""
+        if ingestor is not None:
+            self.ingestor = ingestor
+            self.register_tool('ingestor', self._run_ingestor)
+        if embedder is not None:
+            self.embedder = embedder
+            self.register_tool('embedder', self._run_embedder)
+        if retriever is not None:
+            self.retriever = retriever
+            self.register_tool('retriever', self._run_retriever)
+        if generator is not None:
+            self.generator = generator
+            self.register_tool('generator', self._run_generator)
+        if pipeline is not None:
+            self.pipeline = pipeline
+            self.register_tool('store', self._run_store)
+
+    def get_registered_tools(self) -> List[str]:
+        """Get names of the tools that can be executed"""
+        return sorted(self._tools)
+
+    def attach_job_queue(self, job_queue) -> None:
+        """Track background ingest jobs so their progress shows in get_workflow_status"""
+        self.job_queue = job_queue
+        job_queue.supervisor = self
 
     def route_input(self, input_type: str, metadata: Optional[Dict[str, Any]] = None) -> List[str]:
         """
@@ -63,6 +137,10 @@ class RAGSupervisor:
         if metadata and metadata.get('needs_metadata_enrichment', True):
             tools.insert(0, 'metadata_manager')  # Add at beginning
 
+        # The pipeline embeds only new or changed chunks as it stores them
+        if 'store' in self._tools and 'embedder' in tools:
+            tools[tools.index('embedder')] = 'store'
+
         return tools
 
     def orchestrate_workflow(
@@ -130,13 +208,14 @@ class RAGSupervisor:
             else:
                 raise ValueError(f"Unsupported input type: {input_type}")
 
-            # Calculate performance metrics
+            # Calculate performance metrics (tool timings were recorded per step)
             end_time = time.time()
-            result['performance'] = {
+            result['performance'].update({
                 'total_time': end_time - start_time,
                 'tools_executed': len(result['processing_steps']),
                 'success': len(result['errors']) == 0
-            }
+            })
+            result['success'] = len(result['errors']) == 0
 
             # Log workflow completion
             self.log_activity(
@@ -175,35 +254,83 @@ class RAGSupervisor:
         user_context: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Execute ingestion workflow for documents and media"""
-        current_data = input_data
+        skipped = [name for name in tools_needed if name in self.OPTIONAL_TOOLS and name not in self._tools]
+        if skipped:
+            logger.info(f"Skipping unregistered optional tools: {', '.join(skipped)}")
+            tools_needed = [name for name in tools_needed if name not in skipped]
+            result['tools_used'] = tools_needed
+            result['skipped_tools'] = skipped
+
+        steps = self._build_ingestion_steps(input_data, tools_needed)
+        context = {
+            'input_type': input_type,
+            'user_context': user_context,
+            'workflow_metadata': result['metadata']
+        }
 
+        step_results = self._run_dag(steps, context, result)
+
+        # The final result is the output of the last step in the main chain
+        result['final_result'] = input_data
         for tool_name in tools_needed:
-            try:
-                step_result = self._execute_tool(tool_name, current_data, {
-                    'input_type': input_type,
-                    'user_context': user_context,
-                    'workflow_metadata': result['metadata']
-                })
+            if tool_name in self.SIDE_TOOLS:
+                continue
+            step_result = step_results.get(tool_name, {})
+            if not step_result.get('success', False):
+                break
+            result['final_result'] = step_result.get('output')
+
+        return result
+
+    def _build_ingestion_steps(
+        self,
+        input_data: Union[str, Dict[str, Any]],
+        tools_needed: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Turn the routed tool list into DAG steps.
+
+        Text extraction (transcriber/ocr) comes first; the metadata manager and
+        safety check are independent of chunking and run alongside it.
+        """
+        steps = []
+        previous = None  # Last tool in the main chain
+        has_metadata = 'metadata_manager' in tools_needed
+
+        for tool_name in tools_needed:
+            if tool_name == 'metadata_manager':
+                steps.append({'tool': tool_name, 'depends_on': [], 'input': lambda outputs: input_data})
 
-                result['processing_steps'].append({
+            elif tool_name == 'safety':
+                source = previous if previous in ('transcriber', 'ocr') else None
+                steps.append({
                     'tool': tool_name,
-                    'success': step_result.get('success', True),
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'output_summary': self._summarize_step_output(step_result)
+                    'depends_on': [source] if source else [],
+                    'input': lambda outputs, source=source: outputs.get(source, input_data),
                 })
 
-                # Pass output to next tool if successful
-                if step_result.get('success', True) and 'output' in step_result:
-                    current_data = step_result['output']
+            elif tool_name == 'ingestor':
+                source = previous
+                steps.append({
+                    'tool': tool_name,
+                    'depends_on': [name for name in (source, 'metadata_manager' if has_metadata else None) if name],
+                    'input': lambda outputs, source=source: {
+                        'content': outputs.get(source, input_data) if source else input_data,
+                        'metadata': outputs.get('metadata_manager'),
+                    },
+                })
+                previous = tool_name
 
-            except Exception as e:
-                error_msg = f"Tool {tool_name} failed: {str(e)}"
-                result['errors'].append(error_msg)
-                logger.error(error_msg)
-                break
+            else:
+                source = previous
+                steps.append({
+                    'tool': tool_name,
+                    'depends_on': [source] if source else [],
+                    'input': lambda outputs, source=source: outputs[source] if source else input_data,
+                })
+                previous = tool_name
 
-        result['final_result'] = current_data
-        return result
+        return steps
 
     def _execute_query_workflow(
         self,
@@ -214,48 +341,36 @@ class RAGSupervisor:
     ) -> Dict[str, Any]:
         """Execute query workflow for RAG retrieval and generation"""
         query = input_data if isinstance(input_data, str) else input_data.get('query', '')
-
-        # Step 1: Retrieve relevant chunks
-        retrieval_result = self._execute_tool('retriever', {
-            'query': query,
-            'user_context': user_context,
-            'filters': input_data.get('filters', {}) if isinstance(input_data, dict) else {}
-        }, {'workflow_metadata': result['metadata']})
-
-        result['processing_steps'].append({
-            'tool': 'retriever',
-            'success': retrieval_result.get('success', True),
-            'timestamp': datetime.utcnow().isoformat(),
-            'chunks_retrieved': len(retrieval_result.get('chunks', []))
-        })
-
-        if not retrieval_result.get('success', True):
-            result['errors'].append("Retrieval failed")
-            return result
-
-        # Step 2: Generate answer using retrieved context
-        context_chunks = retrieval_result.get('chunks', [])
-        generation_result = self._execute_tool('generator', {
-            'query': query,
-            'context': context_chunks,
-            'user_context': user_context
-        }, {'workflow_metadata': result['metadata']})
-
-        result['processing_steps'].append({
-            'tool': 'generator',
-            'success': generation_result.get('success', True),
-            'timestamp': datetime.utcnow().isoformat(),
-            'answer_length': len(generation_result.get('answer', ''))
-        })
-
-        if generation_result.get('success', True):
+        options = input_data if isinstance(input_data, dict) else {}
+
+        # Retrieval does not wait for metadata enrichment; generation needs the chunks
+        steps = [
+            {'tool': 'retriever', 'depends_on': [], 'input': lambda outputs: {
+                'query': query,
+                'user_context': user_context,
+                'filters': options.get('filters', {}),
+                'top_k': options.get('top_k'),
+            }},
+            {'tool': 'generator', 'depends_on': ['retriever'], 'input': lambda outputs: {
+                'query': query,
+                'context': outputs['retriever'],
+                'user_context': user_context,
+            }},
+        ]
+        if 'metadata_manager' in tools_needed:
+            steps.insert(0, {'tool': 'metadata_manager', 'depends_on': [], 'input': lambda outputs: input_data})
+
+        step_results = self._run_dag(steps, {'workflow_metadata': result['metadata']}, result)
+
+        generation = step_results.get('generator', {})
+        if generation.get('success', False):
+            answer = generation.get('output') or {}
             result['final_result'] = {
-                'answer': generation_result.get('answer', ''),
-                'sources': context_chunks,
-                'confidence': generation_result.get('confidence', 0.0)
+                'answer': answer.get('answer', ''),
+                'sources': step_results['retriever'].get('output', []),
+                'confidence': answer.get('confidence', 0.0),
+                'context_tokens': answer.get('context_tokens')
             }
-        else:
-            result['errors'].append("Generation failed")
 
         return result
 
@@ -266,17 +381,24 @@ class RAGSupervisor:
         result: Dict[str, Any],
         user_context: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        """Execute batch processing workflow"""
-        # Implementation for batch processing multiple documents
+        """Execute batch processing workflow, running independent items concurrently"""
         batch_items = input_data if isinstance(input_data, list) else [input_data]
-        results = []
-
-        for item in batch_items:
-            item_result = self.orchestrate_workflow(
-                item, 'text', result['metadata'], user_context
-            )
-            results.append(item_result)
-
+        executor = self._get_batch_executor()
+
+        futures = [
+            executor.submit(self._execute_batch_item, item, result['metadata'], user_context)
+            for item in batch_items
+        ]
+        results = [future.result() for future in futures]
+
+        tool_times = result['performance'].setdefault('tool_times', {})
+        for index, item_result in enumerate(results):
+            for tool_name, seconds in item_result['performance'].get('tool_times', {}).items():
+                tool_times[tool_name] = tool_times.get(tool_name, 0.0) + seconds
+            for error in item_result['errors']:
+                result['errors'].append(f"Item {index}: {error}")
+
+        result['performance']['batch_workers'] = min(self.max_workers, len(batch_items))
         result['final_result'] = {
             'batch_size': len(batch_items),
             'successful': sum(1 for r in results if r.get('success', False)),
@@ -285,20 +407,256 @@ class RAGSupervisor:
 
         return result
 
+    def _execute_batch_item(
+        self,
+        item: Union[str, Dict[str, Any]],
+        metadata: Dict[str, Any],
+        user_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Run the ingestion workflow for a single batch item"""
+        start_time = time.time()
+        input_type = item.get('input_type', 'text') if isinstance(item, dict) else 'text'
+        tools_needed = self.route_input(input_type, metadata)
+
+        item_result = {
+            'input_type': input_type,
+            'tools_used': tools_needed,
+            'processing_steps': [],
+            'final_result': None,
+            'metadata': metadata,
+            'errors': [],
+            'performance': {}
+        }
+
+        try:
+            self._execute_ingestion_workflow(item, input_type, tools_needed, item_result, user_context)
+        except Exception as e:
+            item_result['errors'].append(str(e))
+
+        item_result['success'] = len(item_result['errors']) == 0
+        item_result['performance']['total_time'] = time.time() - start_time
+        return item_result
+
+    def _run_dag(
+        self,
+        steps: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        result: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute workflow steps in dependency order.
+
+        Each step is a dict with 'tool', 'depends_on' (tool names) and 'input',
+        a callable building the step input from the outputs of finished steps.
+        Ready steps run concurrently on the step pool (a lone ready step runs
+        inline); steps depending on a failed step are skipped.
+
+        Returns:
+            Step results keyed by tool name
+        """
+        known = {step['tool'] for step in steps}
+        pending = {step['tool']: step for step in steps}
+        running = {}
+        outputs = {}
+        step_results = {}
+
+        while pending or running:
+            ready = []
+            for tool_name, step in list(pending.items()):
+                depends_on = [name for name in step.get('depends_on', []) if name in known]
+                if any(name not in step_results for name in depends_on):
+                    continue
+
+                del pending[tool_name]
+                failed = [name for name in depends_on if not step_results[name].get('success', False)]
+                if failed:
+                    step_results[tool_name] = {
+                        'success': False,
+                        'tool': tool_name,
+                        'error': f"Skipped because {', '.join(failed)} failed",
+                        'execution_time': 0.0
+                    }
+                    self._record_step(result, tool_name, step_results[tool_name])
+                else:
+                    ready.append(step)
+
+            if not ready and not running:
+                if pending:
+                    raise ValueError(f"Workflow has unsatisfiable dependencies: {sorted(pending)}")
+                continue
+
+            if len(ready) == 1 and not running:
+                step = ready[0]
+                completed = [(step['tool'], self._execute_tool(step['tool'], step['input'](outputs), context))]
+            else:
+                executor = self._get_step_executor()
+                for step in ready:
+                    future = executor.submit(self._execute_tool, step['tool'], step['input'](outputs), context)
+                    running[future] = step['tool']
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                completed = [(running.pop(future), future.result()) for future in done]
+
+            for tool_name, step_result in completed:
+                step_results[tool_name] = step_result
+                if step_result.get('success', False):
+                    outputs[tool_name] = step_result.get('output')
+                self._record_step(result, tool_name, step_result)
+
+        return step_results
+
+    def _record_step(self, result: Dict[str, Any], tool_name: str, step_result: Dict[str, Any]) -> None:
+        """Add a finished step to the workflow result and accumulate its wall time"""
+        success = step_result.get('success', False)
+        execution_time = step_result.get('execution_time', 0.0)
+
+        step = {
+            'tool': tool_name,
+            'success': success,
+            'timestamp': datetime.utcnow().isoformat(),
+            'execution_time': execution_time,
+            'output_summary': self._summarize_step_output(step_result)
+        }
+        if not success:
+            step['error'] = step_result.get('error')
+            result['errors'].append(f"Tool {tool_name} failed: {step_result.get('error')}")
+        result['processing_steps'].append(step)
+
+        tool_times = result['performance'].setdefault('tool_times', {})
+        tool_times[tool_name] = tool_times.get(tool_name, 0.0) + execution_time
+
     def _execute_tool(self, tool_name: str, input_data: Any, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a specific tool with given input and context"""
-        # This is a placeholder - actual tool execution will be implemented
-        # when individual tools are created
-        logger.info(f"Executing tool: {tool_name} with input type: {type(input_data)}")
+        handler = self._tools.get(tool_name)
+        start_time = time.perf_counter()
+
+        if handler is None:
+            step_result = {'success': False, 'error': f"Tool '{tool_name}' is not registered"}
+        else:
+            try:
+                step_result = handler(input_data, context)
+            except Exception as e:
+                logger.error(f"Tool {tool_name} failed: {e}")
+                step_result = {'success': False, 'error': str(e)}
+
+        step_result['tool'] = tool_name
+        step_result['execution_time'] = time.perf_counter() - start_time
+        logger.info(f"Executed tool {tool_name} in {step_result['execution_time']:.3f}s")
+        return step_result
+
+    def _run_metadata_manager(self, input_data: Any, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the metadata attached to ingested chunks"""
+        metadata = dict(context.get('workflow_metadata') or {})
+        if isinstance(input_data, dict):
+            metadata.update(input_data.get('metadata') or {})
+        metadata.setdefault('input_type', context.get('input_type'))
+        metadata['processed_at'] = datetime.utcnow().isoformat()
+
+        user_context = context.get('user_context') or {}
+        if user_context.get('user_id') is not None:
+            metadata.setdefault('user_id', user_context['user_id'])
+
+        return {'success': True, 'output': metadata}
+
+    def _run_ingestor(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Chunk text, or a file when given a path"""
+        content = input_data.get('content')
+        metadata = input_data.get('metadata') or context.get('workflow_metadata') or {}
+
+        if isinstance(content, dict):
+            metadata = {**metadata, **(content.get('metadata') or {})}
+            if content.get('file_path'):
+                return {'success': True, 'output': self.ingestor.ingest_file(content['file_path'], metadata)}
+            content = content.get('content') or content.get('text', '')
+
+        if context.get('input_type') == 'pdf':
+            return {'success': True, 'output': self.ingestor.ingest_pdf(content, metadata)}
+
+        chunks = self.ingestor.ingest_text(
+            content, metadata, chunking_strategy=metadata.get('chunking_strategy', 'semantic')
+        )
+        return {'success': True, 'output': chunks}
+
+    def _run_embedder(self, input_data: List[Dict[str, Any]], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Embed chunks produced by the ingestor"""
+        chunks = self.embedder.generate_embeddings(input_data)
+        embedded = [chunk for chunk in chunks if chunk.get('embedding') is not None]
+        return {
+            'success': len(embedded) == len(chunks),
+            'output': chunks,
+            'error': None if len(embedded) == len(chunks) else f"{len(chunks) - len(embedded)} chunks failed to embed"
+        }
 
-        # Mock successful execution for now
+    def _run_store(self, input_data: List[Dict[str, Any]], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist chunks produced by the ingestor through the IngestPipeline"""
+        metadata = dict(context.get('workflow_metadata') or {})
+        if input_data:
+            metadata.update(input_data[0].get('metadata') or {})
+        user_context = context.get('user_context') or {}
+
+        document_id = metadata.get('document_id')
+        if document_id is None:
+            raise ValueError("Storing chunks requires a document_id in the metadata")
+
+        stats = self.pipeline.ingest_chunks(
+            input_data,
+            document_id=str(document_id),
+            source_type=metadata.get('source_type') or context.get('input_type'),
+            user_id=user_context.get('user_id', metadata.get('user_id')),
+            organization_id=user_context.get('organization_id', metadata.get('organization_id')),
+            source_id=metadata.get('source_id'),
+            chunking_strategy=metadata.get('chunking_strategy', 'semantic')
+        )
+        stored = stats['status'] == 'completed'
         return {
-            'success': True,
-            'output': input_data,
-            'tool': tool_name,
-            'execution_time': 0.1
+            'success': stored,
+            'output': stats,
+            'error': None if stored else f"{stats['chunks_failed']} chunks could not be embedded; previous chunks were kept"
         }
 
+    def _run_retriever(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Retrieve chunks similar to the query"""
+        if self.embedder is None:
+            raise ValueError("Retriever requires an embedder to be registered")
+
+        chunks = self.retriever.retrieve_by_text(
+            input_data['query'],
+            self.embedder,
+            top_k=input_data.get('top_k'),
+            filters=input_data.get('filters') or None
+        )
+        return {'success': True, 'output': chunks, 'chunks': chunks}
+
+    def _run_generator(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate an answer grounded in the retrieved chunks"""
+        answer = self.generator.generate_answer(
+            input_data['query'],
+            input_data.get('context') or [],
+            user_context=input_data.get('user_context')
+        )
+        return {
+            'success': 'error' not in answer,
+            'output': answer,
+            'error': answer.get('error')
+        }
+
+    def _get_step_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._step_executor is None:
+                self._step_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="rag-step"
+                )
+            return self._step_executor
+
+    def _get_batch_executor(self) -> ThreadPoolExecutor:
+        # Separate from the step pool so batch items waiting on their steps cannot starve it
+        with self._executor_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="rag-batch"
+                )
+            return self._batch_executor
+
     def _summarize_step_output(self, step_result: Dict[str, Any]) -> str:
         """Create a summary of step output for logging"""
         if not step_result.get('success', False):
@@ -364,7 +722,34 @@ class RAGSupervisor:
         return self._activity_log[-limit:]
 
     def get_workflow_status(self, workflow_id: str) -> Optional[Dict[str, Any]]:
-        """Get status of a specific workflow"""
+        """
+        Get status of a specific workflow.
+
+        Background ingest jobs report their stored status with per-stage
+        progress; other workflows report their latest logged activity.
+        """
+        if self.job_queue is not None:
+            try:
+                job = self.job_queue.get_job(workflow_id)
+            except Exception as e:
+                logger.warning(f"Could not load ingest job {workflow_id}: {e}")
+                job = None
+
+            if job is not None:
+                activity = self._latest_activity(workflow_id)
+                return {
+                    'workflow_id': workflow_id,
+                    'workflow_type': 'ingest_job',
+                    'status': job['status'],
+                    'current_stage': job['current_stage'],
+                    'stages': job['stages'],
+                    'job': job,
+                    'last_activity': activity,
+                }
+
+        return self._latest_activity(workflow_id)
+
+    def _latest_activity(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         for activity in reversed(self._activity_log):
             if activity['workflow_id'] == workflow_id:
                 return activity
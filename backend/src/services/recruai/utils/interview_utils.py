@@ -3,9 +3,13 @@
 Updated imports to reflect unified package layout (no top-level
 `backend` module)."""
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from sqlalchemy import or_
 from extensions import db
-from src.models import Interview
+from src.models import Interview, InterviewAnalysis, Message
 
 
 def update_expired_interviews():
@@ -49,6 +53,135 @@ def update_expired_interviews():
         return 0
 
 
+def analyze_completed_interviews(batch_size=None, max_workers=None, max_interviews=None):
+    """
+    Generate AI analyses for completed interviews that do not have one yet.
+    This should be called periodically (e.g., every 5 minutes) via a background task.
+
+    Interviews are claimed in batches: SELECT ... FOR UPDATE SKIP LOCKED picks
+    rows no other run holds, and an UPDATE stamps them with a lease
+    (analysis_next_attempt_at) and counts the attempt before committing right
+    away. Concurrent runs skip leased rows, so no interview is analyzed twice,
+    and the AI calls run outside any transaction without holding row locks.
+
+    A failed (Limited) analysis leaves the lease replaced by an exponential
+    backoff, and interviews that failed ANALYSIS_JOB_MAX_ATTEMPTS times are not
+    retried, so an unusable transcript does not cost an AI call every run.
+
+    Args:
+        batch_size: Interviews claimed and saved per batch (ANALYSIS_JOB_BATCH_SIZE, default 10)
+        max_workers: Concurrent analyses (ANALYSIS_JOB_WORKERS, default 4)
+        max_interviews: Upper bound per run (ANALYSIS_JOB_MAX_PER_RUN, default 50)
+    """
+    from src.services.recruai.interview_analysis import generate_ai_analysis, build_interview_analysis
+    from src.services.recruai.llm_gateway import get_llm_gateway
+
+    batch_size = batch_size or int(os.getenv('ANALYSIS_JOB_BATCH_SIZE', '10'))
+    max_workers = max_workers or int(os.getenv('ANALYSIS_JOB_WORKERS', '4'))
+    max_interviews = max_interviews or int(os.getenv('ANALYSIS_JOB_MAX_PER_RUN', '50'))
+    max_attempts = int(os.getenv('ANALYSIS_JOB_MAX_ATTEMPTS', '5'))
+    lease_seconds = int(os.getenv('ANALYSIS_JOB_LEASE_SECONDS', '900'))
+    backoff_seconds = int(os.getenv('ANALYSIS_JOB_BACKOFF_SECONDS', '600'))
+
+    if not get_llm_gateway().available_providers():
+        return 0
+
+    analyzed_count = 0
+    processed_count = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='interview-analysis') as executor:
+            while processed_count < max_interviews:
+                now = datetime.utcnow()
+
+                # Claim a batch; rows locked or leased by another run are skipped
+                interviews = Interview.query.outerjoin(
+                    InterviewAnalysis, InterviewAnalysis.interview_id == Interview.id
+                ).filter(
+                    Interview.status == 'completed',
+                    InterviewAnalysis.id.is_(None),
+                    Interview.analysis_attempts < max_attempts,
+                    or_(Interview.analysis_next_attempt_at.is_(None), Interview.analysis_next_attempt_at <= now)
+                ).order_by(Interview.completed_at, Interview.id)\
+                 .limit(min(batch_size, max_interviews - processed_count))\
+                 .with_for_update(skip_locked=True, of=Interview)\
+                 .all()
+                if not interviews:
+                    db.session.rollback()
+                    break
+
+                interview_ids = [interview.id for interview in interviews]
+                attempts = {interview.id: (interview.analysis_attempts or 0) + 1 for interview in interviews}
+                messages_by_interview = {interview_id: [] for interview_id in interview_ids}
+                for msg in Message.query.filter(Message.interview_id.in_(interview_ids))\
+                                        .order_by(Message.created_at, Message.id).all():
+                    messages_by_interview[msg.interview_id].append(
+                        SimpleNamespace(message_type=msg.message_type, content=msg.content)
+                    )
+
+                # Workers get plain copies so they never touch the session
+                jobs = [
+                    (
+                        interview.id,
+                        SimpleNamespace(
+                            title=interview.title,
+                            description=interview.description,
+                            duration_minutes=interview.duration_minutes
+                        ),
+                        messages_by_interview[interview.id]
+                    )
+                    for interview in interviews
+                ]
+
+                _update_analysis_schedule(
+                    interview_ids,
+                    analysis_attempts=Interview.analysis_attempts + 1,
+                    analysis_next_attempt_at=now + timedelta(seconds=lease_seconds)
+                )
+                db.session.commit()  # Releases the row locks before any AI call
+                processed_count += len(interview_ids)
+
+                results = list(executor.map(lambda job: (job[0], generate_ai_analysis(job[1], job[2])), jobs))
+
+                # The analyze endpoint may have saved an analysis meanwhile
+                existing_ids = {
+                    row.interview_id for row in
+                    InterviewAnalysis.query.filter(InterviewAnalysis.interview_id.in_(interview_ids)).all()
+                }
+                saved = 0
+                for interview_id, analysis_data in results:
+                    if interview_id in existing_ids:
+                        continue
+                    # Limited analyses mean the AI call failed; retry after a backoff
+                    if analysis_data['analyzed_by'].endswith('(Limited)'):
+                        delay = backoff_seconds * 2 ** (attempts[interview_id] - 1)
+                        _update_analysis_schedule(
+                            [interview_id], analysis_next_attempt_at=datetime.utcnow() + timedelta(seconds=delay)
+                        )
+                        continue
+                    db.session.add(build_interview_analysis(interview_id, analysis_data))
+                    saved += 1
+
+                db.session.commit()
+                analyzed_count += saved
+
+        if analyzed_count > 0:
+            print(f"Generated AI analysis for {analyzed_count} completed interviews")
+
+        return analyzed_count
+
+    except Exception as e:
+        print(f"Error analyzing completed interviews: {e}")
+        db.session.rollback()
+        return analyzed_count
+
+
+def _update_analysis_schedule(interview_ids, **values):
+    """Set analysis bookkeeping columns without touching updated_at"""
+    Interview.query.filter(Interview.id.in_(interview_ids)).update(
+        dict(values, updated_at=Interview.updated_at), synchronize_session=False
+    )
+
+
 def update_interview_decision(interview_id, decision, feedback=None, rating=None):
     """
     Update interview decision and related fields.
@@ -0,0 +1,39 @@
+"""Shared pytest fixtures for the backend services and API helpers"""
+
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Keep tests offline and independent of the developer's environment
+os.environ.setdefault("AI_CACHE_ENABLED", "false")
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+from flask import Flask  # noqa: E402
+
+from extensions import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """Flask app bound to a fresh in-memory SQLite database with every table created"""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI="sqlite://",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+
+    import src.models  # noqa: F401  (registers the models)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from extensions import db
+from src.models import Interview, InterviewAnalysis
+from src.services.recruai import interview_analysis, llm_gateway
+from src.services.recruai.utils.interview_utils import analyze_completed_interviews
+
+
+def analysis(analyzed_by="AI Analysis System"):
+    return {
+        "overall_score": 80,
+        "communication_score": 80,
+        "technical_score": 80,
+        "problem_solving_score": 80,
+        "cultural_fit_score": 80,
+        "strengths": [],
+        "improvements": [],
+        "detailed_feedback": "",
+        "ai_analysis_summary": "",
+        "actual_duration_minutes": 60,
+        "average_response_time_seconds": 30.0,
+        "question_count": 0,
+        "analyzed_by": analyzed_by,
+        "analysis_method": "ai",
+    }
+
+
+@pytest.fixture
+def analyzer(app, monkeypatch):
+    """Stub AI analysis whose result is set per interview title"""
+    calls = []
+    results = {}
+
+    def generate(interview, messages):
+        calls.append(interview.title)
+        return results.get(interview.title, analysis())
+
+    monkeypatch.setattr(llm_gateway, "get_llm_gateway", lambda: SimpleNamespace(available_providers=lambda: ["groq"]))
+    monkeypatch.setattr(interview_analysis, "generate_ai_analysis", generate)
+    return SimpleNamespace(calls=calls, results=results)
+
+
+def add_interview(title, **values):
+    interview = Interview(
+        title=title, scheduled_at=datetime(2026, 1, 1), user_id=1, organization_id=1,
+        status="completed", completed_at=datetime(2026, 1, 1, 1), **values
+    )
+    db.session.add(interview)
+    db.session.commit()
+    return interview.id
+
+
+def test_successful_analysis_is_saved(analyzer):
+    interview_id = add_interview("good")
+
+    assert analyze_completed_interviews() == 1
+    assert InterviewAnalysis.query.filter_by(interview_id=interview_id).count() == 1
+    assert db.session.get(Interview, interview_id).analysis_attempts == 1
+
+
+def test_limited_analysis_backs_off(analyzer):
+    interview_id = add_interview("empty")
+    analyzer.results["empty"] = analysis("AI Analysis System (Limited)")
+
+    assert analyze_completed_interviews() == 0
+    interview = db.session.get(Interview, interview_id)
+    assert interview.analysis_attempts == 1
+    assert interview.analysis_next_attempt_at > datetime.utcnow() + timedelta(minutes=5)
+    assert InterviewAnalysis.query.count() == 0
+
+    # The next run does not pay for another AI call before the backoff expires
+    analyze_completed_interviews()
+    assert analyzer.calls == ["empty"]
+
+
+def test_leased_and_exhausted_interviews_are_skipped(analyzer):
+    add_interview("leased", analysis_next_attempt_at=datetime.utcnow() + timedelta(minutes=10))
+    add_interview("exhausted", analysis_attempts=5)
+    add_interview("due", analysis_attempts=2, analysis_next_attempt_at=datetime.utcnow() - timedelta(minutes=1))
+
+    assert analyze_completed_interviews() == 1
+    assert analyzer.calls == ["due"]
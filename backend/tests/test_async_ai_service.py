@@ -0,0 +1,80 @@
+import json
+
+import httpx
+import pytest
+
+from src.services.recruai import llm_gateway
+from src.services.recruai.ai_service import AIService, CircuitBreaker
+from src.services.recruai.async_ai_service import AsyncInterviewAIService, run_sync
+from src.services.recruai.llm_gateway import LLMGateway
+
+
+def completion(content):
+    return {"choices": [{"message": {"content": content}, "finish_reason": "stop"}], "usage": {}}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Fake chat completions endpoint that fails the first request with a 503"""
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("AI_HTTP_BACKOFF_BASE", "0")
+    requests = []
+
+    def handle(request):
+        payload = json.loads(request.content)
+        requests.append(payload)
+        if len(requests) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json=completion(f"answer to {payload['messages'][-1]['content']}"))
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+    monkeypatch.setattr(AIService, "_get_async_client", client)
+    return requests
+
+
+def test_async_requests_share_the_retry_policy(provider):
+    service = AsyncInterviewAIService(provider="groq")
+
+    responses = service.gather_responses([
+        {"system_prompt": "s", "user_message": "one", "temperature": 0.1, "max_tokens": 50},
+        {"system_prompt": "s", "user_message": "two"},
+    ])
+
+    assert sorted(responses) == ["answer to one", "answer to two"]
+    assert len(provider) == 3  # The 503 was retried
+    assert service.circuit_breaker.state == "closed"
+    sent = {payload["messages"][-1]["content"]: payload for payload in provider[1:]}
+    assert (sent["one"]["temperature"], sent["one"]["max_tokens"]) == (0.1, 50)
+    assert (sent["two"]["temperature"], sent["two"]["max_tokens"]) == (0.7, 1000)
+
+
+def test_routed_requests_go_through_the_gateway(provider, monkeypatch):
+    gateway = LLMGateway(providers=["groq"])
+    monkeypatch.setattr(llm_gateway, "get_llm_gateway", lambda: gateway)
+    service = AsyncInterviewAIService(provider="groq", routed=True)
+
+    assert run_sync(service.agenerate_response("s", "hello")) == "answer to hello"
+    stats = gateway.get_stats()["providers"]["groq"]["models"]
+    assert sum(model["requests"] for model in stats.values()) == 1
+
+
+@pytest.mark.parametrize("status, state", [(401, "open"), (404, "open"), (400, "closed")])
+def test_auth_and_not_found_responses_count_as_failures(monkeypatch, status, state):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    requests = []
+
+    def handle(request):
+        requests.append(request)
+        return httpx.Response(status)
+
+    monkeypatch.setattr(AIService, "_get_async_client", lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handle)))
+    service = AsyncInterviewAIService(provider="groq")
+    service.circuit_breaker = CircuitBreaker(failure_threshold=1)
+
+    response = run_sync(service._apost({"messages": []}))
+
+    assert response.status_code == status
+    assert len(requests) == 1  # Not retried
+    assert service.circuit_breaker.state == state
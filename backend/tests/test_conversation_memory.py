@@ -0,0 +1,70 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from src.blueprints.recruai.routes.api.interviews import ai_chat
+from src.models import ConversationMemory, Interview
+from src.services.recruai.conversation_memory_manager import ConversationMemoryManager
+
+
+@pytest.fixture
+def manager():
+    return ConversationMemoryManager(summary_interval=2, recent_messages=2, mode="extractive")
+
+
+@pytest.fixture
+def interview_id(app):
+    interview = Interview(title="Backend Engineer", scheduled_at=datetime(2026, 1, 1), user_id=1, organization_id=1)
+    db.session.add(interview)
+    db.session.commit()
+    return interview.id
+
+
+def add_messages(interview_id, timestamps):
+    for index, second in enumerate(timestamps):
+        ConversationMemory.add_message(
+            interview_id=interview_id, user_id=1, message_type="user" if index % 2 else "ai",
+            content=f"m{index}.", timestamp=datetime(2026, 1, 1, 0, 0, second), commit=False
+        )
+    db.session.commit()
+
+
+def test_messages_sharing_the_boundary_timestamp_are_not_skipped(manager, interview_id):
+    # m1 is folded into the summary, m2 has the same timestamp and is not
+    add_messages(interview_id, [0, 1, 1, 2])
+
+    assert manager.update(manager.load(interview_id))
+
+    window = manager.load(interview_id)
+    assert [message["content"] for message in window["messages"]] == ["m2.", "m3."]
+    assert "m1." in window["summary"] and "m2." not in window["summary"]
+
+
+def test_turns_during_an_update_do_not_start_another(app, manager, interview_id, monkeypatch):
+    add_messages(interview_id, [0, 1, 2])
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def update(window):
+        calls.append(window["interview_id"])
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(manager, "update", update)
+    monkeypatch.setattr(ai_chat, "get_conversation_memory_manager", lambda: manager)
+    window = manager.load(interview_id)
+
+    ai_chat.schedule_chat_memory_update(window, [{"id": 4, "role": "user", "content": "a", "timestamp": None}])
+    assert started.wait(5)
+    ai_chat.schedule_chat_memory_update(window, [{"id": 5, "role": "assistant", "content": "b", "timestamp": None}])
+    release.set()
+
+    assert calls == [interview_id]
+    # The claim is released once the running update finishes
+    deadline = time.time() + 5
+    while not manager.claim_update(interview_id):
+        assert time.time() < deadline
+        time.sleep(0.01)
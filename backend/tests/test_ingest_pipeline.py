@@ -0,0 +1,151 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from src.services.recruai.rag.models import DocumentChunk, EmbeddingStore, IndexChange
+from src.services.recruai.rag.tools import EmbedderTool, IngestorTool, IngestJobQueue, IngestPipeline, RetrieverTool
+from src.services.recruai.rag.tools.pipeline import DocumentOwnershipError
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'rag.db'}")
+
+
+@pytest.fixture
+def pipeline(engine):
+    return IngestPipeline(IngestorTool(), EmbedderTool(), engine, retriever=RetrieverTool(engine))
+
+
+def make_document(count=400, changed=None):
+    sentences = [f"Sentence {index} about python developers and flask apis number {index}." for index in range(count)]
+    if changed is not None:
+        sentences[changed] = "Completely different text about kubernetes operators."
+    return " ".join(sentences)
+
+
+def count_rows(engine, model):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_unchanged_document_reuses_every_chunk(pipeline, engine):
+    first = pipeline.ingest_text(make_document(), "doc1", "resume", user_id=1)
+    second = pipeline.ingest_text(make_document(), "doc1", "resume", user_id=1)
+
+    assert first['chunks_stored'] > 1
+    assert second['chunks_stored'] == 0
+    assert second['embeddings_stored'] == 0
+    assert second['chunks_reused'] == first['chunks_stored']
+    assert second['chunks_deleted'] == 0
+    assert count_rows(engine, DocumentChunk) == first['chunks_stored']
+
+
+def test_edit_only_embeds_changed_chunks(pipeline, engine):
+    first = pipeline.ingest_text(make_document(), "doc1", "resume", user_id=1)
+    second = pipeline.ingest_text(make_document(changed=200), "doc1", "resume", user_id=1)
+
+    assert 0 < second['chunks_stored'] < first['chunks_stored']
+    assert second['embeddings_stored'] == second['chunks_stored']
+    assert second['chunks_deleted'] == second['chunks_stored']
+    assert count_rows(engine, DocumentChunk) == second['chunks_reused'] + second['chunks_stored']
+    assert count_rows(engine, EmbeddingStore) == count_rows(engine, DocumentChunk)
+
+
+def test_shortened_document_deletes_orphans_and_logs_them(pipeline, engine):
+    pipeline.ingest_text(make_document(), "doc1", "resume", user_id=1)
+    result = pipeline.ingest_text(make_document(count=300), "doc1", "resume", user_id=1)
+
+    assert result['chunks_deleted'] > 0
+    assert count_rows(engine, DocumentChunk) == result['chunks_reused'] + result['chunks_stored']
+    assert count_rows(engine, EmbeddingStore) == count_rows(engine, DocumentChunk)
+    # Deletions are logged so other processes can drop them from their local indexes
+    assert count_rows(engine, IndexChange) == result['chunks_deleted']
+
+
+@pytest.mark.parametrize("owner", [
+    {'user_id': 2},
+    {'user_id': 1, 'organization_id': 9},
+    {},
+])
+def test_document_of_another_owner_is_rejected(pipeline, engine, owner):
+    pipeline.ingest_text(make_document(), "doc1", "resume", user_id=1)
+    chunks = count_rows(engine, DocumentChunk)
+
+    with pytest.raises(DocumentOwnershipError):
+        pipeline.ingest_text("Replacement text.", "doc1", "resume", **owner)
+
+    assert count_rows(engine, DocumentChunk) == chunks
+    assert count_rows(engine, IndexChange) == 0
+
+
+def test_failed_embedding_keeps_previous_chunks(pipeline, engine, monkeypatch):
+    first = pipeline.ingest_text(make_document(), "doc1", "resume", user_id=1)
+    with engine.connect() as connection:
+        before = set(connection.execute(select(DocumentChunk.content)).scalars())
+
+    generate_embeddings = pipeline.embedder.generate_embeddings
+
+    def failing_edit(chunks, *args, **kwargs):
+        embedded = generate_embeddings(chunks, *args, **kwargs)
+        for chunk in embedded:
+            if 'kubernetes' in chunk['content']:
+                chunk['embedding'] = None
+        return embedded
+
+    monkeypatch.setattr(pipeline.embedder, 'generate_embeddings', failing_edit)
+    result = pipeline.ingest_text(make_document(changed=200), "doc1", "resume", user_id=1)
+
+    assert result['status'] == 'partial'
+    assert result['chunks_failed'] > 0
+    assert result['chunks_deleted'] == 0
+    with engine.connect() as connection:
+        after = set(connection.execute(select(DocumentChunk.content)).scalars())
+    # Every chunk of the previous version survives, including the edited one
+    assert before <= after
+    assert count_rows(engine, DocumentChunk) == first['chunks_stored'] + result['chunks_stored']
+    assert count_rows(engine, IndexChange) == 0
+
+
+def test_concurrent_reingests_of_one_document_do_not_duplicate_chunks(pipeline, engine):
+    pipeline.ingest_text(make_document(), "doc1", "resume", user_id=1)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(
+            lambda _: pipeline.ingest_text(make_document(changed=200), "doc1", "resume", user_id=1), range(2)
+        ))
+
+    # The second ingest sees the first one's rows and stores nothing
+    assert sorted(result['chunks_stored'] for result in results)[0] == 0
+    assert count_rows(engine, DocumentChunk) == results[0]['chunks_reused'] + results[0]['chunks_stored']
+    assert count_rows(engine, EmbeddingStore) == count_rows(engine, DocumentChunk)
+
+
+def test_recover_leaves_a_job_with_a_live_heartbeat_running(pipeline, engine, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    ingest_text = pipeline.ingest_text
+
+    def slow_ingest(**kwargs):
+        started.set()
+        release.wait(5)
+        return ingest_text(**kwargs)
+
+    monkeypatch.setattr(pipeline, "ingest_text", slow_ingest)
+    jobs = IngestJobQueue(pipeline, max_workers=1)
+    monkeypatch.setattr(jobs, "start_recovery", lambda interval=None: None)
+    jobs.config.INGEST_JOB_HEARTBEAT_SECONDS = 0.05
+    jobs.config.INGEST_JOB_STALE_SECONDS = 0.5
+
+    job = jobs.submit(make_document(count=20), "doc1", "resume", user_id=1)
+    assert started.wait(5)
+    time.sleep(1)
+
+    assert jobs.recover() == 0
+    release.set()
+    jobs.shutdown()
+    finished = jobs.get_job(job['job_id'])
+    assert finished['status'] == 'completed'
+    assert finished['attempts'] == 1
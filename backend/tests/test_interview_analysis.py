@@ -0,0 +1,154 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.recruai import interview_analysis
+from src.services.recruai.interview_analysis import (
+    SCORE_KEYS,
+    estimate_tokens,
+    generate_ai_analysis,
+    reduce_segment_analyses,
+    split_transcript,
+)
+
+
+class FakeAIService:
+    """Returns canned responses in order and records the prompts it was sent"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def generate_response(self, system_prompt, user_message, *args, **kwargs):
+        self.calls.append((system_prompt, user_message))
+        return self.responses.pop(0)
+
+
+def _segment(score, summary, strengths=(), improvements=()):
+    result = {key: score for key in SCORE_KEYS}
+    result.update(
+        detailed_feedback=f"{summary} in detail.",
+        ai_analysis_summary=summary,
+        strengths=list(strengths),
+        improvements=list(improvements),
+    )
+    return result
+
+
+def test_split_transcript_keeps_messages_whole():
+    lines = [f"USER: message {index} " + "x" * 30 for index in range(10)]
+
+    segments = split_transcript(lines, max_tokens=30)
+
+    assert len(segments) > 1
+    assert all(sum(estimate_tokens(line) for line in segment.split("\n")) <= 30 for segment in segments)
+    assert "\n".join(segments).split("\n") == lines
+
+
+def test_split_transcript_cuts_oversized_messages():
+    segments = split_transcript(["short", "y" * 100, "tail"], max_tokens=10)
+
+    assert "".join(segments).replace("\n", "") == "short" + "y" * 100 + "tail"
+    assert all(len(piece) <= 40 for segment in segments for piece in segment.split("\n"))
+
+
+def test_split_transcript_short_input_is_one_segment():
+    assert split_transcript(["AI: hi", "USER: hello"], max_tokens=100) == ["AI: hi\nUSER: hello"]
+    assert split_transcript([], max_tokens=100) == []
+
+
+def test_reduce_weights_scores_by_segment_length():
+    merged = {
+        "detailed_feedback": "Merged.",
+        "ai_analysis_summary": "Solid overall.",
+        "strengths": ["Python"],
+        "improvements": ["Testing"],
+    }
+    service = FakeAIService(json.dumps(merged))
+
+    result = reduce_segment_analyses(service, [(_segment(90, "Strong start"), 300), (_segment(60, "Weak end"), 100)])
+
+    assert all(result[key] == 82 for key in SCORE_KEYS)
+    assert result["ai_analysis_summary"] == "Solid overall."
+    assert result["strengths"] == ["Python"]
+    assert len(service.calls) == 1
+
+
+def test_reduce_combines_feedback_when_merge_response_is_invalid():
+    segments = [
+        (_segment(70, "Good design", ["APIs", "SQL"], ["Tests"]), 100),
+        (_segment(80, "Clear answers", ["sql", "Caching"], ["Tests", "Docs"]), 100),
+    ]
+
+    result = reduce_segment_analyses(FakeAIService("not json"), segments)
+
+    assert result["overall_score"] == 75
+    assert result["detailed_feedback"] == "Good design Clear answers"
+    assert result["ai_analysis_summary"] == "Clear answers"
+    # Items named by more segments rank first
+    assert result["strengths"] == ["SQL", "APIs", "Caching"]
+    assert result["improvements"] == ["Tests", "Docs"]
+
+
+def _messages(count):
+    return [
+        SimpleNamespace(message_type="ai" if index % 2 == 0 else "user", content=f"Message number {index}.")
+        for index in range(count)
+    ]
+
+
+def test_unparseable_analysis_is_marked_limited(monkeypatch):
+    monkeypatch.setattr(interview_analysis, "get_ai_service", lambda: FakeAIService("I cannot do that."))
+    interview = SimpleNamespace(title="Backend Engineer", description=None, duration_minutes=30)
+
+    result = generate_ai_analysis(interview, _messages(4))
+
+    assert result["analyzed_by"].endswith("(Limited)")
+
+
+def test_long_transcript_uses_map_reduce(monkeypatch):
+    segment = json.dumps(_segment(70, "Fine"))
+    merged = json.dumps({
+        "detailed_feedback": "Merged.", "ai_analysis_summary": "Fine.", "strengths": [], "improvements": [],
+    })
+    monkeypatch.setattr(interview_analysis, "ANALYSIS_SEGMENT_TOKENS", 20)
+    monkeypatch.setattr(interview_analysis, "get_ai_service", lambda: FakeAIService(merged))
+    monkeypatch.setattr(interview_analysis, "get_async_ai_service", lambda: SimpleNamespace(
+        gather_responses=lambda prompts, **kwargs: [segment] * len(prompts)
+    ))
+    interview = SimpleNamespace(title="Backend Engineer", description=None, duration_minutes=30)
+
+    result = generate_ai_analysis(interview, _messages(12))
+
+    assert result["overall_score"] == 70
+    assert result["ai_analysis_summary"] == "Fine."
+    assert result["analyzed_by"].startswith("AI Analysis System (")
+    assert result["analyzed_by"].endswith(" segments)")
+
+
+def test_slow_segment_is_left_out_of_the_reduce(monkeypatch):
+    from src.services.recruai.async_ai_service import AsyncInterviewAIService
+
+    service = AsyncInterviewAIService(provider="groq")
+    segment = json.dumps(_segment(80, "Fine"))
+
+    async def post(payload):
+        # The second segment never answers within the timeout
+        if "(2 of" in payload["messages"][-1]["content"]:
+            await asyncio.sleep(5)
+        return SimpleNamespace(status_code=200, json=lambda: {"choices": [{"message": {"content": segment}}]})
+
+    monkeypatch.setattr(service, "_apost", post)
+    monkeypatch.setattr(interview_analysis, "get_async_ai_service", lambda: service)
+    monkeypatch.setattr(interview_analysis, "get_ai_service", lambda: FakeAIService("not json"))
+    monkeypatch.setattr(interview_analysis, "ANALYSIS_SEGMENT_TOKENS", 20)
+    monkeypatch.setattr(interview_analysis, "ANALYSIS_TIMEOUT_SECONDS", 0.2)
+    interview = SimpleNamespace(title="Backend Engineer", description=None, duration_minutes=30)
+
+    result = generate_ai_analysis(interview, _messages(12))
+
+    assert result["overall_score"] == 80
+    segments = len(split_transcript([f"{m.message_type.upper()}: {m.content}" for m in _messages(12)], 20))
+    assert result["analyzed_by"] == f"AI Analysis System ({segments - 1}/{segments} segments)"
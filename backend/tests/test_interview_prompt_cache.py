@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from extensions import db
+from src.models import Interview, PromptCacheVersion
+from src.services.recruai import interview_prompt_cache
+from src.services.recruai.interview_prompt_cache import InterviewPromptCache
+
+
+@pytest.fixture
+def app(tmp_path):
+    """File database, so version reads use a connection of their own"""
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'app.db'}", SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def cache(app, monkeypatch):
+    cache = InterviewPromptCache()
+    monkeypatch.setattr(interview_prompt_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def interview(app):
+    interview = Interview(title="Backend Engineer", scheduled_at=datetime(2026, 1, 1), user_id=1, organization_id=1)
+    db.session.add(interview)
+    db.session.commit()
+    return interview
+
+
+def cache_prompt(cache, interview):
+    cache.set(interview.id, {"prefix": interview.title}, depends_on=[(Interview.__tablename__, interview.id)])
+
+
+def test_update_evicts_on_commit_not_on_flush(cache, interview):
+    cache_prompt(cache, interview)
+
+    interview.title = "Staff Engineer"
+    db.session.flush()
+    assert cache.get(interview.id) is not None
+
+    db.session.commit()
+    assert cache.get(interview.id) is None
+
+
+def test_rolled_back_update_keeps_the_entry(cache, interview):
+    cache_prompt(cache, interview)
+
+    interview.title = "Staff Engineer"
+    db.session.flush()
+    db.session.rollback()
+
+    assert cache.get(interview.id) is not None
+    assert cache.invalidations == 0
+
+
+def test_update_from_another_process_expires_the_entry(cache, interview):
+    cache.version_ttl_seconds = 0
+    cache_prompt(cache, interview)
+    assert cache.get(interview.id) is not None
+
+    # Another process commits an update: only the shared version changes here
+    with db.engine.begin() as connection:
+        PromptCacheVersion.bump(connection, Interview.__tablename__, interview.id)
+
+    assert cache.get(interview.id) is None
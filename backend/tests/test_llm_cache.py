@@ -0,0 +1,105 @@
+import pytest
+
+from src.services.recruai import llm_cache
+from src.services.recruai.llm_cache import LLMResponseCache, get_llm_response_cache
+
+
+MODEL = "groq/test-model:1000"
+SYSTEM = "You are an interviewer."
+
+
+def fake_embed(text):
+    """Deterministic two-dimensional embeddings: 'hello' and 'hi' point the same way"""
+    vectors = {
+        "hello there": [1.0, 0.0],
+        "hi there": [0.99, 0.05],
+        "tell me about kubernetes": [0.0, 1.0],
+    }
+    return vectors.get(text, [0.5, 0.5])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = LLMResponseCache()
+    cache.set(MODEL, SYSTEM, "Tell me   about yourself", "Sure.")
+
+    assert cache.get(MODEL, SYSTEM, "tell me about YOURSELF") == "Sure."
+    assert cache.get_stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("model, system, history", [
+    ("openai/other-model:1000", SYSTEM, None),
+    (MODEL, "You are a recruiter.", None),
+    (MODEL, SYSTEM, [{"role": "user", "content": "earlier turn"}]),
+])
+def test_key_covers_model_system_prompt_and_history(model, system, history):
+    cache = LLMResponseCache()
+    cache.set(MODEL, SYSTEM, "Hello", "Hi!")
+
+    assert cache.get(model, system, "Hello", history) is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LLMResponseCache(ttl_seconds=60)
+    cache.set(MODEL, SYSTEM, "Hello", "Hi!")
+    cache.set(MODEL, SYSTEM, "Short lived", "Bye!", ttl_seconds=5)
+
+    clock[0] += 10
+    assert cache.get(MODEL, SYSTEM, "Hello") == "Hi!"
+    assert cache.get(MODEL, SYSTEM, "Short lived") is None
+
+    clock[0] += 60
+    assert cache.get(MODEL, SYSTEM, "Hello") is None
+    assert cache.get_stats()["expirations"] == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMResponseCache(max_entries=2)
+    cache.set(MODEL, SYSTEM, "one", "1")
+    cache.set(MODEL, SYSTEM, "two", "2")
+    cache.get(MODEL, SYSTEM, "one")
+    cache.set(MODEL, SYSTEM, "three", "3")
+
+    assert cache.get(MODEL, SYSTEM, "two") is None
+    assert cache.get(MODEL, SYSTEM, "one") == "1"
+    assert cache.get(MODEL, SYSTEM, "three") == "3"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_similar_message_hits_at_low_temperature():
+    cache = LLMResponseCache(embed_fn=fake_embed, semantic_threshold=0.95, semantic_max_temperature=0.3)
+    cache.set(MODEL, SYSTEM, "Hello there", "Welcome!", temperature=0.2)
+
+    assert cache.get(MODEL, SYSTEM, "Hi there", temperature=0.2) == "Welcome!"
+    assert cache.get(MODEL, SYSTEM, "Tell me about Kubernetes", temperature=0.2) is None
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+def test_similarity_tier_is_skipped_at_high_temperature():
+    cache = LLMResponseCache(embed_fn=fake_embed)
+    cache.set(MODEL, SYSTEM, "Hello there", "Welcome!", temperature=0.2)
+
+    assert cache.get(MODEL, SYSTEM, "Hi there", temperature=0.9) is None
+
+
+def test_embedding_failure_falls_back_to_exact_matching():
+    def broken_embed(text):
+        raise RuntimeError("no model")
+
+    cache = LLMResponseCache(embed_fn=broken_embed)
+    cache.set(MODEL, SYSTEM, "Hello there", "Welcome!", temperature=0.1)
+
+    assert cache.get(MODEL, SYSTEM, "Hello there", temperature=0.1) == "Welcome!"
+    assert cache.get(MODEL, SYSTEM, "Hi there", temperature=0.1) is None
+
+
+def test_global_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("AI_CACHE_ENABLED", "false")
+
+    assert get_llm_response_cache() is None
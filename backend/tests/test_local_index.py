@@ -0,0 +1,45 @@
+import numpy as np
+
+from src.services.recruai.rag.models.local_index import LocalVectorIndex
+
+
+def rows(ids, dimensions=8):
+    generator = np.random.default_rng(0)
+    return [
+        {"id": embedding_id, "chunk_id": embedding_id * 10, "embedding": generator.normal(size=dimensions).tolist(),
+         "document_id": f"doc{embedding_id % 3}", "user_id": "1"}
+        for embedding_id in ids
+    ]
+
+
+def test_removing_past_the_threshold_compacts_storage():
+    index = LocalVectorIndex(dimensions=8, initial_capacity=16, compact_threshold=0.25)
+    added = rows(range(1, 101))
+    index.add(added)
+
+    index.remove(range(1, 21))
+    assert index.get_stats()["compactions"] == 0
+    assert index.get_stats()["dead_rows"] == 20
+
+    index.remove(range(21, 41))
+    stats = index.get_stats()
+    assert stats["compactions"] == 1
+    assert (stats["rows"], stats["dead_rows"], stats["capacity"]) == (60, 0, 64)
+
+    # Ids, chunk ids and filters still line up with their vectors
+    for row in added[40:]:
+        (match, score), = index.search(row["embedding"], top_k=1, filters={"user_id": "1"})
+        assert (match["id"], match["chunk_id"], match["document_id"]) == (row["id"], row["chunk_id"], row["document_id"])
+        assert score > 0.99
+    assert index.remove([41]) == 1
+    assert {match["id"] for match, _ in index.search(added[50]["embedding"], top_k=100, similarity_threshold=-1.0)} == set(range(42, 101))
+
+
+def test_replaced_rows_count_as_dead():
+    index = LocalVectorIndex(dimensions=8, initial_capacity=16, compact_threshold=0.5)
+    index.add(rows(range(1, 11)))
+    index.add(rows(range(1, 11)))
+
+    stats = index.get_stats()
+    assert stats["compactions"] == 1
+    assert (stats["rows"], stats["dead_rows"]) == (10, 0)
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.blueprints.recruai.routes.api.interviews.messages import encode_cursor, decode_cursor, get_messages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678)
+    cursor = encode_cursor(SimpleNamespace(created_at=created_at, id=42))
+
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["zzz", "", "bm90LWEtY3Vyc29y", "fDc="])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def messages(app):
+    from extensions import db
+    from src.models import User, Message
+
+    user = User(email="candidate@example.com", name="Candidate")
+    user.set_password("secret")
+    db.session.add(user)
+    db.session.flush()
+
+    # Pairs of messages share a timestamp, so pages must break ties on id
+    start = datetime(2026, 1, 1)
+    for index in range(7):
+        db.session.add(Message(
+            interview_id=1, user_id=user.id, content=f"m{index}",
+            created_at=start + timedelta(seconds=index // 2)
+        ))
+    db.session.commit()
+
+
+def _pages(app, order):
+    pages, cursor = [], None
+    while True:
+        query_string = {"limit": "3", "order": order}
+        if cursor:
+            query_string["cursor"] = cursor
+        with app.test_request_context("/", query_string=query_string):
+            response, status = get_messages(1)
+        assert status == 200
+        body = response.get_json()
+        pages.append([message["content"] for message in body["messages"]])
+        cursor = body["next_cursor"]
+        if not body["has_more"]:
+            assert cursor is None
+            return pages
+
+
+def test_keyset_pages_ascending(app, messages):
+    assert _pages(app, "asc") == [["m0", "m1", "m2"], ["m3", "m4", "m5"], ["m6"]]
+
+
+def test_keyset_pages_descending(app, messages):
+    assert _pages(app, "desc") == [["m6", "m5", "m4"], ["m3", "m2", "m1"], ["m0"]]
+
+
+def test_invalid_cursor_is_rejected(app):
+    with app.test_request_context("/", query_string={"cursor": "zzz"}):
+        response, status = get_messages(1)
+
+    assert status == 400
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from src.services.recruai.rag.models import DocumentChunk
+from src.services.recruai.rag.tools import EmbedderTool, IngestorTool, IngestPipeline, RAGSupervisor, RetrieverTool
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'rag.db'}")
+
+
+@pytest.fixture
+def supervisor(engine):
+    ingestor, embedder = IngestorTool(), EmbedderTool()
+    supervisor = RAGSupervisor(ingestor=ingestor, embedder=embedder)
+    supervisor.register_tools(pipeline=IngestPipeline(ingestor, embedder, engine, retriever=RetrieverTool(engine)))
+    return supervisor
+
+
+TEXT = " ".join(f"Sentence {index} about python developers and flask apis." for index in range(40))
+
+
+def test_ingestion_workflow_stores_chunks(supervisor, engine):
+    result = supervisor.orchestrate_workflow(
+        TEXT, "text", metadata={"document_id": "doc1", "source_type": "resume"}, user_context={"user_id": 1}
+    )
+
+    assert result["success"], result["errors"]
+    assert result["tools_used"] == ["metadata_manager", "ingestor", "store"]
+    with engine.connect() as connection:
+        stored = connection.execute(select(func.count()).select_from(DocumentChunk)).scalar()
+    assert stored == result["final_result"]["chunks_stored"] > 0
+
+
+def test_unregistered_optional_tools_are_skipped(supervisor):
+    result = supervisor.orchestrate_workflow(
+        {"content": TEXT}, "image",
+        metadata={"document_id": "doc2", "source_type": "user_input", "needs_safety_check": True}
+    )
+
+    assert result["success"], result["errors"]
+    assert result["skipped_tools"] == ["ocr", "safety"]
+    assert [step["tool"] for step in result["processing_steps"]] == ["metadata_manager", "ingestor", "store"]
+
+
+def test_store_without_document_id_fails(supervisor):
+    result = supervisor.orchestrate_workflow(TEXT, "text")
+
+    assert not result["success"]
+    assert "document_id" in result["errors"][0]
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import create_engine, event
+
+from src.services.recruai.rag.tools import EmbedderTool, IngestorTool, IngestPipeline, RetrieverTool
+
+
+QUERY = "python developers and flask apis"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'rag.db'}")
+
+
+@pytest.fixture
+def embedder():
+    return EmbedderTool()
+
+
+def make_pipeline(engine, embedder):
+    """Pipeline and retriever of one process; each call stands for another process"""
+    retriever = RetrieverTool(engine)
+    return IngestPipeline(IngestorTool(), embedder, engine, retriever=retriever), retriever
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+def ingest(pipeline, document_id, organization_id):
+    pipeline.ingest_text(
+        f"Document {document_id} about python developers and flask apis.", document_id, "resume",
+        user_id=organization_id, organization_id=organization_id
+    )
+
+
+def test_repeated_query_is_served_without_database_queries(engine, embedder, statements):
+    pipeline, retriever = make_pipeline(engine, embedder)
+    ingest(pipeline, "doc1", 1)
+
+    first = retriever.retrieve_by_text(QUERY, embedder, filters={'organization_id': '1'})
+    executed = len(statements)
+    second = retriever.retrieve_by_text(QUERY, embedder, filters={'organization_id': '1'})
+
+    assert second == first
+    assert len(statements) == executed
+
+
+def test_results_are_cached_at_one_layer(engine, embedder):
+    pipeline, retriever = make_pipeline(engine, embedder)
+    ingest(pipeline, "doc1", 1)
+
+    retriever.retrieve_by_text(QUERY, embedder, filters={'organization_id': '1'})
+    retriever.retrieve_hybrid(QUERY, embedder, keyword_filters={'organization_id': '1'})
+
+    assert retriever.get_statistics()['result_cache']['size'] == 2
+
+
+def test_write_in_another_process_only_expires_that_tenant(engine, embedder):
+    writer, _ = make_pipeline(engine, embedder)
+    _, reader = make_pipeline(engine, embedder)
+    reader.config.RETRIEVAL_CACHE_MARKER_TTL_SECONDS = 0
+    ingest(writer, "doc1", 1)
+    ingest(writer, "doc2", 2)
+
+    first = reader.retrieve_by_text(QUERY, embedder, filters={'organization_id': '1'})
+    other = reader.retrieve_by_text(QUERY, embedder, filters={'organization_id': '2'})
+    assert first and other
+
+    ingest(writer, "doc3", 2)
+    stats = reader.get_statistics()['result_cache']
+    assert reader.retrieve_by_text(QUERY, embedder, filters={'organization_id': '1'}) == first
+    assert reader.get_statistics()['result_cache']['hits'] == stats['hits'] + 1
+
+    refreshed = reader.retrieve_by_text(QUERY, embedder, filters={'organization_id': '2'})
+    assert len(refreshed) == len(other) + 1
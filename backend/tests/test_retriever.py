@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine
+
+from src.services.recruai.rag.tools import EmbedderTool, IngestorTool, IngestPipeline, RetrieverTool
+from src.services.recruai.rag.tools.embedding_providers import EmbeddingProvider
+
+
+QUERY = "python developers and flask apis"
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rag.db'}")
+    retriever = RetrieverTool(engine)
+    pipeline = IngestPipeline(IngestorTool(), EmbedderTool(), engine, retriever=retriever)
+    pipeline.ingest_text("Senior python developers building flask apis.", "doc1", "resume", user_id=1)
+    return retriever
+
+
+def test_query_only_matches_rows_of_its_embedding_model(retriever, monkeypatch):
+    assert retriever.retrieve_by_text(QUERY, EmbedderTool(), similarity_threshold=0.1)
+
+    # Same dimensions, different vector space
+    other = EmbedderTool()
+    monkeypatch.setattr(other.provider, "model_name", "other-model")
+    assert retriever.retrieve_by_text(QUERY, other, similarity_threshold=0.1) == []
+    assert retriever.retrieve_many([QUERY], other, similarity_threshold=0.1) == [[]]
+
+
+def test_embedding_provider_requires_embed():
+    class Incomplete(EmbeddingProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()